@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Batched remote shell commands for PixelSync
+Runs several commands in a single `adb shell` round trip and splits the
+output back into per-command results.
+"""
+
+import shlex
+import uuid
+from typing import Any, Dict, List, Optional
+from adb_session import ShellResult
+from adb_transport import AdbTransport
+
+# For commands that walk a whole folder on the device (find, du, stat, touch of every file)
+SLOW_COMMAND_TIMEOUT = 600.0
+
+
+def build_batch_script(commands: List[str], marker: str) -> str:
+    """
+    Wrap each command between BEGIN/END markers.
+
+    Every command runs in its own subshell so an `exit` or a failure in one
+    does not stop the rest, and its exit code is echoed on the END line.
+    """
+    parts = []
+    for idx, command in enumerate(commands):
+        parts.append(f"echo '{marker} BEGIN {idx}'")
+        parts.append(f"( {command} ) 2>&1")
+        parts.append(f"echo \"{marker} END {idx} $?\"")
+    return '; '.join(parts)
+
+
+def parse_batch_output(stdout: str, marker: str, count: int) -> List[ShellResult]:
+    """Split combined stdout into one ShellResult per command."""
+    results: List[Optional[ShellResult]] = [None] * count
+    current = None
+    lines: List[str] = []
+
+    for line in stdout.splitlines():
+        line = line.rstrip('\r')
+        if line.startswith(marker):
+            fields = line[len(marker):].split()
+            if len(fields) >= 2 and fields[0] == 'BEGIN':
+                current = int(fields[1])
+                lines = []
+            elif len(fields) >= 3 and fields[0] == 'END' and current is not None:
+                try:
+                    exit_code = int(fields[2])
+                except ValueError:
+                    exit_code = -1
+                results[current] = ShellResult(exit_code, '\n'.join(lines))
+                current = None
+            continue
+        if current is not None:
+            lines.append(line)
+
+    # Commands that never reported back (e.g. device dropped mid-batch)
+    return [r if r is not None else ShellResult(-1, '') for r in results]
+
+
+def run_shell_batch(
+    transport: AdbTransport,
+    commands: List[str],
+    timeout: Optional[float] = None,
+    idempotent: bool = False
+) -> List[ShellResult]:
+    """
+    Run several shell commands on the device in one `adb shell` invocation.
+
+    Args:
+        transport: Device to run them on (through its persistent shell, if open)
+        commands: Shell command strings, already quoted for the device shell
+        timeout: Optional timeout for the whole batch in seconds
+        idempotent: Every command is safe to run twice (read-only), so the
+            persistent shell may retry the batch after a dropped shell
+
+    Returns:
+        List[ShellResult]: One result per command, in order. If the batch
+        could not run at all every result has exit code -1.
+    """
+    if not commands:
+        return []
+
+    marker = f"__PIXELSYNC_{uuid.uuid4().hex[:12]}__"
+    script = build_batch_script(commands, marker)
+    result = transport.shell(script, timeout=timeout, idempotent=idempotent)
+    return parse_batch_output(result.output, marker, len(commands))
+
+
+def _first_int(text: str) -> Optional[int]:
+    try:
+        return int(text.split()[0])
+    except (ValueError, IndexError):
+        return None
+
+
+def _parse_df_available_kb(text: str) -> Optional[int]:
+    """Parse the 'Available' column of `df -k <path>`."""
+    lines = [line for line in text.splitlines() if line.strip()]
+    if len(lines) < 2:
+        return None
+    fields = lines[-1].split()
+    if len(fields) < 4:
+        return None
+    try:
+        return int(fields[3])
+    except ValueError:
+        return None
+
+
+def _parse_battery(text: str) -> Dict[str, Any]:
+    """Pick level, temperature and charger state out of `dumpsys battery`."""
+    battery: Dict[str, Any] = {'battery_plugged': False}
+    for line in text.splitlines():
+        key, _, value = line.strip().partition(':')
+        value = value.strip()
+        if key in ('AC powered', 'USB powered', 'Wireless powered') and value == 'true':
+            battery['battery_plugged'] = True
+        elif key == 'level':
+            battery['battery_level'] = _first_int(value)
+        elif key == 'temperature':
+            temp = _first_int(value)
+            battery['battery_temp_c'] = temp / 10 if temp is not None else None
+    return battery
+
+
+def _parse_thermal_status(text: str) -> Optional[int]:
+    """`Thermal Status: N` from `dumpsys thermalservice` (0 none ... 6 shutdown)."""
+    for line in text.splitlines():
+        key, _, value = line.strip().partition(':')
+        if key == 'Thermal Status':
+            return _first_int(value)
+    return None
+
+
+def get_device_status(pixel_path: str, transport: AdbTransport) -> Dict[str, Any]:
+    """
+    Query folder size, free space, file count and basic health in one round trip.
+
+    Returns:
+        dict with keys:
+            online (bool): The batch ran on the device
+            folder_size_mb (float): Size of pixel_path (0.0 if unknown)
+            free_mb (float | None): Free space on the storage holding pixel_path
+            file_count (int | None): Number of files in pixel_path
+            boot_completed (bool): Android reports boot completed
+            battery_level (int | None), battery_temp_c (float | None)
+            battery_plugged (bool | None): Running on AC/USB/wireless power
+            thermal_status (int | None): Android thermal status, None before Android 10
+    """
+    path = shlex.quote(pixel_path)
+    du_res, df_res, count_res, boot_res, battery_res, thermal_res = run_shell_batch(transport, [
+        f"du -sk {path}",
+        f"df -k {path}",
+        f"find {path} -type f | wc -l",
+        "getprop sys.boot_completed",
+        "dumpsys battery",
+        "dumpsys thermalservice",
+    ], timeout=SLOW_COMMAND_TIMEOUT, idempotent=True)
+
+    size_kb = _first_int(du_res.output) if du_res.ok else None
+    free_kb = _parse_df_available_kb(df_res.output) if df_res.ok else None
+
+    status: Dict[str, Any] = {
+        'online': any(r.exit_code != -1 for r in (du_res, df_res, count_res, boot_res, battery_res)),
+        'folder_size_mb': size_kb / 1024 if size_kb is not None else 0.0,
+        'free_mb': free_kb / 1024 if free_kb is not None else None,
+        'file_count': _first_int(count_res.output) if count_res.ok else None,
+        'boot_completed': boot_res.output.strip() == '1',
+        'battery_level': None,
+        'battery_temp_c': None,
+        'battery_plugged': None,
+        'thermal_status': _parse_thermal_status(thermal_res.output) if thermal_res.ok else None,
+    }
+    if battery_res.ok:
+        status.update(_parse_battery(battery_res.output))
+    return status
+
+
+def run_housekeeping(
+    pixel_path: str,
+    transport: AdbTransport,
+    full_rescan: bool = False
+) -> List[ShellResult]:
+    """
+    Send all post-batch media scanner housekeeping in one round trip.
+
+    Args:
+        pixel_path: Folder the files were pushed to
+        transport: Device to run it on
+        full_rescan: Also broadcast MEDIA_MOUNTED for a full re-scan (end of run)
+    """
+    path = shlex.quote(pixel_path.rstrip('/') or '/')
+    uri = shlex.quote(f"file://{pixel_path.rstrip('/')}")
+    commands = [
+        f"find {path} -type f -exec touch {{}} \\;",
+        f"am broadcast -a android.intent.action.MEDIA_SCANNER_SCAN_FILE -d {uri}",
+    ]
+    if full_rescan:
+        commands.append("am broadcast -a android.intent.action.MEDIA_MOUNTED -d file:///sdcard")
+    return run_shell_batch(transport, commands, timeout=SLOW_COMMAND_TIMEOUT)
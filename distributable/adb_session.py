@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Persistent `adb shell` session
+Keeps one shell process open on the device and runs small commands through
+its stdin, instead of spawning a new adb process (and USB round trip setup)
+for every `rm`, `du` or `touch`.
+"""
+
+import queue
+import shlex
+import subprocess
+import threading
+import uuid
+from typing import List, NamedTuple, Optional
+
+
+class ShellResult(NamedTuple):
+    """Output and exit code of one remote command."""
+    exit_code: int
+    output: str
+
+    @property
+    def ok(self) -> bool:
+        return self.exit_code == 0
+
+
+class AdbShellSession:
+    """
+    One long-lived `adb shell` coprocess.
+
+    Every command is framed as::
+
+        ( <command> ) </dev/null 2>&1; printf '\\n<marker> %d\\n' $?
+
+    and stdout is read up to the marker line, so output and exit code come
+    back exactly as with a one-off `adb shell`. If the shell dies (cable
+    unplugged, adb server restarted) or a command outlives its timeout, the
+    shell is killed and started again for the next command. Only commands
+    marked idempotent (safe to run twice, e.g. `du` or `stat`) are retried.
+
+    Usage:
+        with AdbShellSession(['adb', '-s', device_id]) as session:
+            session.run_args(['rm', '/sdcard/DCIM/Camera/IMG (1).HEIC'])
+    """
+
+    def __init__(self, adb_cmd: List[str], timeout: float = 60.0):
+        self.adb_cmd = list(adb_cmd)
+        self.timeout = timeout
+        self.marker = f"__PIXELSYNC_{uuid.uuid4().hex[:12]}__"
+        self.restarts = 0
+        self._proc: Optional[subprocess.Popen] = None
+        self._lines: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Process management
+    # ------------------------------------------------------------------
+
+    def _start(self) -> None:
+        self._proc = subprocess.Popen(
+            self.adb_cmd + ['shell'],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            encoding='utf-8',
+            errors='replace',
+            bufsize=1,
+        )
+        self._lines = queue.Queue()
+        reader = threading.Thread(target=self._read_stdout, args=(self._proc, self._lines), daemon=True)
+        reader.start()
+
+    @staticmethod
+    def _read_stdout(proc: subprocess.Popen, lines: "queue.Queue[Optional[str]]") -> None:
+        for line in proc.stdout:
+            lines.put(line)
+        lines.put(None)  # EOF: shell exited
+
+    def alive(self) -> bool:
+        return self._proc is not None and self._proc.poll() is None
+
+    def close(self) -> None:
+        """Exit the remote shell and reap the adb process."""
+        if self._proc is None:
+            return
+        try:
+            if self._proc.poll() is None:
+                self._proc.stdin.write('exit\n')
+                self._proc.stdin.flush()
+                self._proc.wait(timeout=5)
+        except (OSError, ValueError, subprocess.TimeoutExpired):
+            self._proc.kill()
+        self._proc = None
+
+    def __enter__(self) -> 'AdbShellSession':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # ------------------------------------------------------------------
+    # Commands
+    # ------------------------------------------------------------------
+
+    def _run_once(self, command: str, timeout: float) -> Optional[ShellResult]:
+        """Run one framed command. Returns None if the shell died or hung."""
+        if not self.alive():
+            self._start()
+
+        framed = f"( {command} ) </dev/null 2>&1; printf '\\n{self.marker} %d\\n' $?\n"
+        try:
+            self._proc.stdin.write(framed)
+            self._proc.stdin.flush()
+        except (OSError, ValueError):
+            return None
+
+        prefix = f"{self.marker} "
+        chunks = []
+        while True:
+            try:
+                line = self._lines.get(timeout=timeout)
+            except queue.Empty:
+                # Hung command: the stream is out of sync, start over
+                self._proc.kill()
+                return None
+            if line is None:
+                return None
+            if line.startswith(prefix):
+                try:
+                    exit_code = int(line[len(prefix):].strip())
+                except ValueError:
+                    exit_code = -1
+                # Drop the newline printf added before the marker
+                output = ''.join(chunks)[:-1]
+                return ShellResult(exit_code, output)
+            chunks.append(line)
+
+    def run(self, command: str, timeout: Optional[float] = None, idempotent: bool = False) -> ShellResult:
+        """
+        Run a shell command string on the device.
+
+        Args:
+            command: Command line, already quoted for the device shell
+            timeout: Seconds to wait for the command (defaults to session timeout);
+                pass a long one for commands that walk a whole folder
+            idempotent: The command may safely run again if the shell died
+                or timed out before it reported back
+
+        Returns:
+            ShellResult: exit code -1 and empty output if the device is unreachable
+        """
+        timeout = self.timeout if timeout is None else timeout
+        with self._lock:
+            result = self._run_once(command, timeout)
+            if result is None and idempotent:
+                # Shell died: restart once and retry
+                self.close()
+                self.restarts += 1
+                result = self._run_once(command, timeout)
+            if result is None:
+                self.close()
+                return ShellResult(-1, '')
+            return result
+
+    def run_args(self, args: List[str], timeout: Optional[float] = None, idempotent: bool = False) -> ShellResult:
+        """Run a command given as an argument list; each argument is quoted."""
+        return self.run(' '.join(shlex.quote(a) for a in args), timeout=timeout, idempotent=idempotent)
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Resilient adb transport for PixelSync
+Every call the engine makes to the device goes through AdbTransport:
+pushes, shell commands, `exec-in` streams and device probes. It tells
+transient USB/adb errors apart from permanent ones, waits for the device
+to come back with bounded exponential backoff, and retries only the file
+that was affected. A circuit breaker stops the run instead of failing
+every remaining file when the device is gone for good.
+"""
+
+import re
+import subprocess
+import time
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Union
+from adb_session import AdbShellSession, ShellResult
+
+# Errors that go away once the cable / adb server recovers
+TRANSIENT_ERRORS = (
+    'device offline',
+    'no devices/emulators found',
+    'device still authorizing',
+    'device still connecting',
+    'error: closed',
+    'protocol fault',
+    'connection reset',
+    'broken pipe',
+    'cannot connect to daemon',
+    'daemon not running',
+    'failed to connect',
+    'transport error',
+    'timed out',
+    'not confirmed by device',  # Streamed data did not all arrive (exec-in)
+    'exec-in failed',
+)
+# error: device 'HT69...' not found (unplugged or still enumerating)
+DEVICE_NOT_FOUND = re.compile(r"device '[^']*' not found")
+
+# Errors that will fail the same way on every retry
+PERMANENT_ERRORS = (
+    'no space left on device',
+    'read-only file system',
+    'permission denied',
+    'no such file or directory',
+    'is a directory',
+    'unauthorized',
+    'insufficient permissions',
+    'unknown option',
+    'unrecognized option',
+    'not supported',
+)
+
+
+class PushResult(NamedTuple):
+    """Outcome of pushing one file."""
+    ok: bool
+    transient: bool      # Failure was caused by the connection, not the file
+    message: str
+    attempts: int
+
+
+def classify_adb_error(output: str) -> str:
+    """
+    Classify adb error output.
+
+    Returns:
+        'permanent' or 'transient'. Unknown errors count as permanent, so a
+        file that fails for its own reasons doesn't burn every retry and a
+        reconnect wait; no output at all (adb itself died) is transient.
+    """
+    text = output.lower()
+    if not text.strip():
+        return 'transient'
+    if any(pattern in text for pattern in PERMANENT_ERRORS):
+        return 'permanent'
+    if any(pattern in text for pattern in TRANSIENT_ERRORS) or DEVICE_NOT_FOUND.search(text):
+        return 'transient'
+    return 'permanent'
+
+
+class AdbTransport:
+    """
+    The device, as seen by the engine: pushes files with per-file retry,
+    reconnect backoff and a circuit breaker, and runs shell commands and
+    `exec-in` streams on it.
+
+    All device access goes through run() (one adb command), shell(),
+    exec_in() and push(), so a FakeDevice or another transport only has
+    to replace these. Between open_session() and close(), shell commands
+    go through one persistent `adb shell`.
+
+    Args:
+        adb_cmd: Base adb command
+        max_retries: Extra attempts per file after a transient failure
+        backoff_base: First reconnect wait in seconds (doubles each poll)
+        backoff_cap: Longest single wait between device polls
+        reconnect_timeout: Total seconds to wait for the device before giving up
+        breaker_threshold: Consecutive transient failures (across files) that
+            open the circuit and force a full reconnect wait
+        echo: Where status messages go (print, or a no-op to stay quiet)
+        session: Persistent shell to send shell commands through (see open_session)
+    """
+
+    def __init__(
+        self,
+        adb_cmd: List[str],
+        max_retries: int = 3,
+        backoff_base: float = 2.0,
+        backoff_cap: float = 60.0,
+        reconnect_timeout: float = 600.0,
+        breaker_threshold: int = 3,
+        echo: Callable[..., None] = print,
+        session: Optional[AdbShellSession] = None
+    ):
+        self.adb_cmd = list(adb_cmd)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.reconnect_timeout = reconnect_timeout
+        self.breaker_threshold = breaker_threshold
+        self.echo = echo
+        self.session = session
+
+        self.consecutive_transient = 0
+        self.reconnects = 0
+        self.tripped = False  # Device gone for good: stop the run
+
+    def wait_for_device(self, timeout: Optional[float] = None) -> bool:
+        """
+        Poll the device with bounded exponential backoff until it is online.
+
+        Returns:
+            bool: True once `adb get-state` reports 'device', False on timeout
+        """
+        timeout = self.reconnect_timeout if timeout is None else timeout
+        deadline = time.time() + timeout
+        delay = self.backoff_base
+
+        while True:
+            if self.state() == 'device':
+                return True
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                return False
+            self.echo(f"\n🔌 Device not available, retrying in {min(delay, remaining):.0f}s...", flush=True)
+            time.sleep(min(delay, remaining))
+            delay = min(delay * 2, self.backoff_cap)
+
+    def reconnect(self) -> bool:
+        """
+        Wait for the device after a transient failure; trips the breaker on timeout.
+
+        `reconnects` counts only real drops: the device was not answering.
+        """
+        if self.state() == 'device':
+            return True
+
+        # Circuit open: too many failures in a row, wait the full timeout
+        if self.consecutive_transient >= self.breaker_threshold:
+            timeout = self.reconnect_timeout
+        else:
+            timeout = min(self.reconnect_timeout, self.backoff_cap * 2)
+
+        if self.wait_for_device(timeout):
+            self.reconnects += 1
+            return True
+
+        self.tripped = True
+        return False
+
+    # ------------------------------------------------------------------
+    # Device access
+    # ------------------------------------------------------------------
+
+    def run(self, args: List[str], timeout: Optional[float] = None) -> subprocess.CompletedProcess:
+        """Run one adb command (e.g. ['push', src, dst]); a timeout or missing adb is reported as a failure."""
+        try:
+            return subprocess.run(self.adb_cmd + args, capture_output=True, text=True, timeout=timeout)
+        except subprocess.TimeoutExpired as e:
+            return subprocess.CompletedProcess(e.cmd, 1, '', 'timed out')
+        except OSError as e:
+            return subprocess.CompletedProcess(self.adb_cmd + args, 1, '', str(e))
+
+    def state(self, timeout: float = 10.0) -> str:
+        """Return `adb get-state` output ('device', 'offline', ...) or '' if unreachable."""
+        result = self.run(['get-state'], timeout=timeout)
+        return result.stdout.strip() if result.returncode == 0 else ''
+
+    def devices(self) -> Dict[str, str]:
+        """Start the adb server if needed and list devices: {serial: state ('device', 'unauthorized', ...)}."""
+        self.run(['start-server'], timeout=30)
+        result = self.run(['devices'], timeout=15)
+        devices: Dict[str, str] = {}
+        for line in result.stdout.strip().split('\n')[1:]:
+            parts = line.split('\t')
+            if len(parts) == 2:
+                devices[parts[0].strip()] = parts[1].strip()
+        return devices
+
+    def open_session(self) -> None:
+        """Send shell commands through one persistent `adb shell` until close()."""
+        if self.session is None:
+            self.session = AdbShellSession(self.adb_cmd)
+
+    def close(self) -> None:
+        """Exit the persistent shell, if one is open."""
+        if self.session is not None:
+            self.session.close()
+            self.session = None
+
+    def shell(
+        self,
+        command: str,
+        timeout: Optional[float] = None,
+        idempotent: bool = False,
+        persistent: bool = True
+    ) -> ShellResult:
+        """
+        Run a shell command string on the device.
+
+        Args:
+            command: Command line, already quoted for the device shell
+            timeout: Seconds to wait for the command
+            idempotent: Safe to run twice: the persistent shell may retry it
+                after the shell died (see AdbShellSession.run)
+            persistent: Use the persistent shell when one is open. False runs
+                a separate `adb shell`, whose error output tells a dropped
+                connection apart from a failed command (for pushes)
+
+        Returns:
+            ShellResult: exit code and output (stderr included)
+        """
+        if persistent and self.session is not None:
+            return self.session.run(command, timeout=timeout, idempotent=idempotent)
+        result = self.run(['shell', command], timeout=timeout)
+        return ShellResult(result.returncode, result.stdout + result.stderr)
+
+    def exec_in(self, command: str, data: Union[bytes, Iterable[bytes]], timeout: Optional[float] = None) -> str:
+        """
+        Feed data to a device command's stdin through `adb exec-in`.
+
+        data is bytes, or chunks written as they are produced (e.g. read from
+        a zip member); an exception raised while producing them stops adb
+        and is passed on to the caller.
+
+        Returns:
+            adb's error output, '' on success
+        """
+        chunks = [data] if isinstance(data, bytes) else data
+        try:
+            process = subprocess.Popen(self.adb_cmd + ['exec-in', command], stdin=subprocess.PIPE,
+                                       stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        except OSError as e:
+            return str(e)
+        try:
+            for chunk in chunks:
+                try:
+                    process.stdin.write(chunk)
+                except OSError:
+                    break  # adb exited early: its error output says why
+        except BaseException:
+            process.kill()
+            process.communicate()
+            raise
+        try:
+            _, stderr = process.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.communicate()
+            return 'timed out'
+        if process.returncode != 0:
+            return stderr.decode(errors='replace').strip() or 'exec-in failed'
+        return ''
+
+    # ------------------------------------------------------------------
+    # Pushes
+    # ------------------------------------------------------------------
+
+    def push(self, local_path: str, remote_path: str, extra_args: Optional[List[str]] = None) -> PushResult:
+        """
+        Push one file, retrying only on transient errors.
+
+        Returns:
+            PushResult: ok=False and transient=True with `tripped` set means
+            the device did not come back and the run should stop.
+        """
+        args = ['push'] + (extra_args or []) + [local_path, remote_path]
+        attempts = 0
+        message = ''
+
+        while attempts <= self.max_retries and not self.tripped:
+            attempts += 1
+            result = self.run(args)
+            if result.returncode == 0:
+                self.consecutive_transient = 0
+                return PushResult(True, False, '', attempts)
+
+            message = (result.stderr or result.stdout).strip()
+            if classify_adb_error(message) == 'permanent':
+                return PushResult(False, False, message, attempts)
+
+            self.consecutive_transient += 1
+            if not self.reconnect():
+                break
+
+        return PushResult(False, True, message, attempts)
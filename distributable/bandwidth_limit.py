@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Host-side bandwidth limit for PixelSync
+A token bucket shared by all push workers, with an optional time-of-day
+schedule, so a sync can run all day without saturating the source drive
+and USB bus.
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+PACE_CHUNK_BYTES = 256 * 1024  # Pieces a limited push is cut into, so the limit holds within one file
+
+
+def _minutes(hhmm: str) -> int:
+    hours, minutes = hhmm.strip().split(':')
+    return int(hours) * 60 + int(minutes)
+
+
+def parse_schedule(
+    entries: Optional[List[Dict[str, Any]]],
+    echo: Callable[..., None] = print
+) -> List[Tuple[int, int, Optional[float]]]:
+    """
+    Parse [{"from": "09:00", "to": "18:00", "mb_s": 15}, ...] into
+    (start minute, end minute, MB/s) windows. "mb_s": null means unlimited.
+    Invalid entries are reported and ignored.
+    """
+    windows = []
+    for entry in entries or []:
+        try:
+            mb_s = entry.get('mb_s')
+            windows.append((_minutes(entry['from']), _minutes(entry['to']),
+                            float(mb_s) if mb_s is not None else None))
+        except (KeyError, ValueError, TypeError, AttributeError) as e:
+            echo(f"⚠️  Ignoring invalid bandwidth schedule entry {entry}: {e}")
+    return windows
+
+
+class BandwidthLimiter:
+    """
+    Token bucket in bytes, refilled at the MB/s limit in force right now.
+
+    Pushes send their data through paced(), which cuts it into
+    PACE_CHUNK_BYTES pieces and lets each piece go once the bucket has
+    paid for it, so the limit holds during a push and not only between
+    files. Pieces reserved by parallel pushes queue behind each other (the
+    bucket goes into debt), which keeps the total at the limit however
+    many pushes run at once. After an idle period, up to burst_seconds of
+    unused bandwidth may be spent at full speed.
+    """
+
+    def __init__(
+        self,
+        limit_mb_s: Optional[float] = None,
+        schedule: Optional[List[Dict[str, Any]]] = None,
+        burst_seconds: float = 2.0,
+        echo: Callable[..., None] = print
+    ):
+        self.default_mb_s = limit_mb_s if limit_mb_s and limit_mb_s > 0 else None
+        self.windows = parse_schedule(schedule, echo)
+        self.burst_seconds = burst_seconds
+        self.tokens = 0.0
+        self.updated = time.monotonic()
+        self.throttled_seconds = 0.0  # Wall-clock time with at least one push held back
+        self._blocked_until = self.updated
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.default_mb_s is not None or bool(self.windows)
+
+    def limit_mb_s(self, now: Optional[float] = None) -> Optional[float]:
+        """MB/s limit for the given time (default: now); None means unlimited."""
+        local = time.localtime(now)
+        minute = local.tm_hour * 60 + local.tm_min
+        for start, end, mb_s in self.windows:
+            inside = start <= minute < end if start <= end else (minute >= start or minute < end)
+            if inside:
+                return mb_s if mb_s and mb_s > 0 else None
+        return self.default_mb_s
+
+    def acquire(self, size_bytes: int) -> float:
+        """
+        Take size_bytes from the bucket, sleeping until they are paid for.
+
+        Returns:
+            Seconds spent waiting
+        """
+        mb_s = self.limit_mb_s()
+        if mb_s is None:
+            return 0.0
+
+        rate = mb_s * 1024 * 1024
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.tokens + (now - self.updated) * rate, rate * self.burst_seconds)
+            self.updated = now
+            # Reserve under the lock, sleep outside it: later callers queue behind this debt
+            self.tokens -= size_bytes
+            wait = max(-self.tokens, 0.0) / rate
+            if wait > 0:
+                self.throttled_seconds += max(now + wait - max(now, self._blocked_until), 0.0)
+                self._blocked_until = max(self._blocked_until, now + wait)
+
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def paced(self, data: Iterable[bytes]) -> Iterator[bytes]:
+        """Pass data through in pieces of at most PACE_CHUNK_BYTES, each once it is paid for."""
+        for chunk in data:
+            view = memoryview(chunk)
+            for start in range(0, len(view), PACE_CHUNK_BYTES):
+                piece = view[start:start + PACE_CHUNK_BYTES]
+                self.acquire(len(piece))
+                yield piece
+
+    def describe(self) -> str:
+        """Human-readable summary of the limit for the startup banner."""
+        parts = [f"{self.default_mb_s:g} MB/s" if self.default_mb_s else "unlimited"]
+        for start, end, mb_s in self.windows:
+            rate = f"{mb_s:g} MB/s" if mb_s else "unlimited"
+            parts.append(f"{start // 60:02d}:{start % 60:02d}-{end // 60:02d}:{end % 60:02d} {rate}")
+        return ", ".join(parts)
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Dry-run capacity planner for PixelSync
+Scans the source folder with the same keep/delete rules as a real sync and
+estimates storage-cap cycles and wall time, without touching the device or
+any file. Only directory entries (and zip central directories) are read, so
+100k-file folders take seconds.
+"""
+
+import math
+import os
+from typing import Any, Dict, List, NamedTuple, Optional, Set
+from pixel_sync_core import scan_source_folder
+from run_history import RunHistory
+from storage_scheduler import format_duration
+
+# Used when there is no run history yet (typical adb push over USB 2 / 3)
+ASSUMED_RATE_MB_S = 15.0
+BATCH_PAUSE_SECONDS = 10  # Pause between batches in transfer_to_pixel
+PER_FILE_SECONDS = 0.6  # adb process start + the 0.5 s pause after every push in push_file
+
+
+class TypeTotals(NamedTuple):
+    files: int
+    size_bytes: int
+
+
+class SourceScan(NamedTuple):
+    """Files a sync would push / delete, totalled by extension."""
+    keep: Dict[str, TypeTotals]
+    delete: Dict[str, TypeTotals]
+    ignored_files: int
+
+
+def scan_source(
+    folder: str,
+    keep_extensions: Set[str],
+    delete_extensions: Set[str],
+    zip_exports: bool = False
+) -> SourceScan:
+    """
+    Total files and bytes per extension from scan_source_folder, the scan
+    transfer_to_pixel runs (no file is opened; with zip_exports, photos
+    inside .zip files count as files to transfer).
+    """
+    listing = scan_source_folder(folder, keep_extensions, delete_extensions, zip_exports)
+    keep: Dict[str, List[int]] = {}
+    delete: Dict[str, List[int]] = {}
+
+    for k in listing.table.order:
+        totals = keep.setdefault(listing.table.ext(k), [0, 0])
+        totals[0] += 1
+        totals[1] += listing.table.sizes[k]
+    for path in listing.files_to_delete:
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            continue
+        totals = delete.setdefault(os.path.splitext(path)[1].lower(), [0, 0])
+        totals[0] += 1
+        totals[1] += size
+
+    return SourceScan(
+        {ext: TypeTotals(*v) for ext, v in keep.items()},
+        {ext: TypeTotals(*v) for ext, v in delete.items()},
+        listing.ignored_files
+    )
+
+
+def build_plan(scan: SourceScan, config: Dict[str, Any], history: Optional[RunHistory] = None) -> Dict[str, Any]:
+    """
+    Estimate cycles and wall time for pushing the files in `scan`.
+
+    Push rate and time spent waiting for Google Photos come from the run
+    history when there is one (measured rates already include the per-file
+    cost); otherwise ASSUMED_RATE_MB_S plus PER_FILE_SECONDS for every file
+    (shared by the parallel pushes) and one `sleep_minutes` wait per
+    storage cycle are used.
+    """
+    files = sum(t.files for t in scan.keep.values())
+    total_mb = sum(t.size_bytes for t in scan.keep.values()) / (1024 * 1024)
+    cap_mb = config['max_storage_gb'] * 1024
+    cycles = max(math.ceil(total_mb / cap_mb), 1) if files else 0
+    batches = math.ceil(files / config['batch_size']) if files else 0
+
+    measured = history.recent_rates() if history is not None else None
+    rate, stall_per_mb = measured if measured else (ASSUMED_RATE_MB_S, None)
+    limit = config.get('bandwidth_limit_mb_s')
+    if limit and limit > 0:
+        rate = min(rate, limit)
+
+    push_seconds = total_mb / rate if rate > 0 else 0.0
+    overhead_seconds = 0.0 if measured else files * PER_FILE_SECONDS / max(config.get('push_workers', 1), 1)
+    pause_seconds = max(batches - 1, 0) * BATCH_PAUSE_SECONDS
+    if stall_per_mb is not None:
+        wait_seconds = stall_per_mb * total_mb
+    else:
+        wait_seconds = max(cycles - 1, 0) * config['sleep_minutes'] * 60
+
+    return {
+        'files': files,
+        'total_mb': total_mb,
+        'cycles': cycles,
+        'batches': batches,
+        'rate_mb_s': rate,
+        'measured': measured is not None,
+        'push_seconds': push_seconds,
+        'overhead_seconds': overhead_seconds,
+        'pause_seconds': pause_seconds,
+        'wait_seconds': wait_seconds,
+        'wall_seconds': push_seconds + overhead_seconds + pause_seconds + wait_seconds,
+    }
+
+
+def print_plan(scan: SourceScan, plan: Dict[str, Any], config: Dict[str, Any]) -> None:
+    """Print the planner report."""
+    print(f"📋 Sync plan for {config['source_folder']} (dry run - nothing is pushed or deleted)\n")
+
+    if scan.keep:
+        print("📦 Files to transfer:")
+        for ext, totals in sorted(scan.keep.items(), key=lambda kv: -kv[1].size_bytes):
+            print(f"   {ext or '(none)':<8} {totals.files:>8} files  {totals.size_bytes / (1024 ** 3):>9.2f} GB")
+        print(f"   {'total':<8} {plan['files']:>8} files  {plan['total_mb'] / 1024:>9.2f} GB")
+    else:
+        print("📭 No files to transfer")
+
+    if scan.delete:
+        count = sum(t.files for t in scan.delete.values())
+        size_mb = sum(t.size_bytes for t in scan.delete.values()) / (1024 * 1024)
+        print(f"\n🗑️  Would delete {count} unwanted files ({size_mb:.1f} MB): {', '.join(sorted(scan.delete))}")
+    if scan.ignored_files:
+        print(f"ℹ️  {scan.ignored_files} files with other extensions would be left alone")
+
+    if not plan['files']:
+        return
+
+    source = "measured in earlier runs" if plan['measured'] else "assumed, no run history yet"
+    print(f"\n💾 Storage cap: {config['max_storage_gb']} GB -> {plan['cycles']} fill cycles, "
+          f"{plan['batches']} batches of {config['batch_size']}")
+    print(f"🚀 Push rate: {plan['rate_mb_s']:.1f} MB/s ({source})")
+    print(f"⏱️  Pushing: {format_duration(plan['push_seconds'])}, "
+          f"per-file overhead: {format_duration(plan['overhead_seconds'])}, "
+          f"pauses: {format_duration(plan['pause_seconds'])}, "
+          f"waiting for Google Photos: {format_duration(plan['wait_seconds'])}")
+    print(f"🏁 Estimated wall time: {format_duration(plan['wall_seconds'])}")
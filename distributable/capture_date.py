@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+"""
+Capture date reader for PixelSync
+Reads only the headers needed to find when a photo/video was taken
+(JPEG EXIF, HEIC EXIF item, MOV/MP4 movie header), never whole files,
+and caches results by path, size and mtime.
+"""
+
+import calendar
+import json
+import os
+import struct
+import time
+from array import array
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, Optional, Sequence, Tuple
+
+DATE_CACHE_FILE = 'pixelsync_dates.json'
+MISSING_DATE = float('inf')  # Files that vanished mid-run sort last (their push fails on its own)
+
+# Seconds between 1904-01-01 (QuickTime epoch) and 1970-01-01
+QUICKTIME_EPOCH_OFFSET = 2082844800
+
+TAG_DATETIME = 0x0132
+TAG_EXIF_IFD = 0x8769
+TAG_DATETIME_ORIGINAL = 0x9003
+TAG_DATETIME_DIGITIZED = 0x9004
+# UTC offset ("+01:00") of DateTime, DateTimeOriginal and DateTimeDigitized (EXIF 2.31)
+OFFSET_TAGS = {TAG_DATETIME: 0x9010, TAG_DATETIME_ORIGINAL: 0x9011, TAG_DATETIME_DIGITIZED: 0x9012}
+
+
+# ----------------------------------------------------------------------
+# EXIF / TIFF
+# ----------------------------------------------------------------------
+
+def _read_ifd(tiff: bytes, offset: int, endian: str) -> Dict[int, Tuple[int, int, bytes]]:
+    """Read one IFD: {tag: (type, count, 4-byte value/offset field)}."""
+    entries = {}
+    if offset + 2 > len(tiff):
+        return entries
+    (count,) = struct.unpack_from(endian + 'H', tiff, offset)
+    for i in range(count):
+        pos = offset + 2 + i * 12
+        if pos + 12 > len(tiff):
+            break
+        tag, typ, n = struct.unpack_from(endian + 'HHI', tiff, pos)
+        entries[tag] = (typ, n, tiff[pos + 8:pos + 12])
+    return entries
+
+
+def _ascii_value(tiff: bytes, entry: Tuple[int, int, bytes], endian: str) -> Optional[str]:
+    typ, count, field = entry
+    if typ != 2:
+        return None
+    if count <= 4:
+        raw = field[:count]
+    else:
+        (offset,) = struct.unpack(endian + 'I', field)
+        raw = tiff[offset:offset + count]
+    return raw.split(b'\0', 1)[0].decode('ascii', errors='ignore').strip() or None
+
+
+def _parse_utc_offset(value: Optional[str]) -> Optional[int]:
+    """Seconds east of UTC from an EXIF offset like "+01:00", None if missing or malformed."""
+    if not value or len(value) < 6 or value[0] not in '+-' or value[3] != ':':
+        return None
+    try:
+        seconds = int(value[1:3]) * 3600 + int(value[4:6]) * 60
+    except ValueError:
+        return None
+    return -seconds if value[0] == '-' else seconds
+
+
+def _parse_exif_datetime(value: Optional[str], utc_offset: Optional[int] = None) -> Optional[float]:
+    """
+    Epoch seconds of an EXIF "YYYY:MM:DD HH:MM:SS" wall-clock time.
+
+    With the UTC offset recorded next to it, the result is exact, like the
+    UTC movie header times; without one, the time is taken as local time
+    (as the camera clock usually is).
+    """
+    if not value:
+        return None
+    try:
+        parsed = time.strptime(value[:19], '%Y:%m:%d %H:%M:%S')
+        if utc_offset is not None:
+            return float(calendar.timegm(parsed) - utc_offset)
+        return time.mktime(parsed)
+    except (ValueError, OverflowError):
+        return None
+
+
+def parse_tiff_date(tiff: bytes) -> Optional[float]:
+    """Capture time from a TIFF/EXIF block: DateTimeOriginal, then DateTime (with OffsetTime* if present)."""
+    if tiff[:2] == b'II':
+        endian = '<'
+    elif tiff[:2] == b'MM':
+        endian = '>'
+    else:
+        return None
+    if len(tiff) < 8:
+        return None
+
+    (ifd0_offset,) = struct.unpack_from(endian + 'I', tiff, 4)
+    ifd0 = _read_ifd(tiff, ifd0_offset, endian)
+
+    exif = {}
+    if TAG_EXIF_IFD in ifd0:
+        (exif_offset,) = struct.unpack(endian + 'I', ifd0[TAG_EXIF_IFD][2])
+        exif = _read_ifd(tiff, exif_offset, endian)
+
+    def offset_of(tag: int) -> Optional[int]:
+        entry = exif.get(OFFSET_TAGS[tag])
+        return _parse_utc_offset(_ascii_value(tiff, entry, endian)) if entry else None
+
+    for tag in (TAG_DATETIME_ORIGINAL, TAG_DATETIME_DIGITIZED):
+        if tag in exif:
+            date = _parse_exif_datetime(_ascii_value(tiff, exif[tag], endian), offset_of(tag))
+            if date:
+                return date
+
+    if TAG_DATETIME in ifd0:
+        return _parse_exif_datetime(_ascii_value(tiff, ifd0[TAG_DATETIME], endian), offset_of(TAG_DATETIME))
+    return None
+
+
+def read_jpeg_date(f: BinaryIO) -> Optional[float]:
+    """Walk JPEG segment headers up to the image data, parse the APP1 EXIF block."""
+    if f.read(2) != b'\xff\xd8':
+        return None
+    while True:
+        header = f.read(4)
+        if len(header) < 4 or header[0] != 0xFF:
+            return None
+        marker = header[1]
+        (length,) = struct.unpack('>H', header[2:4])
+        if marker == 0xDA:  # Start of scan: no EXIF before the image data
+            return None
+        if marker == 0xE1:
+            payload = f.read(length - 2)
+            if payload.startswith(b'Exif\0\0'):
+                return parse_tiff_date(payload[6:])
+        else:
+            f.seek(length - 2, os.SEEK_CUR)
+
+
+# ----------------------------------------------------------------------
+# ISO-BMFF (HEIC / MOV / MP4)
+# ----------------------------------------------------------------------
+
+def iter_boxes(f: BinaryIO, start: int, end: int) -> Iterator[Tuple[bytes, int, int]]:
+    """Yield (type, payload start, box end) for each box between start and end, reading headers only."""
+    pos = start
+    while pos + 8 <= end:
+        f.seek(pos)
+        header = f.read(8)
+        if len(header) < 8:
+            return
+        size, box_type = struct.unpack('>I4s', header)
+        payload = pos + 8
+        if size == 1:
+            large = f.read(8)
+            if len(large) < 8:
+                return
+            (size,) = struct.unpack('>Q', large)
+            payload = pos + 16
+        elif size == 0:
+            size = end - pos
+        if size < payload - pos:
+            return
+        yield box_type, payload, pos + size
+        pos += size
+
+
+def _find_box(f: BinaryIO, start: int, end: int, wanted: bytes) -> Optional[Tuple[int, int]]:
+    for box_type, payload, box_end in iter_boxes(f, start, end):
+        if box_type == wanted:
+            return payload, box_end
+    return None
+
+
+def _read_uint(data: bytes, pos: int, size: int) -> Tuple[int, int]:
+    if size == 0:
+        return 0, pos
+    return int.from_bytes(data[pos:pos + size], 'big'), pos + size
+
+
+def _heic_exif_location(f: BinaryIO, meta_start: int, meta_end: int) -> Optional[Tuple[int, int]]:
+    """Find (file offset, length) of the Exif item inside a HEIC 'meta' box."""
+    # meta is a FullBox: skip version/flags
+    iinf = _find_box(f, meta_start + 4, meta_end, b'iinf')
+    iloc = _find_box(f, meta_start + 4, meta_end, b'iloc')
+    if not iinf or not iloc:
+        return None
+
+    # Item info: look for the item whose type is 'Exif'
+    f.seek(iinf[0])
+    data = f.read(iinf[1] - iinf[0])
+    version = data[0]
+    pos = 4 + (2 if version == 0 else 4)
+    exif_id = None
+    while pos + 8 <= len(data):
+        size, box_type = struct.unpack_from('>I4s', data, pos)
+        if size < 8:
+            break
+        if box_type == b'infe':
+            infe_version = data[pos + 8]
+            if infe_version >= 2:
+                id_size = 2 if infe_version == 2 else 4
+                item_id, _ = _read_uint(data, pos + 12, id_size)
+                item_type = data[pos + 12 + id_size + 2:pos + 12 + id_size + 6]
+                if item_type == b'Exif':
+                    exif_id = item_id
+                    break
+        pos += size
+    if exif_id is None:
+        return None
+
+    # Item location: extent of that item
+    f.seek(iloc[0])
+    data = f.read(iloc[1] - iloc[0])
+    version = data[0]
+    offset_size, length_size = data[4] >> 4, data[4] & 0x0F
+    base_offset_size = data[5] >> 4
+    index_size = data[5] & 0x0F if version in (1, 2) else 0
+    id_size = 2 if version < 2 else 4
+    item_count, pos = _read_uint(data, 6, id_size)
+
+    # The counts come from the file: never loop past what the box can hold
+    item_bytes = id_size + (2 if version in (1, 2) else 0) + 2 + base_offset_size + 2
+    extent_bytes = index_size + offset_size + length_size
+    item_count = min(item_count, max(len(data) - pos, 0) // item_bytes)
+
+    for _ in range(item_count):
+        item_id, pos = _read_uint(data, pos, id_size)
+        if version in (1, 2):
+            pos += 2  # construction_method
+        pos += 2  # data_reference_index
+        base_offset, pos = _read_uint(data, pos, base_offset_size)
+        extent_count, pos = _read_uint(data, pos, 2)
+        extent_count = min(extent_count, max(len(data) - pos, 0) // extent_bytes if extent_bytes else 1)
+        extents = []
+        for _ in range(extent_count):
+            _, pos = _read_uint(data, pos, index_size)
+            extent_offset, pos = _read_uint(data, pos, offset_size)
+            extent_length, pos = _read_uint(data, pos, length_size)
+            extents.append((base_offset + extent_offset, extent_length))
+        if item_id == exif_id and extents:
+            return extents[0]
+    return None
+
+
+def read_isobmff_date(f: BinaryIO, file_size: int) -> Optional[float]:
+    """Capture time of HEIC (EXIF item) or MOV/MP4 (movie header creation time)."""
+    meta = _find_box(f, 0, file_size, b'meta')
+    if meta:
+        location = _heic_exif_location(f, meta[0], meta[1])
+        if location:
+            offset, length = location
+            f.seek(offset)
+            item = f.read(min(length, 256 * 1024))
+            if len(item) >= 4:
+                # Exif item starts with the offset to the TIFF header
+                (tiff_offset,) = struct.unpack('>I', item[:4])
+                date = parse_tiff_date(item[4 + tiff_offset:])
+                if date:
+                    return date
+
+    moov = _find_box(f, 0, file_size, b'moov')
+    if moov:
+        mvhd = _find_box(f, moov[0], moov[1], b'mvhd')
+        if mvhd:
+            f.seek(mvhd[0])
+            data = f.read(12)
+            if len(data) == 12:
+                if data[0] == 1:
+                    (created,) = struct.unpack('>Q', data[4:12])
+                else:
+                    (created,) = struct.unpack('>I', data[4:8])
+                if created > QUICKTIME_EPOCH_OFFSET:
+                    return float(created - QUICKTIME_EPOCH_OFFSET)
+    return None
+
+
+def read_capture_date(path: str) -> Optional[float]:
+    """Capture time (epoch seconds) from file headers, or None if not found."""
+    try:
+        with open(path, 'rb') as f:
+            head = f.read(12)
+            f.seek(0)
+            if head[:2] == b'\xff\xd8':
+                return read_jpeg_date(f)
+            if head[4:8] in (b'ftyp', b'moov', b'wide', b'mdat', b'free'):
+                return read_isobmff_date(f, os.fstat(f.fileno()).st_size)
+    except (OSError, struct.error, IndexError, ValueError):
+        return None
+    return None
+
+
+# ----------------------------------------------------------------------
+# Cache and ordering
+# ----------------------------------------------------------------------
+
+class DateCache:
+    """{path: [size, mtime, capture date]} kept in DATE_CACHE_FILE between runs."""
+
+    def __init__(self, path: str = DATE_CACHE_FILE, echo: Callable[..., None] = print):
+        self.path = path
+        self.echo = echo
+        self.entries: Dict[str, list] = {}
+        self.dirty = False
+        if os.path.exists(path):
+            try:
+                with open(path, 'r') as f:
+                    self.entries = json.load(f)
+            except Exception as e:
+                self.echo(f"⚠️  Error loading date cache: {e}")
+
+    def capture_date(self, path: str) -> float:
+        """
+        Cached capture date, reading headers only on a miss. Falls back to
+        mtime, or to MISSING_DATE (not cached) when the file is gone.
+        """
+        try:
+            st = os.stat(path)
+        except OSError:
+            return MISSING_DATE
+        cached = self.entries.get(path)
+        if cached and cached[0] == st.st_size and cached[1] == st.st_mtime:
+            return cached[2]
+
+        date = read_capture_date(path) or st.st_mtime
+        self.entries[path] = [st.st_size, st.st_mtime, date]
+        self.dirty = True
+        return date
+
+    def save(self, keep: Optional[Iterable[str]] = None) -> None:
+        """Write the cache, dropping entries not in `keep` (files already synced)."""
+        if keep is not None:
+            keep_set = set(keep)
+            stale = [p for p in self.entries if p not in keep_set]
+            for p in stale:
+                del self.entries[p]
+            self.dirty = self.dirty or bool(stale)
+        if not self.dirty:
+            return
+        try:
+            with open(self.path, 'w') as f:
+                json.dump(self.entries, f)
+            self.dirty = False
+        except Exception as e:
+            self.echo(f"⚠️  Error saving date cache: {e}")
+
+
+def capture_dates(paths: Sequence[str], cache: Optional[DateCache] = None) -> array:
+    """Capture dates of paths, in the same order; the cache is saved and pruned to these paths."""
+    cache = cache or DateCache()
+    dates = array('d', (cache.capture_date(p) for p in paths))
+    cache.save(keep=paths)
+    return dates
+
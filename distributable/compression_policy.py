@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Transfer compression policy for PixelSync
+Chooses `adb push -z <algorithm>` per file type. PNG screenshots and GIFs
+compress well, HEIC/MOV/JPG are already compressed and only get slower.
+"""
+
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional, Tuple
+
+COMPRESSION_MODES = ('off', 'policy', 'auto')
+
+# Static policy: (algorithm, minimum file size in bytes to bother)
+DEFAULT_COMPRESSION_RULES: Dict[str, Tuple[str, int]] = {
+    '.png': ('lz4', 256 * 1024),
+    '.gif': ('lz4', 256 * 1024),
+    '.heic': ('none', 0),
+    '.jpg': ('none', 0),
+    '.jpeg': ('none', 0),
+    '.mov': ('none', 0),
+    '.mp4': ('none', 0),
+}
+
+# Options measured in auto mode (brotli is too slow to ever win over USB 2)
+AUTO_CANDIDATES = ('none', 'lz4', 'zstd')
+
+# Auto mode measures small and large files of a type separately
+SMALL_FILE_BYTES = 1024 * 1024
+
+# adb output when the client or the device's adbd can't do compressed push
+UNSUPPORTED_MARKERS = ('unknown option', 'unrecognized option', 'not supported', 'compression')
+
+
+def push_args(algorithm: str) -> List[str]:
+    """Extra `adb push` arguments for an algorithm."""
+    if algorithm == 'none':
+        return []
+    return ['-z', algorithm]
+
+
+class CompressionPolicy:
+    """
+    Picks a compression algorithm for each push.
+
+    Modes:
+        off:    never pass -z (works with every adb / device)
+        policy: use DEFAULT_COMPRESSION_RULES (or custom rules) by extension and size
+        auto:   for each extension and size class (below/above 1 MB), try
+                every candidate on the first `trial_files` files, then use
+                the one with the best MB/s
+    """
+
+    def __init__(
+        self,
+        mode: str = 'off',
+        rules: Optional[Dict[str, Tuple[str, int]]] = None,
+        trial_files: int = 2,
+        echo: Callable[..., None] = print
+    ):
+        if mode not in COMPRESSION_MODES:
+            echo(f"⚠️  Unknown compression mode '{mode}', using 'off'")
+            mode = 'off'
+        self.mode = mode
+        self.rules = {k.lower(): v for k, v in (rules or DEFAULT_COMPRESSION_RULES).items()}
+        self.trial_files = trial_files
+        self.supported = True
+
+        # ((ext, size class), algorithm) -> [bytes, seconds, files]
+        self._stats: Dict[Tuple[Tuple[str, str], str], List[float]] = defaultdict(lambda: [0.0, 0.0, 0])
+        self._chosen: Dict[Tuple[str, str], str] = {}
+
+    @staticmethod
+    def _type_key(ext: str, size_bytes: int) -> Tuple[str, str]:
+        return ext.lower(), 'small' if size_bytes < SMALL_FILE_BYTES else 'large'
+
+    def choose(self, ext: str, size_bytes: int) -> str:
+        """Algorithm to use for a file with this extension and size."""
+        if self.mode == 'off' or not self.supported:
+            return 'none'
+
+        ext = ext.lower()
+        if self.mode == 'policy':
+            algorithm, min_size = self.rules.get(ext, ('none', 0))
+            return algorithm if size_bytes >= min_size else 'none'
+
+        # auto: finish the trials for this type, then stick with the winner
+        key = self._type_key(ext, size_bytes)
+        if key in self._chosen:
+            return self._chosen[key]
+        for algorithm in AUTO_CANDIDATES:
+            if self._stats[(key, algorithm)][2] < self.trial_files:
+                return algorithm
+
+        self._chosen[key] = max(AUTO_CANDIDATES, key=lambda a: self.throughput(key, a))
+        return self._chosen[key]
+
+    def record(self, ext: str, algorithm: str, size_bytes: int, seconds: float) -> None:
+        """Record a successful push for the auto-selection statistics."""
+        stats = self._stats[(self._type_key(ext, size_bytes), algorithm)]
+        stats[0] += size_bytes
+        stats[1] += max(seconds, 1e-6)
+        stats[2] += 1
+
+    def throughput(self, key: Tuple[str, str], algorithm: str) -> float:
+        """Measured MB/s for an (extension, size class) / algorithm pair (0 if untested)."""
+        size_bytes, seconds, _ = self._stats[(key, algorithm)]
+        return size_bytes / (1024 * 1024) / seconds if seconds else 0.0
+
+    def check_unsupported(self, algorithm: str, message: str) -> bool:
+        """
+        Detect a failed compressed push caused by missing -z support.
+
+        Turns compression off for the rest of the run and returns True so the
+        caller can retry the file uncompressed.
+        """
+        if algorithm == 'none':
+            return False
+        text = message.lower()
+        if any(marker in text for marker in UNSUPPORTED_MARKERS):
+            self.supported = False
+            return True
+        return False
+
+    def summary(self) -> List[str]:
+        """One line per file type with the chosen algorithm and measured speeds."""
+        lines = []
+        for key, algorithm in sorted(self._chosen.items()):
+            speeds = ', '.join(f"{a} {self.throughput(key, a):.1f}" for a in AUTO_CANDIDATES)
+            lines.append(f"{key[0]} ({key[1]}): {algorithm} (MB/s: {speeds})")
+        return lines
@@ -21,7 +21,22 @@ DEFAULT_CONFIG = {
     "max_storage_gb": 10.0,
     "sleep_minutes": 15,
     "keep_extensions": [".heic", ".mov", ".jpg", ".jpeg", ".png", ".mp4", ".gif", ".HEIC", ".MOV", ".JPG", ".JPEG", ".PNG", ".MP4", ".GIF"],
-    "delete_extensions": [".aae", ".xmp", ".zip", ".DS_Store", ".dng", ".AAE", ".XMP", ".ZIP", ".DNG"]
+    "delete_extensions": [".aae", ".xmp", ".zip", ".DS_Store", ".dng", ".AAE", ".XMP", ".ZIP", ".DNG"],
+    "compression": "off",  # off, policy (by file type) or auto (measure and pick fastest)
+    "skip_unchanged": True,  # Don't re-send files an interrupted run already pushed
+    "push_workers": 1,  # Files pushed at the same time
+    "auto_tune": False,  # Tune batch_size and push_workers from run history
+    "upload_order": "none",  # none, name or date (oldest capture date first)
+    "dedup": "quarantine",  # off, quarantine (move to _duplicates/) or delete
+    "bandwidth_limit_mb_s": None,  # Max push rate in MB/s (None = unlimited)
+    "bandwidth_schedule": [],  # e.g. [{"from": "09:00", "to": "18:00", "mb_s": 15}]
+    "resumable_min_mb": 512,  # Push files this big in resumable chunks (0 = never)
+    "health_throttle": True,  # Slow down / pause when the Pixel is hot or low on battery
+    "max_battery_temp_c": 42.0,  # Battery temperature where throttling starts
+    "integrity_check": True,  # Move truncated/incomplete exports to _invalid/ instead of sending them
+    "prefetch_mb": 256,  # Read upcoming files ahead from slow source drives (0 = off)
+    "rename_collisions": True,  # Push as IMG_0001_<hash>.HEIC when a different IMG_0001.HEIC is on the Pixel
+    "zip_exports": True  # Send photos straight out of .zip exports instead of deleting the archives
 }
 
 
@@ -143,6 +158,10 @@ def setup_wizard(adb_path: str = 'adb') -> Dict[str, Any]:
 
     print(f"✅ Batch size: {config['batch_size']}")
 
+    auto_tune = input("\nLet PixelSync tune batch size and parallel pushes automatically? (y/n): ").lower()
+    config['auto_tune'] = auto_tune == 'y'
+    print(f"✅ Auto-tune: {'on' if config['auto_tune'] else 'off'}")
+
     # Save configuration
     print("\n" + "="*60)
     print("Configuration complete!")
@@ -158,6 +177,13 @@ def setup_wizard(adb_path: str = 'adb') -> Dict[str, Any]:
     return config
 
 
+def with_defaults(config: Dict[str, Any]) -> Dict[str, Any]:
+    """Fill in settings added since the config file was written."""
+    for key, value in DEFAULT_CONFIG.items():
+        config.setdefault(key, value)
+    return config
+
+
 def get_config(adb_path: str = 'adb') -> Dict[str, Any]:
     """Get configuration, running setup wizard if needed."""
     config = load_config()
@@ -166,6 +192,8 @@ def get_config(adb_path: str = 'adb') -> Dict[str, Any]:
         print("No configuration found. Running setup wizard...\n")
         config = setup_wizard(adb_path)
 
+    config = with_defaults(config)
+
     # Ensure source folder exists
     os.makedirs(config['source_folder'], exist_ok=True)
 
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Local duplicate detection for PixelSync
+Finds identical files in the source folder before they are pushed:
+same size first, then a hash of the first and last 64 KB, then a full
+hash, each stage only for the files the previous one could not tell apart.
+"""
+
+import hashlib
+import os
+import re
+import shutil
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, Callable, Dict, List, Optional, Sequence, Tuple
+
+DEDUP_MODES = ('off', 'quarantine', 'delete')
+QUARANTINE_FOLDER = '_duplicates'
+
+PARTIAL_BYTES = 64 * 1024
+CHUNK_BYTES = 1024 * 1024
+
+# 'IMG_1234 (1).HEIC', 'IMG_1234 copy.HEIC', 'IMG_1234-1.HEIC'
+COPY_SUFFIX = re.compile(r'( \(\d+\)| copy( \d+)?|-\d+)$', re.IGNORECASE)
+
+
+def partial_hash_of(f: BinaryIO, size: int) -> str:
+    """Hash of the first and last PARTIAL_BYTES of an open file of `size` bytes."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f.read(PARTIAL_BYTES))
+    if size > PARTIAL_BYTES:
+        f.seek(max(size - PARTIAL_BYTES, PARTIAL_BYTES))
+        h.update(f.read(PARTIAL_BYTES))
+    return h.hexdigest()
+
+
+def partial_hash(path: str) -> str:
+    """Hash of the first and last PARTIAL_BYTES of a file."""
+    with open(path, 'rb') as f:
+        return partial_hash_of(f, os.fstat(f.fileno()).st_size)
+
+
+def full_hash(path: str) -> str:
+    h = hashlib.blake2b(digest_size=32)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_BYTES), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _refine(groups: List[List[int]], key: Callable[[int], str], workers: int) -> List[List[int]]:
+    """Split each group by key (computed in parallel); keep only groups with 2+ files."""
+    members = [k for group in groups for k in group]
+    if not members:
+        return []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        keys = dict(zip(members, pool.map(key, members)))
+
+    refined = []
+    for group in groups:
+        by_key: Dict[str, List[int]] = defaultdict(list)
+        for k in group:
+            by_key[keys[k]].append(k)
+        refined.extend(g for g in by_key.values() if len(g) > 1)
+    return refined
+
+
+def find_duplicates(
+    paths: Sequence[str],
+    workers: int = 4,
+    sizes: Optional[Sequence[int]] = None
+) -> List[List[int]]:
+    """
+    Group byte-identical files.
+
+    Args:
+        paths: Files to compare
+        workers: Threads used for hashing
+        sizes: File sizes in the same order, if already known
+
+    Returns:
+        Groups of 2+ positions in `paths` with identical content
+    """
+    by_size: Dict[int, List[int]] = defaultdict(list)
+    for k in range(len(paths)):
+        by_size[sizes[k] if sizes is not None else os.path.getsize(paths[k])].append(k)
+
+    groups = [g for g in by_size.values() if len(g) > 1]
+    groups = _refine(groups, lambda k: partial_hash(paths[k]), workers)
+    # Files that fit entirely in the partial hash are already proven identical
+    small = [g for g in groups if os.path.getsize(paths[g[0]]) <= 2 * PARTIAL_BYTES]
+    large = [g for g in groups if os.path.getsize(paths[g[0]]) > 2 * PARTIAL_BYTES]
+    return small + _refine(large, lambda k: full_hash(paths[k]), workers)
+
+
+def original_first(group: List[str]) -> List[str]:
+    """Order a duplicate group so the most 'original' name comes first."""
+    def rank(path: str) -> Tuple[bool, int, str]:
+        name = os.path.splitext(os.path.basename(path))[0]
+        return bool(COPY_SUFFIX.search(name)), len(name), name
+    return sorted(group, key=rank)
+
+
+def quarantine_file(path: str, quarantine_dir: str) -> str:
+    """Move a file into quarantine_dir without overwriting; returns the new path."""
+    os.makedirs(quarantine_dir, exist_ok=True)
+    destination = os.path.join(quarantine_dir, os.path.basename(path))
+    if os.path.exists(destination):
+        name, ext = os.path.splitext(os.path.basename(path))
+        destination = os.path.join(quarantine_dir, f"{name}.{partial_hash(path)[:8]}{ext}")
+    shutil.move(path, destination)
+    return destination
+
+
+def remove_duplicates(
+    paths: Sequence[str],
+    folder: str,
+    mode: str = 'quarantine',
+    workers: int = 4,
+    sizes: Optional[Sequence[int]] = None,
+    echo: Callable[..., None] = print
+) -> List[int]:
+    """
+    Drop or quarantine duplicate files before pushing.
+
+    Args:
+        paths: Files to check (all in `folder`)
+        folder: Source folder; quarantined files go to folder/_duplicates
+        mode: 'off', 'quarantine' (move aside) or 'delete'
+        workers: Threads used for hashing
+        sizes: File sizes in the same order, if already known
+        echo: Where messages go (default print)
+
+    Returns:
+        Positions in `paths` of the files that were removed
+    """
+    if mode not in DEDUP_MODES:
+        echo(f"⚠️  Unknown dedup mode '{mode}', using 'off'")
+        return []
+    if mode == 'off':
+        return []
+
+    groups = find_duplicates(paths, workers, sizes)
+    if not groups:
+        return []
+
+    removed = []
+    removed_bytes = 0
+    quarantine = os.path.join(folder, QUARANTINE_FOLDER)
+    for group in groups:
+        position = {paths[k]: k for k in group}
+        keep, *copies = original_first(list(position))
+        for copy in copies:
+            size = os.path.getsize(copy)
+            try:
+                if mode == 'delete':
+                    os.remove(copy)
+                else:
+                    quarantine_file(copy, quarantine)
+                removed.append(position[copy])
+                removed_bytes += size
+            except Exception as e:
+                echo(f"   ⚠️  Failed to remove duplicate {os.path.basename(copy)}: {e}")
+
+    action = 'Deleted' if mode == 'delete' else f"Moved to {QUARANTINE_FOLDER}/"
+    echo(f"♊ {action} {len(removed)} duplicate files ({removed_bytes / (1024 * 1024):.1f} MB not pushed)")
+    return removed
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Device health throttling for PixelSync
+The Pixel throttles hard when it is hot or on a weak charger, and pushing on
+top of the Google Photos upload then slows everything down (and causes adb
+drops). Between batches the engine asks this module whether to push fewer
+files at once or pause until the phone has cooled down / charged.
+"""
+
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+# Android PowerManager thermal status levels
+THERMAL_STATUS_NAMES = ('none', 'light', 'moderate', 'severe', 'critical', 'emergency', 'shutdown')
+THERMAL_MODERATE = 2
+THERMAL_SEVERE = 3
+
+
+class HealthDecision(NamedTuple):
+    """What to do before the next batch."""
+    max_workers: Optional[int]  # Cap on parallel pushes (None = no cap)
+    pause_seconds: float        # Wait this long, then sample again
+    reason: str                 # '' when the device is healthy
+
+    @property
+    def throttled(self) -> bool:
+        """True when pushing is held back (fewer pushes or a pause)."""
+        return bool(self.reason)
+
+
+HEALTHY = HealthDecision(None, 0.0, '')
+
+
+class HealthThrottle:
+    """
+    Turns device status samples (from get_device_status) into throttling decisions.
+
+    Args:
+        max_temp_c: Battery temperature above which only one push runs at a time
+        pause_temp_c: Battery temperature above which pushing pauses
+        min_battery: Pause below this level when not charging
+        pause_seconds: Length of one pause before sampling again
+        max_pause_seconds: Longest total pause before a batch; after that the
+            batch runs anyway with a single push
+        echo: Where state changes are reported (default print)
+    """
+
+    def __init__(
+        self,
+        max_temp_c: float = 42.0,
+        pause_temp_c: float = 45.0,
+        min_battery: int = 15,
+        pause_seconds: float = 120.0,
+        max_pause_seconds: float = 900.0,
+        echo: Callable[..., None] = print
+    ):
+        self.max_temp_c = max_temp_c
+        self.pause_temp_c = pause_temp_c
+        self.min_battery = min_battery
+        self.pause_seconds = pause_seconds
+        self.max_pause_seconds = max_pause_seconds
+        self.echo = echo
+
+        self.last_level: Optional[int] = None
+        self.last_reason = ''
+        self.events: List[str] = []
+        self.throttled_batches = 0
+        self._counted_batch = 0
+        self.paused_seconds = 0.0
+
+    @staticmethod
+    def describe(status: Dict[str, Any]) -> str:
+        parts = []
+        if status.get('battery_temp_c') is not None:
+            parts.append(f"{status['battery_temp_c']:.1f}°C")
+        thermal = status.get('thermal_status')
+        if thermal is not None and 0 <= thermal < len(THERMAL_STATUS_NAMES):
+            parts.append(f"thermal {THERMAL_STATUS_NAMES[thermal]}")
+        if status.get('battery_level') is not None:
+            charging = ", charging" if status.get('battery_plugged') else ""
+            parts.append(f"battery {status['battery_level']}%{charging}")
+        return ', '.join(parts)
+
+    def assess(self, status: Dict[str, Any]) -> HealthDecision:
+        """Decide how to push the next batch from one status sample."""
+        temp = status.get('battery_temp_c')
+        thermal = status.get('thermal_status') or 0
+        level = status.get('battery_level')
+        plugged = status.get('battery_plugged')
+        details = self.describe(status)
+
+        # A charger that can't keep up with pushing + uploading: level drops while plugged in
+        draining = (plugged and level is not None and self.last_level is not None
+                    and level < self.last_level)
+        if level is not None:
+            self.last_level = level
+
+        if thermal >= THERMAL_SEVERE or (temp is not None and temp >= self.pause_temp_c):
+            return HealthDecision(1, self.pause_seconds, f"too hot ({details})")
+        if level is not None and level < self.min_battery and plugged is False:
+            return HealthDecision(1, self.pause_seconds, f"battery low, not charging ({details})")
+        if thermal >= THERMAL_MODERATE or (temp is not None and temp >= self.max_temp_c):
+            return HealthDecision(1, 0.0, f"warm ({details})")
+        if draining:
+            return HealthDecision(1, 0.0, f"battery draining on charger ({details})")
+        return HEALTHY
+
+    def record(self, batch_number: int, decision: HealthDecision) -> None:
+        """Log a decision; prints only when the device state changes."""
+        if decision.reason and batch_number != self._counted_batch:
+            self.throttled_batches += 1
+            self._counted_batch = batch_number
+        # Compare the kind of problem, not the exact readings
+        kind = decision.reason.split(' (')[0]
+        if kind == self.last_reason:
+            return
+        self.last_reason = kind
+
+        if not decision.reason:
+            self.echo("🌡️  Device health back to normal - full speed")
+            self.events.append(f"batch {batch_number}: back to full speed")
+            return
+        action = f"pausing {decision.pause_seconds:.0f}s" if decision.pause_seconds else "one push at a time"
+        self.echo(f"🌡️  Device {decision.reason} - {action}")
+        self.events.append(f"batch {batch_number}: {action}, {decision.reason}")
+
+    def summary(self) -> str:
+        """One-line total for the end-of-run summary."""
+        paused = f", paused {self.paused_seconds / 60:.0f} min" if self.paused_seconds else ""
+        return f"Throttled {self.throttled_batches} batches for device health{paused}"
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Fake Pixel for tests and benchmarks.
+
+Usage (as an adb replacement):
+    python3 fake_device.py --root DIR [--mb-s N] [-s SERIAL] <adb command...>
+
+A FakeDevice is a local folder driven through the same adb commands the
+engine sends to a phone: push, pull, shell (one-off and persistent),
+exec-in and exec-out. Shell commands run in the host's `sh`, so device
+paths are host paths under the fake's root (use FakeDevice.path()), and
+`dumpsys`, `content`, `am` and `getprop` are answered by small stand-ins.
+Pushes can be throttled to a given MB/s to benchmark against a realistic
+link. Needs GNU or toybox-style coreutils (`stat -c`), i.e. Linux.
+
+    fake = FakeDevice('/tmp/fake_pixel', mb_s=30)
+    result = transfer_to_pixel('~/Photos', fake.path('/sdcard/DCIM/Camera/'), transport=fake.transport())
+"""
+
+import os
+import shlex
+import shutil
+import subprocess
+import sys
+import time
+from typing import List, Optional
+from adb_transport import AdbTransport
+
+TOOLS = ('dumpsys', 'content', 'am', 'getprop')
+COPY_CHUNK_BYTES = 1024 * 1024
+
+
+class FakeDevice:
+    """
+    Local folder that answers adb commands like a connected Pixel.
+
+    Args:
+        root: Folder holding the fake device's files
+        serial: Serial reported by `adb devices`
+        mb_s: Push / exec-in speed limit (None = as fast as the disk)
+        battery_level: Reported by `dumpsys battery`
+        battery_temp_c: Reported by `dumpsys battery`
+    """
+
+    def __init__(
+        self,
+        root: str,
+        serial: str = 'FAKE0001',
+        mb_s: Optional[float] = None,
+        battery_level: int = 80,
+        battery_temp_c: float = 30.0
+    ):
+        self.root = os.path.abspath(os.path.expanduser(root))
+        self.serial = serial
+        self.mb_s = mb_s
+        os.makedirs(self.path('/sdcard/DCIM/Camera'), exist_ok=True)
+
+        # Stand-ins for the Android tools the engine calls
+        bin_dir = os.path.join(self.root, '.bin')
+        os.makedirs(bin_dir, exist_ok=True)
+        for tool in TOOLS:
+            script = os.path.join(bin_dir, tool)
+            with open(script, 'w') as f:
+                f.write(f"#!/bin/sh\nexec {shlex.quote(sys.executable)} {shlex.quote(os.path.abspath(__file__))} "
+                        f"--root {shlex.quote(self.root)} --tool {tool} "
+                        f"--battery {battery_level} {battery_temp_c} \"$@\"\n")
+            os.chmod(script, 0o755)
+
+    def path(self, device_path: str) -> str:
+        """Host path standing in for a device path, e.g. '/sdcard/DCIM/Camera/'."""
+        return self.root + '/' + device_path.lstrip('/')
+
+    @property
+    def adb_cmd(self) -> List[str]:
+        cmd = [sys.executable, os.path.abspath(__file__), '--root', self.root]
+        if self.mb_s:
+            cmd += ['--mb-s', str(self.mb_s)]
+        return cmd + ['-s', self.serial]
+
+    def transport(self, **kwargs) -> AdbTransport:
+        """AdbTransport that talks to this fake instead of a phone."""
+        return AdbTransport(self.adb_cmd, **kwargs)
+
+
+# ----------------------------------------------------------------------
+# adb command emulation (runs in the fake's own process)
+# ----------------------------------------------------------------------
+
+def _copy(source, destination, mb_s: Optional[float]) -> None:
+    """Copy between binary streams, no faster than mb_s."""
+    start = time.time()
+    copied = 0
+    for chunk in iter(lambda: source.read(COPY_CHUNK_BYTES), b''):
+        destination.write(chunk)
+        copied += len(chunk)
+        if mb_s:
+            ahead = copied / (1024 * 1024) / mb_s - (time.time() - start)
+            if ahead > 0:
+                time.sleep(ahead)
+    destination.flush()
+
+
+def _shell_env(root: str) -> dict:
+    env = dict(os.environ)
+    env['PATH'] = os.path.join(root, '.bin') + os.pathsep + env.get('PATH', '')
+    return env
+
+
+def _tool(root: str, tool: str, battery: List[str], args: List[str]) -> int:
+    """Answer dumpsys / content / am / getprop."""
+    if tool == 'dumpsys' and args[:1] == ['battery']:
+        level, temp_c = battery
+        print("Current Battery Service state:\n  AC powered: false\n  USB powered: true")
+        print(f"  level: {level}\n  temperature: {int(float(temp_c) * 10)}")
+    elif tool == 'dumpsys' and args[:1] == ['thermalservice']:
+        print("Thermal Status: 0")
+    elif tool == 'getprop':
+        print('1' if args[:1] == ['sys.boot_completed'] else '')
+    elif tool == 'am':
+        print(f"Broadcasting: {' '.join(args)}")
+    elif tool == 'content' and args[:1] == ['query']:
+        # Every file under the queried folder counts as indexed
+        where = args[args.index('--where') + 1] if '--where' in args else ''
+        prefix = where.partition("'")[2].rpartition("%'")[0]
+        prefix = prefix.replace("''", "'").replace('\\_', '_').replace('\\%', '%').replace('\\\\', '\\')
+        folder = prefix.rstrip('/') or '/'
+        rows = sorted(os.path.join(folder, n) for n in os.listdir(folder)) if os.path.isdir(folder) else []
+        for i, path in enumerate(p for p in rows if os.path.isfile(p)):
+            print(f"Row: {i} _data={path}")
+    return 0
+
+
+def main(argv: List[str]) -> int:
+    root = None
+    mb_s = None
+    serial = 'FAKE0001'
+    while argv and argv[0].startswith('-') and argv[0] not in ('-h', '--help'):
+        option = argv.pop(0)
+        if option == '--root':
+            root = argv.pop(0)
+        elif option == '--mb-s':
+            mb_s = float(argv.pop(0))
+        elif option == '--tool':
+            tool = argv.pop(0)
+            battery = []
+            if argv[:1] == ['--battery']:
+                battery = argv[1:3]
+                argv = argv[3:]
+            return _tool(root, tool, battery, argv)
+        elif option == '-s':
+            serial = argv.pop(0)
+    if root is None or not argv:
+        print(__doc__)
+        return 1
+
+    command, args = argv[0], argv[1:]
+    env = _shell_env(root)
+    if command == 'devices':
+        print(f"List of devices attached\n{serial}\tdevice")
+    elif command == 'get-state':
+        print('device')
+    elif command in ('start-server', 'reconnect', 'wait-for-device'):
+        pass
+    elif command in ('push', 'pull'):
+        args = [a for i, a in enumerate(args) if not a.startswith('-') and not (i and args[i - 1] == '-z')]
+        source, destination = args[0], args[1]
+        if destination.endswith('/') or os.path.isdir(destination):
+            destination = os.path.join(destination, os.path.basename(source))
+        with open(source, 'rb') as src, open(destination, 'wb') as dst:
+            _copy(src, dst, mb_s if command == 'push' else None)
+        shutil.copystat(source, destination)
+        print(f"{source}: 1 file pushed.")
+    elif command in ('shell', 'exec-out') and args:
+        return subprocess.call(['sh', '-c', ' '.join(args)], env=env)
+    elif command == 'shell':
+        # Persistent shell: commands arrive on stdin
+        return subprocess.call(['sh'], env=env)
+    elif command == 'exec-in':
+        process = subprocess.Popen(['sh', '-c', ' '.join(args)], stdin=subprocess.PIPE, env=env)
+        try:
+            _copy(sys.stdin.buffer, process.stdin, mb_s)
+            process.stdin.close()
+        except BrokenPipeError:
+            pass
+        process.wait()
+        return 0  # Like adb, exec-in doesn't report the remote exit code
+    else:
+        print(f"adb: unknown command {command}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
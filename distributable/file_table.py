@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Compact file table for PixelSync
+Keeps the files of a run in typed arrays instead of lists of full paths:
+directory prefixes and extensions are interned once, sizes and states are
+machine integers, and the upload order is an index array. Million-file
+archive migrations stay small in memory, and state changes are O(1).
+"""
+
+import os
+from array import array
+from collections.abc import Sequence as SequenceABC
+from typing import Callable, Dict, Iterator, List, Sequence
+
+# File states
+PENDING = 0
+PUSHED = 1       # Pushed and deleted locally
+SKIPPED = 2      # Already on the Pixel, deleted locally
+FAILED = 3
+INVALID = 4      # Failed the integrity check, moved to _invalid/
+DUPLICATE = 5    # Identical copy of another file, not pushed
+
+STATE_NAMES = ('pending', 'pushed', 'skipped', 'failed', 'invalid', 'duplicate')
+
+
+class PathView(SequenceABC):
+    """Read-only sequence of full paths by file index, built on demand."""
+
+    def __init__(self, table: 'FileTable'):
+        self.table = table
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+    def __getitem__(self, index: int) -> str:
+        return self.table.path(index)
+
+
+class FileTable:
+    """
+    Files of one run, addressed by index.
+
+    Per file the table stores a directory id, the basename, an extension
+    code, the size and a state; `order` holds the indices in upload order.
+    """
+
+    def __init__(self):
+        self.dirs: List[str] = []
+        self.exts: List[str] = []  # Lowercased, e.g. '.heic'
+        self._dir_ids: Dict[str, int] = {}
+        self._ext_codes: Dict[str, int] = {}
+
+        self.names: List[str] = []
+        self.dir_id = array('I')
+        self.ext_code = array('H')
+        self.sizes = array('q')
+        self.states = array('B')
+        self.order = array('I')
+        self.counts = [0] * len(STATE_NAMES)
+        self.bytes_by_state = [0] * len(STATE_NAMES)
+
+    def add(self, path: str, size: int) -> int:
+        """Append a pending file; returns its index."""
+        folder, name = os.path.split(path)
+        ext = os.path.splitext(name)[1].lower()
+        dir_id = self._dir_ids.setdefault(folder, len(self.dirs))
+        if dir_id == len(self.dirs):
+            self.dirs.append(folder)
+        ext_code = self._ext_codes.setdefault(ext, len(self.exts))
+        if ext_code == len(self.exts):
+            self.exts.append(ext)
+
+        index = len(self.names)
+        self.names.append(name)
+        self.dir_id.append(dir_id)
+        self.ext_code.append(ext_code)
+        self.sizes.append(size)
+        self.states.append(PENDING)
+        self.order.append(index)
+        self.counts[PENDING] += 1
+        self.bytes_by_state[PENDING] += size
+        return index
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    # ------------------------------------------------------------------
+    # Per-file access
+    # ------------------------------------------------------------------
+
+    def path(self, index: int) -> str:
+        return os.path.join(self.dirs[self.dir_id[index]], self.names[index])
+
+    def ext(self, index: int) -> str:
+        return self.exts[self.ext_code[index]]
+
+    def size_mb(self, index: int) -> float:
+        return self.sizes[index] / (1024 * 1024)
+
+    def set_state(self, index: int, state: int) -> None:
+        old = self.states[index]
+        self.states[index] = state
+        self.counts[old] -= 1
+        self.counts[state] += 1
+        self.bytes_by_state[old] -= self.sizes[index]
+        self.bytes_by_state[state] += self.sizes[index]
+
+    # ------------------------------------------------------------------
+    # Whole-table views (no copies)
+    # ------------------------------------------------------------------
+
+    def path_view(self) -> PathView:
+        """All paths by index, for helpers that take a sequence of paths."""
+        return PathView(self)
+
+    def with_state(self, state: int) -> Iterator[int]:
+        """Indices in upload order whose state is `state`."""
+        return (k for k in self.order if self.states[k] == state)
+
+    def remaining_mb(self) -> float:
+        """MB not yet pushed, skipped or given up on."""
+        return self.bytes_by_state[PENDING] / (1024 * 1024)
+
+    def sort(self, key: Callable[[int], object]) -> None:
+        """Reorder uploads by key(index)."""
+        self.order = array('I', sorted(self.order, key=key))
+
+    def drop(self, indices: Sequence[int], state: int) -> None:
+        """Mark files as not to be pushed and remove them from the upload order."""
+        for k in indices:
+            self.set_state(k, state)
+        dropped = set(indices)
+        self.order = array('I', (k for k in self.order if k not in dropped))
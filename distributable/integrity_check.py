@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Pre-push integrity check for PixelSync
+Failed or interrupted exports leave truncated HEIC/MOV files behind. Pushing
+them wastes time, Google Photos backs them up as broken items, and the local
+copy is deleted afterwards. These checks read only container headers and
+trailers (ISO-BMFF box chain, JPEG EOI, PNG IEND, GIF trailer), and run in a
+thread pool ahead of the push queue.
+"""
+
+import os
+import struct
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import BinaryIO, Deque, Iterable, Optional, Tuple
+
+INVALID_FOLDER = '_invalid'
+
+# Box types a file may start with (only used to recognise the format)
+ISOBMFF_TOP_LEVEL = (b'ftyp', b'moov', b'mdat', b'meta', b'free', b'skip', b'wide', b'uuid',
+                     b'pnot', b'moof', b'mfra', b'styp', b'sidx', b'pdin', b'prft')
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+PNG_IEND = b'\x00\x00\x00\x00IEND\xaeB`\x82'
+JPEG_SCAN_CHUNK = 1024 * 1024
+# Markers that stand alone (no length field): byte stuffing, TEM, RST0-7
+JPEG_STANDALONE = {0x00, 0x01} | set(range(0xD0, 0xD8))
+
+
+def check_isobmff(f: BinaryIO, size: int) -> Optional[str]:
+    """
+    Walk the top-level box chain: every box must be complete and the chain
+    must end exactly at EOF. Box types are not checked (uuid, vendor atoms
+    and other boxes are all valid).
+    """
+    pos = 0
+    while pos < size:
+        f.seek(pos)
+        header = f.read(8)
+        if len(header) < 8:
+            return f"truncated box header at byte {pos}"
+        box_size, box_type = struct.unpack('>I4s', header)
+        if box_size == 1:
+            large = f.read(8)
+            if len(large) < 8:
+                return f"truncated box header at byte {pos}"
+            (box_size,) = struct.unpack('>Q', large)
+        elif box_size == 0:
+            box_size = size - pos  # Box runs to end of file
+        if box_size < 8 or pos + box_size > size:
+            return f"'{box_type.decode('latin-1')}' box cut off ({size - pos} of {box_size} bytes)"
+        pos += box_size
+    return None
+
+
+def check_jpeg(f: BinaryIO, size: int) -> Optional[str]:
+    """
+    JPEG must have an EOI marker after its last scan.
+
+    Most files end with it (trailing padding is allowed). Otherwise data
+    follows the image - the video of a motion photo, a vendor trailer -
+    and the segments and scans are walked until the EOI is found.
+    """
+    f.seek(max(size - 4096, 0))
+    if f.read().rstrip(b'\x00').endswith(b'\xff\xd9'):
+        return None
+
+    pos = 2  # After SOI
+    while pos < size:
+        f.seek(pos)
+        chunk = f.read(JPEG_SCAN_CHUNK)
+        i = chunk.find(b'\xff')
+        while i != -1 and i + 1 < len(chunk):
+            code = chunk[i + 1]
+            if code == 0xD9:
+                return None
+            if code == 0xFF:
+                i += 1  # Fill byte
+            elif code in JPEG_STANDALONE:
+                i = chunk.find(b'\xff', i + 2)
+            else:
+                # Segment (SOS, DHT, APPn, ...): skip it by its length, so
+                # embedded thumbnails are not mistaken for the image's EOI
+                if i + 3 >= len(chunk):
+                    break
+                i += 2 + (chunk[i + 2] << 8 | chunk[i + 3])
+                if i >= len(chunk):
+                    break
+                i = chunk.find(b'\xff', i)
+        if i == -1:
+            pos += len(chunk)
+        elif len(chunk) < JPEG_SCAN_CHUNK and i + 3 >= len(chunk):
+            break  # Cut off inside a marker
+        else:
+            pos += max(i, 1)
+    return "missing JPEG end-of-image marker"
+
+
+def check_png(f: BinaryIO, size: int) -> Optional[str]:
+    f.seek(max(size - len(PNG_IEND), 0))
+    if f.read() != PNG_IEND:
+        return "missing PNG IEND chunk"
+    return None
+
+
+def check_gif(f: BinaryIO, size: int) -> Optional[str]:
+    f.seek(size - 1)
+    if f.read(1) != b'\x3b':
+        return "missing GIF trailer"
+    return None
+
+
+def check_file(path: str) -> Optional[str]:
+    """
+    Check that a photo/video file is structurally complete.
+
+    Returns:
+        None if the file looks complete (or its format is unknown),
+        otherwise a short description of the problem
+    """
+    try:
+        size = os.path.getsize(path)
+        if size == 0:
+            return "empty file"
+        with open(path, 'rb') as f:
+            head = f.read(12)
+            if head[:2] == b'\xff\xd8':
+                return check_jpeg(f, size)
+            if head[:8] == PNG_SIGNATURE:
+                return check_png(f, size)
+            if head[:6] in (b'GIF87a', b'GIF89a'):
+                return check_gif(f, size)
+            if head[4:8] in ISOBMFF_TOP_LEVEL:
+                return check_isobmff(f, size)
+            if len(head) < 12:
+                return "file too short"
+    except OSError as e:
+        return f"unreadable: {e}"
+    return None
+
+
+class IntegrityChecker:
+    """
+    Checks files in a background thread pool, up to `ahead` files in front
+    of the push loop, so results are ready by the time it reaches them.
+
+    Args:
+        paths: Files in the order they will be asked for
+        workers: Checker threads
+        ahead: Files checked ahead of the one being pushed
+    """
+
+    def __init__(self, paths: Iterable[str], workers: int = 4, ahead: int = 256):
+        self.pool = ThreadPoolExecutor(max_workers=workers)
+        self.paths = iter(paths)
+        self.ahead = ahead
+        self.pending: Deque[Tuple[str, Future]] = deque()
+        self._fill()
+
+    def _fill(self) -> None:
+        while len(self.pending) < self.ahead:
+            path = next(self.paths, None)
+            if path is None:
+                return
+            self.pending.append((path, self.pool.submit(check_file, path)))
+
+    def problem(self, path: str) -> Optional[str]:
+        """Result for one file, waiting for it if the pool hasn't got there yet."""
+        while self.pending:
+            queued, future = self.pending.popleft()
+            self._fill()
+            if queued == path:
+                return future.result()
+        # Not in the queue (asked out of order): check it now
+        return check_file(path)
+
+    def close(self) -> None:
+        for _, future in self.pending:
+            future.cancel()
+        self.pool.shutdown(wait=False)
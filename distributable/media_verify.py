@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+MediaStore verification for PixelSync
+Checks in one `content query` which pushed files Android has indexed, and
+asks the media scanner to scan only the ones that are missing.
+"""
+
+import shlex
+import time
+from typing import Iterable, List, Optional, Set
+from adb_batch import SLOW_COMMAND_TIMEOUT, run_shell_batch
+from adb_transport import AdbTransport
+
+MEDIA_URI = 'content://media/external/file'
+
+# /sdcard is a symlink; MediaStore stores the real path
+SDCARD_ALIASES = ('/sdcard/', '/mnt/sdcard/', '/storage/self/primary/')
+SDCARD_REAL = '/storage/emulated/0/'
+
+
+def canonical_device_path(path: str) -> str:
+    """Map /sdcard/... style paths to the /storage/emulated/0/... form MediaStore uses."""
+    for alias in SDCARD_ALIASES:
+        if path.startswith(alias):
+            return SDCARD_REAL + path[len(alias):]
+    return path
+
+
+def _sql_like_prefix(folder: str) -> str:
+    """Build a LIKE pattern for everything under folder (quotes and wildcards escaped)."""
+    prefix = canonical_device_path(folder.rstrip('/') + '/')
+    prefix = prefix.replace("'", "''")
+    prefix = prefix.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f"{prefix}%"
+
+
+def query_indexed_paths(pixel_path: str, transport: AdbTransport) -> Optional[Set[str]]:
+    """
+    Get every path MediaStore has indexed under pixel_path, in one query.
+
+    Returns:
+        Set of canonical paths, or None if `content query` is not available
+        or failed (callers should fall back to a blanket rescan).
+    """
+    where = f"_data LIKE '{_sql_like_prefix(pixel_path)}' ESCAPE '\\'"
+    args = ['content', 'query', '--uri', MEDIA_URI, '--projection', '_data', '--where', where]
+    command = ' '.join(shlex.quote(a) for a in args)
+
+    result = run_shell_batch(transport, [command], SLOW_COMMAND_TIMEOUT, idempotent=True)[0]
+    if not result.ok or result.output.startswith('Error'):
+        return None
+
+    indexed = set()
+    for line in result.output.splitlines():
+        # Row: 0 _data=/storage/emulated/0/DCIM/Camera/IMG_0001.HEIC
+        _, sep, value = line.partition('_data=')
+        if sep and line.startswith('Row:'):
+            indexed.add(value.strip())
+    return indexed
+
+
+def find_unindexed(pushed_paths: Iterable[str], indexed: Set[str]) -> List[str]:
+    """Return the pushed device paths MediaStore does not know about."""
+    return [p for p in pushed_paths if canonical_device_path(p) not in indexed]
+
+
+def rescan_files(device_paths: List[str], transport: AdbTransport) -> None:
+    """Ask the media scanner to scan each given file (all in one round trip)."""
+    if not device_paths:
+        return
+    commands = [
+        'am broadcast -a android.intent.action.MEDIA_SCANNER_SCAN_FILE -d '
+        + shlex.quote(f"file://{path}")
+        for path in device_paths
+    ]
+    run_shell_batch(transport, commands)
+
+
+def verify_media_indexed(
+    pushed_paths: List[str],
+    pixel_path: str,
+    transport: AdbTransport,
+    attempts: int = 1,
+    wait_seconds: float = 5.0
+) -> Optional[List[str]]:
+    """
+    Check pushed files against MediaStore, rescanning only the missing ones.
+
+    Args:
+        pushed_paths: Device paths that were pushed
+        pixel_path: Folder they were pushed to
+        transport: Device to query
+        attempts: How many query/rescan rounds to run
+        wait_seconds: Pause after a rescan before querying again
+
+    Returns:
+        List of paths not indexed at the last check (a rescan has been
+        requested for them), or None if MediaStore could not be queried.
+    """
+    missing = list(pushed_paths)
+    for attempt in range(attempts):
+        indexed = query_indexed_paths(pixel_path, transport)
+        if indexed is None:
+            return None
+
+        missing = find_unindexed(missing, indexed)
+        if not missing:
+            return []
+
+        rescan_files(missing, transport)
+        if attempt + 1 < attempts:
+            time.sleep(wait_seconds)
+
+    return missing
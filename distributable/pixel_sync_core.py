@@ -5,8 +5,34 @@ PixelSync Core - Transfer engine for syncing photos to Google Photos via Pixel
 
 import subprocess
 import os
+import shlex
 import time
-from typing import Optional, List, Set
+from array import array
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Callable, Dict, NamedTuple, Optional, List, Set, Tuple
+from storage_scheduler import StorageScheduler, format_duration
+from adb_batch import SLOW_COMMAND_TIMEOUT, get_device_status, run_housekeeping
+from media_verify import verify_media_indexed
+from adb_transport import AdbTransport, PushResult
+from compression_policy import CompressionPolicy, push_args
+from remote_index import RemoteFile, RemoteNameIndex
+from run_history import AutoTuner, RunHistory, batch_rate_mb_s
+from transfer_log import TransferLog
+from zip_exports import ARCHIVE_EXTENSIONS, ZipExports, list_members, push_member
+from capture_date import DateCache, capture_dates
+from dedup import quarantine_file, remove_duplicates
+from integrity_check import INVALID_FOLDER, IntegrityChecker
+from bandwidth_limit import BandwidthLimiter
+from resumable_push import PartialPushState, push_resumable, push_stream
+from file_table import FileTable, PENDING, PUSHED, SKIPPED, FAILED, INVALID, DUPLICATE
+from device_health import HealthThrottle
+from prefetch import Prefetcher
+from startup import Startup, probe_devices
+from sync_result import FileResults, ProgressCallback, SyncEvent, SyncResult
+
+
+def quiet(*args: Any, **kwargs: Any) -> None:
+    """Stands in for print when transfer_to_pixel runs with verbose=False."""
 
 
 def get_file_list(pixel_path: str, adb_cmd: List[str]) -> List[str]:
@@ -33,19 +59,165 @@ def get_connected_devices(adb_path: str = 'adb') -> List[str]:
     return devices
 
 
-def get_pixel_folder_size_mb(pixel_path: str, adb_cmd: List[str]) -> float:
+def get_pixel_folder_size_mb(pixel_path: str, transport: AdbTransport) -> float:
     """Get total size of files in a Pixel directory in MB."""
-    du_cmd = adb_cmd + ['shell', f'du -sk {pixel_path}']
-
+    result = transport.shell(f"du -sk {shlex.quote(pixel_path)}", timeout=SLOW_COMMAND_TIMEOUT, idempotent=True)
     try:
-        result = subprocess.run(du_cmd, capture_output=True, text=True, check=True)
-        size_kb = int(result.stdout.split()[0])
-        size_mb = size_kb / 1024
-        return size_mb
-    except (subprocess.CalledProcessError, ValueError, IndexError):
+        return int(result.output.split()[0]) / 1024 if result.ok else 0.0
+    except (ValueError, IndexError):
         return 0.0
 
 
+def wait_for_storage(
+    scheduler: StorageScheduler,
+    pixel_path: str,
+    transport: AdbTransport,
+    file_mb: float,
+    echo: Callable[..., None] = print
+) -> float:
+    """
+    Block until a file of `file_mb` fits under the storage cap.
+
+    Waits are sized from the learned drain rate, so pushing resumes as soon
+    as Google Photos has freed enough space for the next file.
+
+    Returns:
+        float: Latest measured Pixel folder size in MB
+    """
+    max_size_gb = scheduler.max_size_mb / 1024
+    current_size_mb = get_pixel_folder_size_mb(pixel_path, transport)
+    scheduler.record_size(current_size_mb)
+
+    while not scheduler.fits(current_size_mb, file_mb):
+        wait = scheduler.wait_seconds(current_size_mb, file_mb)
+        echo(f"\n⏸️  Storage nearly full ({current_size_mb / 1024:.2f} GB / {max_size_gb} GB)")
+        echo(f"💤 Waiting {format_duration(wait)} for Google Photos to free up space...")
+        echo(f"   💡 Good time to free up space!")
+        time.sleep(wait)
+
+        current_size_mb = get_pixel_folder_size_mb(pixel_path, transport)
+        scheduler.record_size(current_size_mb)
+        echo(f"📊 Rechecked storage: {current_size_mb / 1024:.2f} GB / {max_size_gb} GB "
+              f"(drain {scheduler.drain_rate_mb_s():.2f} MB/s)")
+
+    return current_size_mb
+
+
+def push_file(
+    transport: AdbTransport,
+    compressor: CompressionPolicy,
+    mac_file: str,
+    pixel_file_path: str,
+    algorithm: str,
+    limiter: Optional[BandwidthLimiter] = None,
+    partial: Optional[PartialPushState] = None
+) -> Tuple[PushResult, str, float]:
+    """
+    Push one file; runs in a worker thread when pushing in parallel.
+
+    Files large enough for `partial` are sent in resumable chunks instead
+    of one `adb push`. While a bandwidth limit is in force, the other
+    files are streamed in paced pieces too (without compression), so the
+    limit holds during the push; the wait is part of the push seconds.
+
+    Returns:
+        (result, algorithm actually used, push seconds)
+    """
+    if partial is not None and partial.applies(os.path.getsize(mac_file)):
+        push_start = time.time()
+        result = push_resumable(transport, partial, mac_file, pixel_file_path, limiter)
+        return result, 'none', time.time() - push_start
+
+    if limiter is not None and limiter.limit_mb_s() is not None:
+        push_start = time.time()
+        st = os.stat(mac_file)
+        result = push_stream(transport, lambda: open(mac_file, 'rb'), st.st_size, int(st.st_mtime),
+                             pixel_file_path, limiter)
+        return result, 'none', time.time() - push_start
+
+    push_start = time.time()
+    result = transport.push(mac_file, pixel_file_path, push_args(algorithm))
+
+    if not result.ok and compressor.check_unsupported(algorithm, result.message):
+        transport.echo(f"\nℹ️  Compressed push not supported by this adb/device - compression off")
+        algorithm = 'none'
+        push_start = time.time()
+        result = transport.push(mac_file, pixel_file_path)
+
+    seconds = time.time() - push_start
+    if result.ok:
+        # Small delay between files
+        time.sleep(0.5)
+    return result, algorithm, seconds
+
+
+class SourceListing(NamedTuple):
+    """Result of scanning the source folder."""
+    table: FileTable          # Files to push
+    zips: ZipExports          # Which of them are inside zip exports
+    files_to_delete: List[str]
+    ignored_files: int = 0    # Files with other extensions, left alone
+
+
+def scan_source_folder(
+    mac_folder: str,
+    keep_extensions: Set[str],
+    delete_extensions: Set[str],
+    zip_exports: bool = True,
+    echo: Callable[..., None] = print
+) -> SourceListing:
+    """Sort the files of the source folder into files to push and files to delete (one scandir pass)."""
+    keep_extensions = {ext.lower() for ext in keep_extensions}
+    delete_extensions = {ext.lower() for ext in delete_extensions}
+    table = FileTable()
+    zips = ZipExports()
+    files_to_delete = []
+    ignored = 0
+
+    with os.scandir(os.path.expanduser(mac_folder)) as entries:
+        for entry in entries:
+            if not entry.is_file():
+                continue
+
+            ext = os.path.splitext(entry.name)[1].lower()
+
+            if ext in ARCHIVE_EXTENSIONS and zip_exports:
+                # Photos inside the export become files of the run; an unreadable archive is kept
+                members = list_members(entry.path, keep_extensions, echo)
+                if members is None:
+                    continue
+                for info in members:
+                    zips.add(table.add(ZipExports.virtual_path(entry.path, info), info.file_size), entry.path, info)
+                if members:
+                    continue
+
+            if ext in delete_extensions:
+                files_to_delete.append(entry.path)
+            elif ext in keep_extensions:
+                table.add(entry.path, entry.stat().st_size)
+            else:
+                ignored += 1
+
+    return SourceListing(table, zips, files_to_delete, ignored)
+
+
+def push_zip_member(
+    transport: AdbTransport,
+    zips: ZipExports,
+    index: int,
+    pixel_file_path: str,
+    limiter: Optional[BandwidthLimiter] = None
+) -> Tuple[PushResult, str, float]:
+    """
+    Stream one file out of a zip export; same return value as push_file.
+
+    The stream waits for the limiter itself, so that time is part of the push.
+    """
+    push_start = time.time()
+    result = push_member(transport, zips, index, pixel_file_path, limiter)
+    return result, 'none', time.time() - push_start
+
+
 def transfer_to_pixel(
     mac_folder: str,
     pixel_path: str,
@@ -55,14 +227,104 @@ def transfer_to_pixel(
     max_size_gb: float = 10.0,
     sleep_minutes: int = 15,
     keep_extensions: Optional[Set[str]] = None,
-    delete_extensions: Optional[Set[str]] = None
-) -> bool:
+    delete_extensions: Optional[Set[str]] = None,
+    compression: str = 'off',
+    skip_unchanged: bool = True,
+    push_workers: int = 1,
+    auto_tune: bool = False,
+    history: Optional[RunHistory] = None,
+    transfer_log: Optional[TransferLog] = None,
+    order: str = 'none',
+    dedup: str = 'off',
+    bandwidth_limit_mb_s: Optional[float] = None,
+    bandwidth_schedule: Optional[List[Dict[str, Any]]] = None,
+    resumable_min_mb: float = 512,
+    health_throttle: bool = True,
+    max_battery_temp_c: float = 42.0,
+    integrity_check: bool = True,
+    prefetch_mb: float = 256,
+    rename_collisions: bool = True,
+    zip_exports: bool = True,
+    startup: Optional[Startup] = None,
+    transport: Optional[AdbTransport] = None,
+    shell_session: bool = True,
+    name_suffix: str = '',
+    progress: Optional[ProgressCallback] = None,
+    verbose: bool = True
+) -> SyncResult:
     """
     Transfer files from computer to Pixel in batches, monitoring storage space.
 
+    compression is 'off', 'policy' (by file type and size) or 'auto'
+    (measure each option on the first files of every type, keep the fastest).
+
+    With skip_unchanged, files already on the Pixel with the same size and
+    mtime (pushed by an interrupted run) are not sent again, only deleted locally.
+
+    push_workers sets how many pushes run at once. With auto_tune, batch size
+    and push_workers are adjusted after every batch to maximise MB/s; batches
+    are recorded in `history` so the next run can start from the best values.
+    Every push, skip, failure and local delete is recorded in `transfer_log`.
+
+    order is 'none' (folder order), 'name' or 'date' (oldest capture date
+    first, read from EXIF/HEIC/MOV headers and cached between runs).
+
+    dedup is 'off', 'quarantine' (move identical copies to _duplicates/ in
+    the source folder) or 'delete'; duplicates are found before any push.
+
+    bandwidth_limit_mb_s caps the host-side push rate (all parallel pushes
+    together); bandwidth_schedule overrides it by time of day, e.g.
+    [{"from": "09:00", "to": "18:00", "mb_s": 15}].
+
+    Files of at least resumable_min_mb (0 = never) are pushed in chunks that
+    survive a dropped connection or an interrupted run: the next attempt
+    continues from the last chunk the Pixel confirmed.
+
+    With health_throttle, battery temperature, thermal status and charging
+    are checked before every batch: above max_battery_temp_c (or on a
+    charger that can't keep up) only one file is pushed at a time, and
+    when the phone is too hot or its battery is low pushing pauses.
+
+    With integrity_check, truncated or incomplete files (broken box chain,
+    missing JPEG/PNG/GIF trailer) are moved to _invalid/ in the source
+    folder instead of being pushed and deleted. Checks run in a background
+    pool ahead of the pushes.
+
+    prefetch_mb of upcoming files are read ahead into the OS cache while
+    the current file is pushed, so slow source drives read and the USB
+    link writes at the same time (0 disables it).
+
+    With rename_collisions, a file whose name is already taken on the Pixel
+    by a different file (iPhone IMG_XXXX numbering wraps) is pushed under a
+    name derived from its content, e.g. IMG_0001_3fa9c2d1.HEIC, instead of
+    overwriting it. Names are checked against one listing of the Pixel
+    folder, kept up to date as files are pushed.
+
+    With zip_exports, photos and videos inside .zip files in the folder are
+    streamed straight from the archive (nothing is extracted to disk); an
+    archive is deleted once all of them are on the Pixel.
+
+    `startup` carries the device probe and source scan that pixelsync runs
+    in the background while it starts; without it both run here. The time
+    from launch to the first push is reported in the summary.
+
+    `transport` replaces the adb built from adb_path/device_id, e.g. a
+    FakeDevice's transport for tests and benchmarks; every device call of
+    the run goes through it. With shell_session, small remote commands go
+    through one persistent `adb shell` (closed when the run ends); without
+    it every command is a separate adb call. name_suffix is added to
+    every name on the Pixel ('_pixel': IMG_0001_pixel.HEIC).
+
+    `progress` is called with a SyncEvent as files are scanned, pushed,
+    skipped or failed. verbose=False sends no output to the console (a
+    given `transport` reports reconnects through its own echo).
+
     Returns:
-        bool: True if successful, False otherwise
+        SyncResult: ok (no file failed or was quarantined as incomplete),
+        and the outcome of every file
     """
+    run_start = time.time()
+    echo = print if verbose else quiet
     mac_folder = os.path.expanduser(mac_folder)
     keep_extensions = keep_extensions or {'.heic', '.mov', '.jpg', '.jpeg', '.png', '.mp4', '.gif'}
     delete_extensions = delete_extensions or {'.aae', '.xmp', '.zip', '.ds_store', '.dng'}
@@ -75,160 +337,495 @@ def transfer_to_pixel(
     adb_cmd = [adb_path]
     if device_id:
         adb_cmd.extend(['-s', device_id])
-
-    # Check device connection
-    check_cmd = adb_cmd + ['devices']
-    result = subprocess.run(check_cmd, capture_output=True, text=True)
-    if 'device' not in result.stdout:
-        print("❌ No device connected or device unauthorized")
-        return False
-
-    print(f"📱 Connected to Pixel device")
-    print(f"📁 Source: {mac_folder}")
-    print(f"📁 Destination: {pixel_path}")
-    print(f"⚙️  Batch size: {batch_size} files")
-    print(f"⚙️  Max storage: {max_size_gb} GB")
-    print(f"⚙️  Sleep time: {sleep_minutes} minutes when full\n")
-
-    # Get all files to process
-    all_files = []
-    files_to_delete = []
-
-    for filename in os.listdir(mac_folder):
-        filepath = os.path.join(mac_folder, filename)
-        if not os.path.isfile(filepath):
-            continue
-
-        ext = os.path.splitext(filename)[1].lower()
-
-        if ext in delete_extensions:
-            files_to_delete.append(filepath)
-        elif ext in keep_extensions:
-            all_files.append(filepath)
+    transport = transport or AdbTransport(adb_cmd, echo=echo)
+
+    # Check device connection (already probed in the background by pixelsync;
+    # probed again if the phone was plugged in or authorized after that)
+    probe = startup.device() if startup is not None else None
+    if probe is None or not probe.connected(device_id):
+        probe = probe_devices(transport)
+    if not probe.connected(device_id):
+        echo("❌ No device connected or device unauthorized")
+        if progress is not None:
+            progress(SyncEvent('finish', 0, 0, message='no device connected'))
+        return SyncResult(False, FileResults(FileTable()), time.time() - run_start, None, 'no device connected')
+
+    echo(f"📱 Connected to Pixel device")
+    if transfer_log is not None:
+        transfer_log.start_session(mac_folder, pixel_path, device_id)
+    echo(f"📁 Source: {mac_folder}")
+    echo(f"📁 Destination: {pixel_path}")
+    echo(f"⚙️  Batch size: {batch_size} files")
+    echo(f"⚙️  Max storage: {max_size_gb} GB")
+    echo(f"⚙️  Max wait: {sleep_minutes} minutes when full")
+    limiter = BandwidthLimiter(bandwidth_limit_mb_s, bandwidth_schedule, echo=echo)
+    if limiter.enabled:
+        echo(f"⚙️  Bandwidth limit: {limiter.describe()}")
+    echo()
+
+    # Get all files to process (sizes come with the directory scan; the
+    # background scan is redone if files were added while pixelsync waited)
+    listing = startup.source() if startup is not None else None
+    if listing is None or startup.source_changed(mac_folder):
+        listing = scan_source_folder(mac_folder, keep_extensions, delete_extensions, zip_exports, echo)
+    table, zips, files_to_delete = listing.table, listing.zips, listing.files_to_delete
+
+    # Per-file details for the result, besides the names, sizes and states in
+    # the table: only names that differ on the Pixel and messages of failures
+    renamed: Dict[int, str] = {}
+    push_seconds = array('d', [0.0]) * len(table)
+    messages: Dict[int, str] = {}
+    handled = 0
+    first_push_at = None  # Time to first byte, reported in the summary
+
+    def base_name(k: int) -> str:
+        """Name on the Pixel unless it collides: the file's own name plus name_suffix."""
+        stem, ext = os.path.splitext(table.names[k])
+        return f"{stem}{name_suffix}{ext}"
+
+    def remote_path(k: int) -> Optional[str]:
+        if table.states[k] not in (PUSHED, SKIPPED):
+            return None
+        return f"{pixel_path.rstrip('/')}/{renamed.get(k) or base_name(k)}"
+
+    results = FileResults(table, remote_path, push_seconds, messages)
+
+    def file_done(k: int) -> None:
+        nonlocal handled
+        handled += 1
+        if progress is not None:
+            progress(SyncEvent('file', handled, len(table.order), results[k]))
+
+    def finish(ok: bool, message: str = '') -> SyncResult:
+        first_push = first_push_at - run_start if first_push_at is not None else None
+        result = SyncResult(ok, results, time.time() - run_start, first_push, message)
+        if progress is not None:
+            progress(SyncEvent('finish', handled, len(table.order), message=message))
+        return result
 
     # Delete unwanted files first
     if files_to_delete:
-        print(f"🗑️  Deleting {len(files_to_delete)} unwanted files...")
+        echo(f"🗑️  Deleting {len(files_to_delete)} unwanted files...")
         for filepath in files_to_delete:
             try:
                 os.remove(filepath)
+                if transfer_log is not None:
+                    transfer_log.record('delete', os.path.basename(filepath), detail='unwanted type')
+            except Exception as e:
+                echo(f"   ⚠️  Failed to delete {os.path.basename(filepath)}: {e}")
+        echo()
+
+    if len(zips):
+        echo(f"🗜️  Streaming {len(zips)} files from {len(zips.archives)} zip archives (no extraction)\n")
+
+    if not len(table):
+        echo("⚠️  No files to transfer")
+        if transfer_log is not None:
+            transfer_log.finish_session(True)
+        return finish(True)
+
+    # Identical copies (re-exports, "IMG_1234 (1).HEIC") would only waste a push
+    if dedup != 'off':
+        echo(f"♊ Checking for duplicate files...")
+        if not len(zips):
+            duplicates = remove_duplicates(table.path_view(), mac_folder, dedup, sizes=table.sizes, echo=echo)
+        else:
+            # Only files on disk can be moved aside or deleted
+            on_disk = [k for k in range(len(table)) if k not in zips]
+            found = remove_duplicates([table.path(k) for k in on_disk], mac_folder, dedup,
+                                      sizes=[table.sizes[k] for k in on_disk], echo=echo)
+            duplicates = [on_disk[p] for p in found]
+        table.drop(duplicates, DUPLICATE)
+        if transfer_log is not None:
+            action = 'delete' if dedup == 'delete' else 'quarantine'
+            for k in duplicates:
+                transfer_log.record(action, table.names[k], size_bytes=table.sizes[k], detail='duplicate')
+
+    total_files = len(table.order)
+    echo(f"📦 Found {total_files} files to transfer\n")
+    if progress is not None:
+        progress(SyncEvent('start', 0, total_files))
+
+    # Upload order: oldest first keeps the Google Photos timeline gap-free
+    if order == 'date':
+        echo(f"📅 Ordering files by capture date...")
+        # Only files still to push: duplicates are already in _duplicates/ (or deleted).
+        # Archive members are ordered by the time stored in the zip
+        dates = array('d', [0.0]) * len(table)
+        on_disk = [k for k in table.order if k not in zips]
+        for k, date in zip(on_disk, capture_dates([table.path(k) for k in on_disk], DateCache(echo=echo))):
+            dates[k] = date
+        for k in zips.members:
+            dates[k] = zips.stat(k).mtime
+        table.sort(key=lambda k: (dates[k], table.names[k]))
+    elif order == 'name':
+        table.sort(key=lambda k: table.names[k])
+
+    # Sizes drive the storage pacing and the projected completion time
+    scheduler = StorageScheduler(max_size_gb * 1024, sleep_minutes)
+
+    integrity = None
+    prefetcher = None
+    try:
+        # One persistent shell for all the small remote commands of this run
+        if shell_session:
+            transport.open_session()
+        compressor = CompressionPolicy(compression, echo=echo)
+        partial = PartialPushState(min_bytes=int(resumable_min_mb * 1024 * 1024), echo=echo)
+        # Archive members are checked by the zip CRC while streaming, and not prefetched
+        integrity = IntegrityChecker(table.path(k) for k in table.order if k not in zips) if integrity_check else None
+        prefetcher = Prefetcher(((table.path(k), 0 if k in zips else table.sizes[k]) for k in table.order),
+                                prefetch_mb).start()
+        health = HealthThrottle(max_temp_c=max_battery_temp_c, pause_temp_c=max_battery_temp_c + 3,
+                                echo=echo) if health_throttle else None
+
+        # One listing of the Pixel folder to spot files an interrupted run already
+        # pushed and names already taken by other files
+        names = None
+        if skip_unchanged or rename_collisions:
+            names = RemoteNameIndex.fetch(pixel_path, transport)
+            if names is None:
+                echo("⚠️  Could not list the Pixel folder - not checking for existing files")
+            elif transfer_log is not None:
+                # Pushed files gone from the folder were freed by Google Photos
+                transfer_log.record_freed(pixel_path, names.files)
+
+        tuner = AutoTuner(batch_size, push_workers) if auto_tune else None
+        if history is not None:
+            history.start_run(batch_size, push_workers)
+
+        invalid_reasons = {}  # index -> integrity problem, for the summary
+
+        def delete_local(k: int, reason: str) -> None:
+            """Delete a file that is on the Pixel (an archive once all its files are)."""
+            path = table.path(k)
+            if k in zips:
+                path = zips.finish(k, True)
+                if path is None:
+                    return
+            try:
+                os.remove(path)
+                if transfer_log is not None:
+                    transfer_log.record('delete', os.path.basename(path), detail=reason)
             except Exception as e:
-                print(f"   ⚠️  Failed to delete {os.path.basename(filepath)}: {e}")
-        print()
-
-    if not all_files:
-        print("⚠️  No files to transfer")
-        return True
-
-    total_files = len(all_files)
-    print(f"📦 Found {total_files} files to transfer\n")
-
-    transferred = 0
-    failed = []
-
-    # Process files in batches
-    for i in range(0, len(all_files), batch_size):
-        batch = all_files[i:i + batch_size]
-
-        # Check Pixel storage before each batch
-        current_size_mb = get_pixel_folder_size_mb(pixel_path, adb_cmd)
-        current_size_gb = current_size_mb / 1024
-
-        print(f"📊 Current Pixel storage: {current_size_gb:.2f} GB / {max_size_gb} GB")
-
-        # Wait if storage is too full
-        while current_size_gb >= max_size_gb:
-            print(f"⏸️  Storage full ({current_size_gb:.2f} GB >= {max_size_gb} GB)")
-            print(f"💤 Sleeping for {sleep_minutes} minutes...")
-            print(f"   💡 Good time to free up space!")
-            time.sleep(sleep_minutes * 60)
-
-            current_size_mb = get_pixel_folder_size_mb(pixel_path, adb_cmd)
-            current_size_gb = current_size_mb / 1024
-            print(f"📊 Rechecked storage: {current_size_gb:.2f} GB / {max_size_gb} GB")
-
-        # Transfer batch
-        print(f"\n🚀 Processing batch {(i // batch_size) + 1} ({len(batch)} files)...")
-
-        for j, mac_file in enumerate(batch, 1):
-            filename = os.path.basename(mac_file)
-            pixel_file_path = f"{pixel_path.rstrip('/')}/{filename}"
-
-            # Progress
-            overall_progress = transferred + j
-            percentage = (overall_progress / total_files) * 100
-            progress_line = f"⬆️  [{overall_progress}/{total_files}] ({percentage:.1f}%) Uploading: {filename}"
-            print(f"\r{progress_line:<120}", end='', flush=True)
-
-            # Push to Pixel
-            push_cmd = adb_cmd + ['push', mac_file, pixel_file_path]
-            result = subprocess.run(push_cmd, capture_output=True, text=True)
-
-            if result.returncode == 0:
-                # Delete from Mac after successful transfer
-                try:
-                    os.remove(mac_file)
-                    transferred += 1
-                except Exception as e:
-                    print(f"\n⚠️  Failed to delete {filename} from computer: {e}")
-
-                # Small delay between files
-                time.sleep(0.5)
+                echo(f"\n⚠️  Failed to delete {os.path.basename(path)} from computer: {e}")
+        unverified = []  # Pushed device paths not yet confirmed in MediaStore
+
+        # Process files in batches (auto-tune may change the batch size between batches)
+        i = 0
+        batch_number = 0
+        while i < total_files:
+            batch = table.order[i:i + batch_size]
+            batch_number += 1
+            cycle_start = time.time()
+
+            # Sample Pixel storage and health before each batch (one round trip)
+            status = get_device_status(pixel_path, transport)
+            if not status['online']:
+                if not transport.wait_for_device():
+                    transport.tripped = True
+                    break
+                status = get_device_status(pixel_path, transport)
+
+            # Back off while the phone is hot or its charger can't keep up
+            workers = push_workers
+            throttled = False
+            if health is not None:
+                decision = health.assess(status)
+                health.record(batch_number, decision)
+                throttled = decision.throttled
+                paused = 0.0
+                while decision.pause_seconds > 0 and paused < health.max_pause_seconds:
+                    if progress is not None:
+                        progress(SyncEvent('wait', handled, total_files, message=(
+                            f"device {decision.reason}, pausing {decision.pause_seconds:.0f}s")))
+                    time.sleep(decision.pause_seconds)
+                    paused += decision.pause_seconds
+                    status = get_device_status(pixel_path, transport)
+                    decision = health.assess(status)
+                    health.record(batch_number, decision)
+                    throttled = throttled or decision.throttled
+                health.paused_seconds += paused
+                if decision.max_workers is not None:
+                    workers = min(push_workers, decision.max_workers)
+
+            current_size_mb = status['folder_size_mb']
+            scheduler.record_size(current_size_mb)
+
+            echo(f"📊 Current Pixel storage: {current_size_mb / 1024:.2f} GB / {max_size_gb} GB")
+            if status['free_mb'] is not None:
+                echo(f"   💾 Free on device: {status['free_mb'] / 1024:.2f} GB, "
+                      f"{status['file_count']} files in folder")
+            echo(scheduler.eta_line(table.remaining_mb(), current_size_mb))
+
+            # Transfer batch
+            parallel = f", {workers} parallel pushes" if workers > 1 else ""
+            echo(f"\n🚀 Processing batch {batch_number} ({len(batch)} files{parallel})...")
+            if progress is not None:
+                progress(SyncEvent('batch', handled, total_files, message=f"batch {batch_number}, {len(batch)} files"))
+
+            batch_start = time.time()
+            stall_seconds = 0.0
+            batch_bytes = 0
+            batch_failed = 0
+            in_flight = {}  # future -> (file index, pixel_file_path)
+
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                for j, k in enumerate(batch, 1):
+                    mac_file = table.path(k)
+                    filename = table.names[k]
+                    file_mb = table.size_mb(k)
+                    prefetcher.advance()
+
+                    # Progress
+                    overall_progress = i + j
+                    percentage = (overall_progress / total_files) * 100
+                    progress_line = f"⬆️  [{overall_progress}/{total_files}] ({percentage:.1f}%) Uploading: {filename}"
+                    echo(f"\r{progress_line:<120}", end='', flush=True)
+
+                    problem = integrity.problem(mac_file) if integrity is not None and k not in zips else None
+                    local = zips.stat(k) if k in zips else None
+                    wanted = base_name(k)
+                    remote_name, on_device = wanted, False
+                    if not problem and names is not None:
+                        opener = (lambda k=k: zips.open(k)) if k in zips else None
+                        remote_name, on_device = names.resolve(mac_file, local, opener, wanted)
+                        if not rename_collisions:
+                            remote_name = wanted
+                    if remote_name != wanted:
+                        renamed[k] = remote_name
+                    pixel_file_path = f"{pixel_path.rstrip('/')}/{remote_name}"
+
+                    if problem:
+                        # Truncated export: keep it out of Google Photos and out of the trash
+                        try:
+                            quarantine_file(mac_file, os.path.join(mac_folder, INVALID_FOLDER))
+                            table.set_state(k, INVALID)
+                            invalid_reasons[k] = problem
+                            messages[k] = problem
+                            if transfer_log is not None:
+                                transfer_log.record('quarantine', filename, size_bytes=table.sizes[k], detail=problem)
+                            echo(f"\n🧩 {filename} looks incomplete ({problem}) - moved to {INVALID_FOLDER}/")
+                        except Exception as e:
+                            table.set_state(k, FAILED)
+                            messages[k] = f"{problem}; could not quarantine: {e}"
+                            echo(f"\n⚠️  Failed to quarantine {filename}: {e}")
+                        file_done(k)
+                    elif on_device and skip_unchanged:
+                        # Identical copy already on the Pixel: skip straight to the local delete
+                        table.set_state(k, SKIPPED)
+                        unverified.append(pixel_file_path)
+                        if transfer_log is not None:
+                            transfer_log.record('skip', filename, pixel_file_path, table.sizes[k])
+                        delete_local(k, 'already on the Pixel')
+                        file_done(k)
+                    else:
+                        # Pace against the storage cap without a du per file
+                        if not scheduler.fits(scheduler.estimated_size_mb(), file_mb):
+                            wait_start = time.time()
+                            wait_for_storage(scheduler, pixel_path, transport, file_mb, echo)
+                            stall_seconds += time.time() - wait_start
+                            if progress is not None and time.time() - wait_start > 1:
+                                progress(SyncEvent('wait', handled, total_files, message=(
+                                    f"waited {format_duration(time.time() - wait_start)} for Google Photos "
+                                    f"to free space")))
+
+                        # A failed push keeps its reservation: a partial file may be there
+                        if remote_name != wanted:
+                            names.renamed += 1
+                            echo(f"\n🔀 {filename} already on the Pixel is a different file - pushing as {remote_name}")
+                        if names is not None:
+                            if local is None:
+                                st = os.stat(mac_file)
+                                local = RemoteFile(st.st_size, int(st.st_mtime))
+                            names.reserve(remote_name, local)
+
+                        # Push to Pixel (retried on transient USB/adb errors)
+                        if k in zips:
+                            future = pool.submit(push_zip_member, transport, zips, k, pixel_file_path,
+                                                 limiter if limiter.enabled else None)
+                        else:
+                            algorithm = compressor.choose(table.ext(k), table.sizes[k])
+                            future = pool.submit(push_file, transport, compressor, mac_file, pixel_file_path, algorithm,
+                                                 limiter if limiter.enabled else None, partial)
+                        in_flight[future] = (k, pixel_file_path)
+                        if first_push_at is None:
+                            first_push_at = time.time()
+
+                    # Collect finished pushes, keeping at most `workers` in flight
+                    last = j == len(batch) or transport.tripped
+                    while in_flight and (len(in_flight) >= workers or last):
+                        done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            done_k, done_pixel_path = in_flight.pop(future)
+                            done_name = table.names[done_k]
+                            result, algorithm, seconds = future.result()
+
+                            if result.ok:
+                                if done_k not in zips:
+                                    compressor.record(table.ext(done_k), algorithm, table.sizes[done_k], seconds)
+                                scheduler.record_push(table.size_mb(done_k), seconds / workers)
+                                table.set_state(done_k, PUSHED)
+                                push_seconds[done_k] = seconds
+                                batch_bytes += table.sizes[done_k]
+                                unverified.append(done_pixel_path)
+                                if transfer_log is not None:
+                                    transfer_log.record('push', done_name, done_pixel_path, table.sizes[done_k],
+                                                        seconds, algorithm)
+
+                                # Delete from Mac after successful transfer
+                                delete_local(done_k, 'pushed')
+                                file_done(done_k)
+                            elif transport.tripped:
+                                # Device is gone: leave the file for the next run
+                                pass
+                            else:
+                                table.set_state(done_k, FAILED)
+                                push_seconds[done_k] = seconds
+                                messages[done_k] = result.message
+                                batch_failed += 1
+                                if done_k in zips:
+                                    zips.finish(done_k, False)  # Keep the archive
+                                if transfer_log is not None:
+                                    transfer_log.record('fail', done_name, done_pixel_path, table.sizes[done_k],
+                                                        seconds, result.message)
+                                echo(f"\n⚠️  Failed to upload {done_name}: {result.message}")
+                                file_done(done_k)
+
+                    if transport.tripped:
+                        break
+
+            echo()  # New line after batch
+            if transfer_log is not None:
+                transfer_log.flush()
+
+            if transport.tripped:
+                break
+
+            batch_seconds = time.time() - batch_start
+            i += len(batch)
+
+            # Check MediaStore and rescan only the files it hasn't indexed yet
+            echo(f"📢 Verifying media index of new files...")
+            missing = verify_media_indexed(unverified, pixel_path, transport)
+            if missing is None:
+                # content query unavailable: fall back to a blanket rescan
+                run_housekeeping(pixel_path, transport)
             else:
-                failed.append(filename)
-                print(f"\n⚠️  Failed to upload {filename}")
-
-        print()  # New line after batch
-
-        # Trigger media scanner
-        print(f"📢 Notifying media scanner of new files...")
-        touch_cmd = adb_cmd + ['shell', 'find /sdcard/DCIM/Camera -type f -exec touch {} \\;']
-        subprocess.run(touch_cmd, capture_output=True, text=True)
-
-        scan_cmd = adb_cmd + ['shell', 'am', 'broadcast', '-a', 'android.intent.action.MEDIA_SCANNER_SCAN_FILE', '-d', 'file:///sdcard/DCIM/Camera']
-        subprocess.run(scan_cmd, capture_output=True, text=True)
-
-        # Pause between batches
-        if i + batch_size < len(all_files):
-            pause_seconds = 10
-            print(f"⏸️  Pausing {pause_seconds} seconds between batches...")
-            print(f"   💡 Good time to check Google Photos sync status!")
-            time.sleep(pause_seconds)
-
-    # Final summary
-    print(f"\n{'='*60}")
-    print(f"✅ Successfully transferred: {transferred}/{total_files} files")
-
-    if failed:
-        print(f"⚠️  Failed to transfer {len(failed)} files:")
-        for f in failed:
-            print(f"   - {f}")
-
-    final_size_mb = get_pixel_folder_size_mb(pixel_path, adb_cmd)
-    final_size_gb = final_size_mb / 1024
-    print(f"📊 Final Pixel storage: {final_size_gb:.2f} GB")
-    print(f"{'='*60}\n")
-
-    # Final media scanner trigger
-    print("📢 Final media scanner notification...")
-    touch_cmd = adb_cmd + ['shell', 'find /sdcard/DCIM/Camera -type f -exec touch {} \\;']
-    subprocess.run(touch_cmd, capture_output=True, text=True)
-
-    scan_cmd = adb_cmd + ['shell', 'am', 'broadcast', '-a', 'android.intent.action.MEDIA_SCANNER_SCAN_FILE', '-d', 'file:///sdcard/DCIM/Camera']
-    subprocess.run(scan_cmd, capture_output=True, text=True)
-
-    rescan_cmd = adb_cmd + ['shell', 'am', 'broadcast', '-a', 'android.intent.action.MEDIA_MOUNTED', '-d', 'file:///sdcard']
-    subprocess.run(rescan_cmd, capture_output=True, text=True)
-
-    print("\n📱 Next steps:")
-    print("   1. On Pixel: Settings → Apps → Google Photos → Force Stop")
-    print("   2. Open Google Photos app again")
-    print("   3. Wait 1-2 minutes for it to scan")
-    print("   4. Check backup status")
-    print("   5. When backup complete, use 'Free up space'")
-
-    if final_size_gb >= max_size_gb * 0.8:
-        print(f"\n⚠️  Storage is {(final_size_gb/max_size_gb)*100:.0f}% full!")
-        print("💡 Tip: Run 'Free up space' in Google Photos app!")
-
-    return len(failed) == 0
+                echo(f"   🔎 {len(unverified) - len(missing)} indexed, {len(missing)} queued for rescan")
+                unverified = missing
+
+            # Pause between batches
+            if i < total_files:
+                pause_seconds = 10
+                echo(f"⏸️  Pausing {pause_seconds} seconds between batches...")
+                echo(f"   💡 Good time to check Google Photos sync status!")
+                time.sleep(pause_seconds)
+
+            # Feed the batch into the run history and the tuner: the rate covers
+            # the whole cycle up to the next batch, the per-batch costs batch_size trades off
+            cycle_seconds = time.time() - cycle_start
+            if history is not None:
+                history.record_batch(len(batch), batch_bytes, batch_seconds, stall_seconds,
+                                     batch_failed, batch_size, workers, cycle_seconds, throttled)
+            # A throttled batch says nothing about the best settings
+            if tuner is not None and not throttled:
+                rate = batch_rate_mb_s({'files': len(batch), 'bytes': batch_bytes, 'seconds': batch_seconds,
+                                        'cycle_seconds': cycle_seconds, 'stall_seconds': stall_seconds,
+                                        'failures': batch_failed})
+                batch_size, push_workers = tuner.update(rate)
+                echo(f"🎛️  Auto-tune: {rate:.1f} MB/s → next batch {batch_size} files, "
+                      f"{push_workers} parallel pushes")
+
+        if history is not None:
+            history.finish_run(batch_size, push_workers)
+
+        transferred = table.counts[PUSHED] + table.counts[SKIPPED]
+        failed = [table.names[k] for k in table.with_state(FAILED)]
+        # Incomplete files moved to _invalid/ still need the user's attention
+        complete = not failed and not table.counts[INVALID]
+        if transfer_log is not None:
+            transfer_log.finish_session(complete and not transport.tripped)
+
+        if transport.tripped:
+            echo(f"\n❌ Device did not come back after {transport.reconnect_timeout / 60:.0f} minutes - stopping")
+            echo(f"   {table.counts[PENDING]} files were left in {mac_folder} for the next run")
+            return finish(False, 'device disconnected')
+
+        # Final summary
+        echo(f"\n{'='*60}")
+        echo(f"✅ Successfully transferred: {transferred}/{total_files} files")
+        if table.counts[SKIPPED]:
+            echo(f"⏭️  {table.counts[SKIPPED]} of them were already on the Pixel and were not sent again")
+        if startup is not None and first_push_at is not None:
+            echo(f"⏱️  First push started {startup.since_launch(first_push_at):.1f}s after launch")
+        if transport.reconnects:
+            echo(f"🔌 Recovered from {transport.reconnects} connection drops")
+        if limiter.throttled_seconds:
+            echo(f"🐢 Bandwidth limit held pushes back for {format_duration(limiter.throttled_seconds)}")
+        for line in compressor.summary():
+            echo(f"🗜️  Compression {line}")
+        if health is not None and health.events:
+            echo(f"🌡️  {health.summary()}")
+            for event in health.events[-10:]:
+                echo(f"   - {event}")
+
+        if names is not None and names.renamed:
+            echo(f"🔀 {names.renamed} files were renamed to avoid overwriting different files on the Pixel")
+        if invalid_reasons:
+            echo(f"🧩 {len(invalid_reasons)} incomplete files were moved to {INVALID_FOLDER}/ instead of being sent:")
+            for k, problem in invalid_reasons.items():
+                echo(f"   - {table.names[k]}: {problem}")
+
+        if failed:
+            echo(f"⚠️  Failed to transfer {len(failed)} files:")
+            for f in failed:
+                echo(f"   - {f}")
+
+        final_status = get_device_status(pixel_path, transport)
+        final_size_gb = final_status['folder_size_mb'] / 1024
+        echo(f"📊 Final Pixel storage: {final_size_gb:.2f} GB")
+        if final_status['battery_level'] is not None:
+            echo(f"🔋 Battery: {final_status['battery_level']}% "
+                  f"({final_status['battery_temp_c']}°C)")
+        echo(f"{'='*60}\n")
+
+        # Final media index verification
+        echo("📢 Final media index verification...")
+        missing = verify_media_indexed(unverified, pixel_path, transport, attempts=3)
+
+        if missing is None:
+            # content query unavailable: fall back to a blanket rescan
+            run_housekeeping(pixel_path, transport, full_rescan=True)
+        elif missing:
+            echo(f"⚠️  {len(missing)} files are still not indexed by Android:")
+            for path in missing[:10]:
+                echo(f"   - {os.path.basename(path)}")
+            if len(missing) > 10:
+                echo(f"   ... and {len(missing) - 10} more")
+        else:
+            echo("✅ All pushed files are indexed - Google Photos will pick them up")
+
+        if missing is None or missing:
+            echo("\n📱 Next steps:")
+            echo("   1. On Pixel: Settings → Apps → Google Photos → Force Stop")
+            echo("   2. Open Google Photos app again")
+            echo("   3. Wait 1-2 minutes for it to scan")
+            echo("   4. Check backup status")
+            echo("   5. When backup complete, use 'Free up space'")
+        else:
+            echo("\n📱 Next step: when backup is complete, use 'Free up space' in Google Photos")
+
+        if final_size_gb >= max_size_gb * 0.8:
+            echo(f"\n⚠️  Storage is {(final_size_gb/max_size_gb)*100:.0f}% full!")
+            echo("💡 Tip: Run 'Free up space' in Google Photos app!")
+
+        return finish(complete)
+    finally:
+        if integrity is not None:
+            integrity.close()
+        if prefetcher is not None:
+            prefetcher.close()
+        transport.close()
+        if transfer_log is not None:
+            transfer_log.finish_session(False)  # Still open only if the run raised
@@ -7,8 +7,12 @@ Main entry point for the application
 import sys
 import os
 import platform
-from config_manager import get_config, reset_config
-from pixel_sync_core import transfer_to_pixel
+from config_manager import get_config, load_config, reset_config, save_config, with_defaults
+from pixel_sync_core import scan_source_folder, transfer_to_pixel
+from startup import Startup
+from run_history import RunHistory
+from transfer_log import TransferLog, print_report
+from capacity_plan import build_plan, print_plan, scan_source
 
 
 def get_adb_path() -> str:
@@ -48,6 +52,21 @@ def print_banner():
     print()
 
 
+def run_plan():
+    """Dry run: report what a sync would transfer and how long it would take."""
+    # No setup wizard: planning doesn't need the device
+    config = with_defaults(load_config() or {})
+    if not os.path.isdir(config['source_folder']):
+        print(f"📭 Source folder {config['source_folder']} doesn't exist yet\n")
+        return
+
+    scan = scan_source(config['source_folder'], set(config['keep_extensions']), set(config['delete_extensions']),
+                       config['zip_exports'])
+    plan = build_plan(scan, config, RunHistory())
+    print_plan(scan, plan, config)
+    print()
+
+
 def main():
     """Main application entry point."""
     print_banner()
@@ -64,30 +83,59 @@ def main():
             print("Usage:")
             print("  pixelsync          Run the sync process")
             print("  pixelsync --reset  Reset configuration and run setup again")
+            print("  pixelsync --plan   Estimate transfer time without pushing or deleting")
+            print("  pixelsync --report Show throughput and unfreed files from past runs")
             print("  pixelsync --help   Show this help message\n")
             return
+        elif sys.argv[1] in ['--plan', '-p']:
+            run_plan()
+            return
+        elif sys.argv[1] in ['--report']:
+            log = TransferLog()
+            print_report(log)
+            log.close()
+            return
 
-    # Get adb path
+    # Get adb path and start the adb server + device handshake in the background
+    startup = Startup()
     adb_path = get_adb_path()
+    startup.probe_device(adb_path)
 
     # Get or create configuration
     config = get_config(adb_path)
 
+    # Scan the source folder in the background while the configuration is shown
+    source_folder = config['source_folder']
+    if not os.path.exists(source_folder):
+        os.makedirs(source_folder)
+    startup.scan_source(scan_source_folder, source_folder, set(config['keep_extensions']),
+                        set(config['delete_extensions']), config['zip_exports'])
+
+    # Start from the best settings measured in earlier runs
+    history = RunHistory()
+    if config['auto_tune']:
+        best = history.best_settings()
+        if best:
+            config['batch_size'], config['push_workers'] = best
+            print(f"🎛️  Auto-tune: using batch size {best[0]}, {best[1]} parallel pushes from run history")
+
     # Show current configuration
     print("\nCurrent Configuration:")
     print(f"  📂 Source folder: {config['source_folder']}")
     print(f"  📱 Device ID: {config['device_id']}")
     print(f"  📦 Batch size: {config['batch_size']} files")
+    print(f"  🔀 Parallel pushes: {config['push_workers']}{' (auto-tune)' if config['auto_tune'] else ''}")
     print(f"  💾 Max storage: {config['max_storage_gb']} GB")
     print(f"  ⏱️  Sleep time: {config['sleep_minutes']} minutes")
     print()
 
-    # Check if source folder has files
-    source_folder = config['source_folder']
-    if not os.path.exists(source_folder):
-        os.makedirs(source_folder)
-
-    file_count = len([f for f in os.listdir(source_folder) if os.path.isfile(os.path.join(source_folder, f))])
+    # Check if source folder has files (the scan is reused by the sync)
+    listing = startup.source()
+    if listing is None:
+        print(f"❌ Can't read {source_folder}/: {startup.source_error}")
+        startup.close()
+        return
+    file_count = len(listing.table) + len(listing.files_to_delete)
 
     if file_count == 0:
         print(f"📭 No files found in {source_folder}/")
@@ -97,12 +145,13 @@ def main():
 
     print(f"📦 Found {file_count} files to process")
     print("\n🚀 Starting sync process...\n")
-    input("Press Enter to continue (or Ctrl+C to cancel)...")
+    startup.ask("Press Enter to continue (or Ctrl+C to cancel)...")
     print()
 
     # Run the sync
+    transfer_log = TransferLog()
     try:
-        success = transfer_to_pixel(
+        result = transfer_to_pixel(
             mac_folder=config['source_folder'],
             pixel_path=config['pixel_path'],
             adb_path=adb_path,
@@ -111,10 +160,34 @@ def main():
             max_size_gb=config['max_storage_gb'],
             sleep_minutes=config['sleep_minutes'],
             keep_extensions=set(config['keep_extensions']),
-            delete_extensions=set(config['delete_extensions'])
+            delete_extensions=set(config['delete_extensions']),
+            compression=config['compression'],
+            skip_unchanged=config['skip_unchanged'],
+            push_workers=config['push_workers'],
+            auto_tune=config['auto_tune'],
+            history=history,
+            transfer_log=transfer_log,
+            order=config['upload_order'],
+            dedup=config['dedup'],
+            bandwidth_limit_mb_s=config['bandwidth_limit_mb_s'],
+            bandwidth_schedule=config['bandwidth_schedule'],
+            resumable_min_mb=config['resumable_min_mb'],
+            health_throttle=config['health_throttle'],
+            max_battery_temp_c=config['max_battery_temp_c'],
+            integrity_check=config['integrity_check'],
+            prefetch_mb=config['prefetch_mb'],
+            rename_collisions=config['rename_collisions'],
+            zip_exports=config['zip_exports'],
+            startup=startup
         )
 
-        if success:
+        # Save the best measured settings (including this run) for next time
+        best = history.best_settings() if config['auto_tune'] else None
+        if best:
+            config['batch_size'], config['push_workers'] = best
+            save_config(config)
+
+        if result.ok:
             print("\n🎉 Sync completed successfully!")
         else:
             print("\n⚠️  Sync completed with some errors.")
@@ -125,6 +198,9 @@ def main():
         print(f"\n❌ Error during sync: {e}")
         import traceback
         traceback.print_exc()
+    finally:
+        transfer_log.close()
+        startup.close()
 
     print()
     input("Press Enter to exit...")
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Read-ahead prefetch for PixelSync
+While `adb push` sends one file, a background thread warms the OS page
+cache with the next files in the queue, so a slow (spinning USB) source
+drive reads ahead instead of sitting idle and then paying the seek and
+read cost right when each push starts.
+"""
+
+import os
+import threading
+from collections import deque
+from typing import Deque, Iterable, Iterator, Optional, Tuple
+
+READ_CHUNK_BYTES = 1024 * 1024
+
+
+def warm_file(path: str, size_bytes: int, buffer: bytearray) -> None:
+    """
+    Pull the first size_bytes of a file into the page cache.
+
+    Uses posix_fadvise(WILLNEED) where available (Linux), which starts the
+    kernel readahead without copying; elsewhere (macOS, Windows) the file
+    is read into a scratch buffer and the data thrown away.
+    """
+    try:
+        if hasattr(os, 'posix_fadvise'):
+            fd = os.open(path, os.O_RDONLY)
+            try:
+                os.posix_fadvise(fd, 0, size_bytes, os.POSIX_FADV_WILLNEED)
+            finally:
+                os.close(fd)
+            return
+
+        with open(path, 'rb', buffering=0) as f:
+            remaining = size_bytes
+            view = memoryview(buffer)
+            while remaining > 0:
+                n = f.readinto(view[:min(remaining, len(buffer))])
+                if not n:
+                    break
+                remaining -= n
+    except OSError:
+        pass  # Prefetch is best effort: the push will report real errors
+
+
+class Prefetcher:
+    """
+    Keeps up to `budget_mb` of upcoming files warm ahead of the push loop.
+
+    Args:
+        files: (path, size in bytes) in upload order
+        budget_mb: Most data warmed ahead of the file being pushed; a file
+            bigger than the budget is only warmed up to the budget
+    """
+
+    def __init__(self, files: Iterable[Tuple[str, int]], budget_mb: float = 256):
+        self.files: Iterator[Tuple[str, int]] = iter(files)
+        self.budget = int(budget_mb * 1024 * 1024)
+        self.position = 0          # Files the push loop has reached
+        self.ahead_bytes = 0
+        self.warmed: Deque[Tuple[int, int]] = deque()  # (file number, bytes warmed)
+        self.closed = False
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> 'Prefetcher':
+        if self.budget > 0:
+            self._thread = threading.Thread(target=self._run, name='pixelsync-prefetch', daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self) -> None:
+        buffer = bytearray(READ_CHUNK_BYTES)
+        for number, (path, size) in enumerate(self.files):
+            amount = min(size, self.budget)
+            with self._cond:
+                while not self.closed and self.ahead_bytes > 0 and self.ahead_bytes + amount > self.budget:
+                    self._cond.wait()
+                if self.closed:
+                    return
+                if number < self.position:
+                    continue  # The push loop got there first
+                self.ahead_bytes += amount
+                self.warmed.append((number, amount))
+            warm_file(path, amount, buffer)
+
+    def advance(self) -> None:
+        """The push loop moved on to the next file: release budget held by files it has reached."""
+        with self._cond:
+            self.position += 1
+            while self.warmed and self.warmed[0][0] < self.position:
+                self.ahead_bytes -= self.warmed.popleft()[1]
+            self._cond.notify()
+
+    def close(self) -> None:
+        with self._cond:
+            self.closed = True
+            self._cond.notify()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Remote file index for PixelSync
+Lists name, size and mtime of every file in the Pixel folder in one round
+trip, so the engine can compare local files against the device and detect
+name collisions without a remote stat per file.
+"""
+
+import hashlib
+import os
+import shlex
+from typing import BinaryIO, Callable, Dict, NamedTuple, Optional, Set, Tuple
+from adb_batch import SLOW_COMMAND_TIMEOUT, run_shell_batch
+from adb_transport import AdbTransport
+from dedup import partial_hash_of
+
+
+class RemoteFile(NamedTuple):
+    """Size and modification time of a file on the device."""
+    size: int
+    mtime: int
+
+
+def fetch_remote_index(pixel_path: str, transport: AdbTransport) -> Optional[Dict[str, RemoteFile]]:
+    """
+    Get {filename: RemoteFile} for the files directly inside pixel_path.
+
+    Returns:
+        dict (empty if the folder doesn't exist yet), or None if the device
+        could not be queried.
+    """
+    path = shlex.quote(pixel_path.rstrip('/') or '/')
+    command = f"[ -d {path} ] || exit 0; find {path} -maxdepth 1 -type f -exec stat -c '%s %Y %n' {{}} +"
+    result = run_shell_batch(transport, [command], SLOW_COMMAND_TIMEOUT, idempotent=True)[0]
+    if not result.ok:
+        return None
+
+    index: Dict[str, RemoteFile] = {}
+    for line in result.output.splitlines():
+        fields = line.split(' ', 2)
+        if len(fields) != 3:
+            continue
+        try:
+            index[os.path.basename(fields[2])] = RemoteFile(int(fields[0]), int(fields[1]))
+        except ValueError:
+            continue
+    return index
+
+
+def local_md5(f: BinaryIO) -> str:
+    h = hashlib.md5()
+    for chunk in iter(lambda: f.read(1024 * 1024), b''):
+        h.update(chunk)
+    return h.hexdigest()
+
+
+class RemoteNameIndex:
+    """
+    Names in the Pixel folder for one run, kept up to date as files are pushed.
+
+    iPhone numbering wraps, so a new IMG_0001.HEIC may be a different photo
+    from the IMG_0001.HEIC already on the Pixel. resolve() finds a name that
+    won't overwrite anything, with O(1) lookups in the cached listing; the
+    device is only asked (md5sum) when a same-name file has the same size
+    but a different mtime.
+    """
+
+    def __init__(self, files: Dict[str, RemoteFile], pixel_path: str, transport: AdbTransport):
+        self.files = files
+        self.pixel_path = pixel_path.rstrip('/')
+        self.transport = transport
+        self.renamed = 0
+        self.reserved: Set[str] = set()  # Names taken by files of this run
+
+    @classmethod
+    def fetch(cls, pixel_path: str, transport: AdbTransport) -> Optional['RemoteNameIndex']:
+        """Index of pixel_path, or None if the device could not be listed."""
+        files = fetch_remote_index(pixel_path, transport)
+        return cls(files, pixel_path, transport) if files is not None else None
+
+    def _same_content(self, name: str, local: RemoteFile, opener: Callable[[], BinaryIO]) -> bool:
+        remote = self.files[name]
+        if remote.size != local.size:
+            return False
+        # Files of this run (e.g. two zip members with the same 2-second
+        # timestamp) can match by size and mtime alone: always compare checksums
+        if remote == local and name not in self.reserved:
+            return True
+        # Same size, different mtime: compare checksums
+        command = f"md5sum {shlex.quote(f'{self.pixel_path}/{name}')}"
+        result = run_shell_batch(self.transport, [command], SLOW_COMMAND_TIMEOUT, idempotent=True)[0]
+        if not result.ok or not result.output.strip():
+            return False
+        with opener() as f:
+            return result.output.split()[0] == local_md5(f)
+
+    def resolve(
+        self,
+        local_path: str,
+        local: Optional[RemoteFile] = None,
+        opener: Optional[Callable[[], BinaryIO]] = None,
+        name: Optional[str] = None
+    ) -> Tuple[str, bool]:
+        """
+        Remote name to push local_path to.
+
+        Args:
+            local_path: File to push
+            local: Its size and mtime, if already known
+            opener: Opens its content (default: the file at local_path);
+                used for files that are not on disk, e.g. inside a zip
+            name: Name wanted on the device (default: the file's own name)
+
+        Returns:
+            (name, already_there): the wanted name unless a different
+            file already uses it; then a deterministic name derived from the
+            content, e.g. IMG_0001_3fa9c2d1.HEIC. already_there is True when
+            the device already holds this exact file under that name.
+        """
+        name = name or os.path.basename(local_path)
+        if name not in self.files:
+            return name, False
+        if local is None:
+            st = os.stat(local_path)
+            local = RemoteFile(st.st_size, int(st.st_mtime))
+        opener = opener or (lambda: open(local_path, 'rb'))
+        if self._same_content(name, local, opener):
+            return name, True
+
+        stem, ext = os.path.splitext(name)
+        with opener() as f:
+            tag = partial_hash_of(f, local.size)[:8]
+        candidate = f"{stem}_{tag}{ext}"
+        n = 1
+        while candidate in self.files:
+            if self._same_content(candidate, local, opener):
+                return candidate, True
+            n += 1
+            candidate = f"{stem}_{tag}_{n}{ext}"
+        return candidate, False
+
+    def reserve(self, name: str, local: RemoteFile) -> None:
+        """Record a file about to be pushed (its size and mtime), so later files can't take its name."""
+        self.files[name] = local
+        self.reserved.add(name)
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Resumable push for large files
+Sends big videos in chunks through `adb exec-in` + `dd seek=` into a hidden
+temporary file on the Pixel, records every chunk the device has confirmed,
+and renames the file into place when complete. A push that fails at 95%
+resumes from the last confirmed chunk instead of byte zero, even across runs.
+Smaller streams (zip export members, files pushed under a bandwidth limit)
+go through the same hidden temporary file in one piece with push_stream.
+"""
+
+import json
+import os
+import posixpath
+import shlex
+import threading
+from typing import Any, BinaryIO, Callable, ContextManager, Dict, Iterator, Optional
+from adb_transport import AdbTransport, PushResult, classify_adb_error
+from bandwidth_limit import BandwidthLimiter
+
+PARTIAL_STATE_FILE = 'pixelsync_partial.json'
+
+BLOCK_BYTES = 1024 * 1024  # dd block size; resume offsets are multiples of this
+CHUNK_BYTES = 64 * BLOCK_BYTES
+TEMP_SUFFIX = '.pixelsync-part'
+
+
+def temp_remote_path(remote_path: str) -> str:
+    """Hidden name next to the final file, so the media scanner ignores it."""
+    folder, name = posixpath.split(remote_path)
+    return posixpath.join(folder, f".{name}{TEMP_SUFFIX}")
+
+
+class PartialPushState:
+    """
+    {local path: {remote, size, mtime, offset}} of unfinished large pushes,
+    saved to PARTIAL_STATE_FILE after every confirmed chunk.
+
+    Args:
+        path: State file
+        min_bytes: Files at least this big are pushed in resumable chunks
+            (0 disables resumable pushes)
+    """
+
+    def __init__(
+        self,
+        path: str = PARTIAL_STATE_FILE,
+        min_bytes: int = 512 * 1024 * 1024,
+        echo: Callable[..., None] = print
+    ):
+        self.path = path
+        self.echo = echo
+        self.min_bytes = min_bytes
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+        if os.path.exists(path):
+            try:
+                with open(path, 'r') as f:
+                    self.entries = json.load(f)
+            except Exception as e:
+                self.echo(f"⚠️  Error loading partial push state: {e}")
+
+    def applies(self, size_bytes: int) -> bool:
+        return self.min_bytes > 0 and size_bytes >= self.min_bytes
+
+    def offset(self, local_path: str, remote_tmp: str) -> int:
+        """Confirmed offset of an earlier attempt, 0 if none or the file changed since."""
+        entry = self.entries.get(local_path)
+        if not entry or entry['remote'] != remote_tmp:
+            return 0
+        st = os.stat(local_path)
+        if entry['size'] != st.st_size or entry['mtime'] != st.st_mtime:
+            return 0
+        return entry['offset']
+
+    def update(self, local_path: str, remote_tmp: str, offset: Optional[int]) -> None:
+        """Record a confirmed offset; None forgets the file (finished or restarted)."""
+        with self._lock:
+            if offset is None:
+                if self.entries.pop(local_path, None) is None:
+                    return
+            else:
+                st = os.stat(local_path)
+                self.entries[local_path] = {
+                    'remote': remote_tmp,
+                    'size': st.st_size,
+                    'mtime': st.st_mtime,
+                    'offset': offset,
+                }
+            try:
+                with open(self.path, 'w') as f:
+                    json.dump(self.entries, f, indent=2)
+            except Exception as e:
+                self.echo(f"⚠️  Error saving partial push state: {e}")
+
+
+def remote_size(transport: AdbTransport, remote_path: str) -> Optional[int]:
+    """Size of a file on the device, or None if it doesn't exist / can't be read."""
+    result = transport.shell(f"stat -c %s {shlex.quote(remote_path)} 2>/dev/null", timeout=30, idempotent=True)
+    try:
+        return int(result.output.strip()) if result.ok else None
+    except ValueError:
+        return None
+
+
+def push_resumable(
+    transport: AdbTransport,
+    state: PartialPushState,
+    local_path: str,
+    remote_path: str,
+    limiter: Optional[BandwidthLimiter] = None,
+    chunk_bytes: int = CHUNK_BYTES
+) -> PushResult:
+    """
+    Push a large file in chunks, resuming from the last confirmed chunk.
+
+    Each chunk is written with `dd seek=` into the temporary file and only
+    counts once `stat` on the device shows it landed, so completed chunks
+    are never sent again. When the whole file is there, it is renamed into
+    place atomically and given the local mtime (like `adb push`).
+
+    Returns:
+        PushResult, with the same transient/tripped semantics as AdbTransport.push
+    """
+    size = os.path.getsize(local_path)
+    mtime = int(os.path.getmtime(local_path))
+    remote_tmp = temp_remote_path(remote_path)
+    quoted_tmp = shlex.quote(remote_tmp)
+
+    offset = state.offset(local_path, remote_tmp)
+    if offset:
+        # Never trust more than the device actually has
+        offset = min(offset, remote_size(transport, remote_tmp) or 0) // BLOCK_BYTES * BLOCK_BYTES
+    if offset:
+        transport.echo(f"\n⏯️  Resuming {os.path.basename(local_path)} at {offset / size:.0%}", flush=True)
+    else:
+        transport.shell(f"rm -f {quoted_tmp}", timeout=30, idempotent=True)
+        state.update(local_path, remote_tmp, None)
+
+    attempts = 0
+    chunk_attempts = 0
+    message = ''
+    with open(local_path, 'rb') as f:
+        while offset < size and not transport.tripped:
+            f.seek(offset)
+            data = f.read(chunk_bytes)
+
+            attempts += 1
+            chunk_attempts += 1
+            command = (f"dd of={quoted_tmp} bs={BLOCK_BYTES} seek={offset // BLOCK_BYTES} "
+                       f"conv=notrunc 2>/dev/null")
+            message = transport.exec_in(command, limiter.paced([data]) if limiter is not None else data)
+            # exec-in doesn't return the remote exit code: the file size is the confirmation
+            if not message and (remote_size(transport, remote_tmp) or 0) >= offset + len(data):
+                offset += len(data)
+                chunk_attempts = 0
+                transport.consecutive_transient = 0
+                state.update(local_path, remote_tmp, offset)
+                continue
+
+            message = message or 'chunk not confirmed by device'
+            if classify_adb_error(message) == 'permanent':
+                return PushResult(False, False, message, attempts)
+            if chunk_attempts > transport.max_retries:
+                break
+            transport.consecutive_transient += 1
+            if not transport.reconnect():
+                break
+
+    if offset < size:
+        return PushResult(False, True, message, attempts)
+
+    quoted_final = shlex.quote(remote_path)
+    result = transport.shell(f"[ $(stat -c %s {quoted_tmp}) -eq {size} ] && "
+                             f"mv -f {quoted_tmp} {quoted_final} && "
+                             f"touch -m -d @{mtime} {quoted_final}", timeout=60, persistent=False)
+    if not result.ok:
+        message = result.output.strip() or 'could not finish resumable push'
+        return PushResult(False, classify_adb_error(message) == 'transient', message, attempts)
+
+    state.update(local_path, remote_tmp, None)
+    return PushResult(True, False, '', attempts)
+
+
+def push_stream(
+    transport: AdbTransport,
+    open_source: Callable[[], ContextManager[BinaryIO]],
+    size: int,
+    mtime: int,
+    remote_path: str,
+    limiter: Optional[BandwidthLimiter] = None,
+    read_error: str = 'could not read source'
+) -> PushResult:
+    """
+    Stream a file to the Pixel in one piece, retrying only on transient errors.
+
+    The data goes to a hidden temporary file; once its size matches, it is
+    renamed into place and given mtime (like `adb push`), so a broken
+    stream never leaves a half file for the media scanner. With a limiter,
+    the stream is paced while it is sent.
+
+    Args:
+        open_source: Opens the data to send (called again for every attempt)
+        read_error: Message prefix when reading the source fails (permanent)
+
+    Returns:
+        PushResult, with the same transient/tripped semantics as AdbTransport.push
+    """
+    remote_tmp = shlex.quote(temp_remote_path(remote_path))
+    quoted_final = shlex.quote(remote_path)
+    finish = (f"[ $(stat -c %s {remote_tmp}) -eq {size} ] && "
+              f"mv -f {remote_tmp} {quoted_final} && "
+              f"touch -m -d @{mtime} {quoted_final}")
+
+    def chunks() -> Iterator[bytes]:
+        with open_source() as f:
+            yield from iter(lambda: f.read(BLOCK_BYTES), b'')
+
+    attempts = 0
+    message = ''
+    while attempts <= transport.max_retries and not transport.tripped:
+        attempts += 1
+        try:
+            message = transport.exec_in(f"cat > {remote_tmp}",
+                                        limiter.paced(chunks()) if limiter is not None else chunks())
+        except Exception as e:
+            # exec_in only raises what reading the source raised
+            return PushResult(False, False, f"{read_error}: {e}", attempts)
+        if not message:
+            # exec-in doesn't return the remote exit code: the size check is the confirmation
+            result = transport.shell(finish, timeout=60, persistent=False)
+            if result.ok:
+                transport.consecutive_transient = 0
+                return PushResult(True, False, '', attempts)
+            message = result.output.strip() or 'stream not confirmed by device'
+
+        if classify_adb_error(message) == 'permanent':
+            return PushResult(False, False, message, attempts)
+        transport.consecutive_transient += 1
+        if not transport.reconnect():
+            break
+
+    return PushResult(False, True, message, attempts)
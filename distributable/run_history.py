@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Run history and auto-tuning for PixelSync
+Keeps per-batch throughput, stalls and failures of past runs in a local
+JSON file, and uses it to pick batch size and push parallelism.
+"""
+
+import json
+import os
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+HISTORY_FILE = 'pixelsync_history.json'
+MAX_RUNS = 50
+
+MIN_BATCH_SIZE = 10
+MAX_BATCH_SIZE = 500
+MAX_PUSH_WORKERS = 4
+
+
+def batch_rate_mb_s(batch: Dict[str, Any]) -> float:
+    """
+    Sustained MB/s of a batch, penalised for failures.
+
+    Measured over the whole batch cycle (status check, pushes, media
+    verify and the pause before the next batch), since those per-batch
+    costs are what batch size trades off. Time spent waiting for Google
+    Photos to free space is excluded: it depends on the drain rate, not on
+    batch size or parallelism.
+    """
+    seconds = batch.get('cycle_seconds', batch['seconds']) - batch.get('stall_seconds', 0.0)
+    if seconds <= 0 or batch['files'] <= 0:
+        return 0.0
+    rate = batch['bytes'] / (1024 * 1024) / seconds
+    return rate * (1 - batch.get('failures', 0) / batch['files'])
+
+
+class RunHistory:
+    """Per-batch records of recent runs, stored in HISTORY_FILE."""
+
+    def __init__(self, path: str = HISTORY_FILE):
+        self.path = path
+        self.runs: List[Dict[str, Any]] = []
+        self.current: Optional[Dict[str, Any]] = None
+
+        if os.path.exists(path):
+            try:
+                with open(path, 'r') as f:
+                    self.runs = json.load(f).get('runs', [])
+            except Exception as e:
+                print(f"⚠️  Error loading run history: {e}")
+
+    def start_run(self, batch_size: int, push_workers: int) -> None:
+        self.current = {
+            'started': time.time(),
+            'batch_size': batch_size,
+            'push_workers': push_workers,
+            'batches': [],
+        }
+
+    def record_batch(
+        self,
+        files: int,
+        size_bytes: int,
+        seconds: float,
+        stall_seconds: float,
+        failures: int,
+        batch_size: int,
+        push_workers: int,
+        cycle_seconds: Optional[float] = None,
+        throttled: bool = False
+    ) -> None:
+        """
+        Record one batch. seconds is the push time; cycle_seconds runs from
+        this batch's status check to the next one (None = same as seconds).
+        Throttled batches count for the push rate but not for best_settings.
+        """
+        if self.current is None:
+            return
+        self.current['batches'].append({
+            'files': files,
+            'bytes': size_bytes,
+            'seconds': round(seconds, 3),
+            'cycle_seconds': round(cycle_seconds if cycle_seconds is not None else seconds, 3),
+            'stall_seconds': round(stall_seconds, 3),
+            'failures': failures,
+            'batch_size': batch_size,
+            'push_workers': push_workers,
+            'throttled': throttled,
+        })
+
+    def finish_run(self, batch_size: int, push_workers: int) -> bool:
+        """Close the current run with the final settings and save the file."""
+        if self.current is None:
+            return False
+        self.current['finished'] = time.time()
+        self.current['final_batch_size'] = batch_size
+        self.current['final_push_workers'] = push_workers
+        self.runs.append(self.current)
+        self.runs = self.runs[-MAX_RUNS:]
+        self.current = None
+
+        try:
+            with open(self.path, 'w') as f:
+                json.dump({'runs': self.runs}, f, indent=2)
+            return True
+        except Exception as e:
+            print(f"⚠️  Error saving run history: {e}")
+            return False
+
+    def recent_rates(self, runs: int = 5) -> Optional[Tuple[float, float]]:
+        """
+        (push MB/s, seconds waiting for storage per MB pushed) over the last
+        `runs` runs, or None without history.
+        """
+        batches = [b for run in self.runs[-runs:] for b in run['batches'] if b['bytes'] > 0]
+        if not batches:
+            return None
+        total_mb = sum(b['bytes'] for b in batches) / (1024 * 1024)
+        push_seconds = sum(b['seconds'] - b.get('stall_seconds', 0.0) for b in batches)
+        stall_seconds = sum(b.get('stall_seconds', 0.0) for b in batches)
+        if push_seconds <= 0:
+            return None
+        return total_mb / push_seconds, stall_seconds / total_mb
+
+    def best_settings(self, min_batches: int = 2) -> Optional[Tuple[int, int]]:
+        """
+        (batch_size, push_workers) with the best sustained MB/s in the history.
+
+        Only settings seen in at least `min_batches` unthrottled batches are considered.
+        """
+        totals: Dict[Tuple[int, int], List[float]] = {}
+        for run in self.runs:
+            for batch in run['batches']:
+                if batch.get('throttled'):
+                    continue
+                key = (batch['batch_size'], batch['push_workers'])
+                entry = totals.setdefault(key, [0.0, 0])
+                entry[0] += batch_rate_mb_s(batch)
+                entry[1] += 1
+
+        candidates = {k: v[0] / v[1] for k, v in totals.items() if v[1] >= min_batches}
+        if not candidates:
+            return None
+        return max(candidates, key=candidates.get)
+
+
+class AutoTuner:
+    """
+    Hill-climbs batch size and push parallelism within a run.
+
+    After every batch the measured MB/s is compared with the previous batch.
+    If the last change helped, the tuner keeps going in that direction,
+    otherwise it reverts it and tries the other knob next time.
+    """
+
+    def __init__(self, batch_size: int, push_workers: int):
+        self.batch_size = batch_size
+        self.push_workers = push_workers
+        self.last_rate: Optional[float] = None
+        self.last_change: Optional[Tuple[str, int]] = None  # (knob, direction)
+        self.next_knob = 'push_workers'
+
+    def _apply(self, knob: str, direction: int) -> bool:
+        if knob == 'push_workers':
+            value = min(max(self.push_workers + direction, 1), MAX_PUSH_WORKERS)
+            changed = value != self.push_workers
+            self.push_workers = value
+        else:
+            factor = 1.5 if direction > 0 else 1 / 1.5
+            value = int(min(max(round(self.batch_size * factor), MIN_BATCH_SIZE), MAX_BATCH_SIZE))
+            changed = value != self.batch_size
+            self.batch_size = value
+        return changed
+
+    def update(self, rate_mb_s: float) -> Tuple[int, int]:
+        """Feed the MB/s of the batch just finished; returns the settings for the next one."""
+        if rate_mb_s <= 0:
+            return self.batch_size, self.push_workers
+
+        if self.last_change is not None and self.last_rate is not None and rate_mb_s < self.last_rate:
+            # Last change made things slower: undo it and try the other knob
+            knob, direction = self.last_change
+            self._apply(knob, -direction)
+            self.next_knob = 'batch_size' if knob == 'push_workers' else 'push_workers'
+            self.last_change = None
+            return self.batch_size, self.push_workers
+
+        self.last_rate = rate_mb_s
+        if self.last_change is not None:
+            knob, direction = self.last_change
+        else:
+            knob, direction = self.next_knob, 1
+
+        if not self._apply(knob, direction):
+            # Hit a limit: switch knobs
+            knob = 'batch_size' if knob == 'push_workers' else 'push_workers'
+            direction = 1
+            if not self._apply(knob, direction):
+                self.last_change = None
+                return self.batch_size, self.push_workers
+        self.last_change = (knob, direction)
+        return self.batch_size, self.push_workers
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Parallel startup for PixelSync
+A cold `adb devices` starts the adb server, which takes several seconds.
+Startup runs the server launch and device handshake, and the source folder
+scan, in background threads while the configuration is loaded and shown.
+Each step runs once and its result is reused by the transfer engine,
+unless it went stale while the user sat at the prompt: a device that was
+missing is probed again, and a folder changed since the scan is rescanned.
+"""
+
+import os
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, NamedTuple, Optional
+from adb_transport import AdbTransport
+
+
+class DeviceProbe(NamedTuple):
+    """Devices adb reported, and how long the server start + handshake took."""
+    devices: Dict[str, str]  # serial -> state ('device', 'unauthorized', 'offline', ...)
+    seconds: float
+
+    def connected(self, device_id: Optional[str] = None) -> bool:
+        """True if the device (or any device) is connected and authorized."""
+        if device_id:
+            return self.devices.get(device_id) == 'device'
+        return 'device' in self.devices.values()
+
+
+def probe_devices(transport: AdbTransport) -> DeviceProbe:
+    """Start the adb server if needed and list devices."""
+    start = time.time()
+    devices = transport.devices()
+    return DeviceProbe(devices, time.time() - start)
+
+
+class Startup:
+    """
+    Slow startup steps running in the background, with their results cached
+    for the rest of the run.
+
+    Also keeps the launch time, so the engine can report the time to the
+    first push (time spent waiting at prompts excluded).
+    """
+
+    def __init__(self):
+        self.started = time.time()
+        self.prompt_seconds = 0.0
+        self._pool = ThreadPoolExecutor(max_workers=2)
+        self._device: Optional[Future] = None
+        self._source: Optional[Future] = None
+        self._scan_started = 0.0
+        self.source_error: Optional[BaseException] = None
+
+    def probe_device(self, adb_path: str) -> None:
+        """Start the adb server launch and device handshake."""
+        self._device = self._pool.submit(probe_devices, AdbTransport([adb_path]))
+
+    def scan_source(self, scan: Callable[..., Any], *args: Any) -> None:
+        """Start the source folder scan, e.g. scan_source_folder(folder, keep, delete)."""
+        self._scan_started = time.time()
+        self._source = self._pool.submit(scan, *args)
+
+    def device(self) -> Optional[DeviceProbe]:
+        """Result of probe_device (waits for it), or None if it wasn't started or failed."""
+        if self._device is None:
+            return None
+        try:
+            return self._device.result()
+        except Exception:
+            return None
+
+    def source(self) -> Any:
+        """
+        Result of scan_source (waits for it), or None if it wasn't started
+        or failed (the exception is kept in source_error).
+        """
+        if self._source is None:
+            return None
+        try:
+            return self._source.result()
+        except Exception as e:
+            self.source_error = e
+            return None
+
+    def source_changed(self, folder: str) -> bool:
+        """True if files were added to or removed from `folder` since the scan started."""
+        try:
+            return os.stat(folder).st_mtime >= self._scan_started
+        except OSError:
+            return True
+
+    def ask(self, prompt: str) -> str:
+        """input() whose waiting time doesn't count as startup time."""
+        asked = time.time()
+        try:
+            return input(prompt)
+        finally:
+            self.prompt_seconds += time.time() - asked
+
+    def since_launch(self, when: Optional[float] = None) -> float:
+        """Seconds from launch to `when` (default: now), without time spent at prompts."""
+        return (when or time.time()) - self.started - self.prompt_seconds
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=False)
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Storage scheduler for PixelSync
+Learns how fast Google Photos frees space on the Pixel and paces pushes
+so the device stays just under the storage cap.
+"""
+
+import time
+from collections import deque
+from typing import Deque, Optional, Tuple
+
+
+class StorageScheduler:
+    """
+    Tracks Pixel folder size samples and push timings to estimate:
+      - push rate: MB/s we manage to send over USB
+      - drain rate: MB/s Google Photos frees up after backing up
+
+    Each size sample is stored together with the cumulative MB pushed at that
+    moment, so the drain between two samples is simply
+    ``pushed_between - (size_after - size_before)``.
+    """
+
+    def __init__(
+        self,
+        max_size_mb: float,
+        sleep_minutes: float,
+        target_fraction: float = 0.95,
+        min_wait_seconds: float = 30.0,
+        window: int = 20
+    ):
+        self.max_size_mb = max_size_mb
+        self.target_mb = max_size_mb * target_fraction
+        self.max_wait_seconds = max(sleep_minutes * 60, min_wait_seconds)
+        self.min_wait_seconds = min_wait_seconds
+
+        # (timestamp, folder size MB, cumulative MB pushed)
+        self.samples: Deque[Tuple[float, float, float]] = deque(maxlen=window)
+        self.pushed_mb = 0.0
+        self.push_seconds = 0.0
+
+    # ------------------------------------------------------------------
+    # Observations
+    # ------------------------------------------------------------------
+
+    def record_size(self, size_mb: float, now: Optional[float] = None) -> None:
+        """Record a `du` sample of the Pixel folder."""
+        now = time.time() if now is None else now
+        self.samples.append((now, size_mb, self.pushed_mb))
+
+    def record_push(self, size_mb: float, seconds: float) -> None:
+        """Record a successful push of `size_mb` that took `seconds`."""
+        self.pushed_mb += size_mb
+        self.push_seconds += max(seconds, 0.0)
+
+    # ------------------------------------------------------------------
+    # Estimates
+    # ------------------------------------------------------------------
+
+    def push_rate_mb_s(self) -> float:
+        """Average push throughput so far (0 if nothing pushed yet)."""
+        if self.push_seconds <= 0:
+            return 0.0
+        return self.pushed_mb / self.push_seconds
+
+    def drain_rate_mb_s(self) -> float:
+        """Rate at which Google Photos frees space, from the sample window."""
+        if len(self.samples) < 2:
+            return 0.0
+
+        t0, size0, pushed0 = self.samples[0]
+        t1, size1, pushed1 = self.samples[-1]
+        elapsed = t1 - t0
+        if elapsed <= 0:
+            return 0.0
+
+        drained = (pushed1 - pushed0) - (size1 - size0)
+        return max(drained / elapsed, 0.0)
+
+    def estimated_size_mb(self, now: Optional[float] = None) -> float:
+        """Current folder size extrapolated from the last sample, without a `du`."""
+        if not self.samples:
+            return 0.0
+
+        now = time.time() if now is None else now
+        t, size, pushed = self.samples[-1]
+        drained = self.drain_rate_mb_s() * max(now - t, 0.0)
+        return max(size + (self.pushed_mb - pushed) - drained, 0.0)
+
+    # ------------------------------------------------------------------
+    # Pacing
+    # ------------------------------------------------------------------
+
+    def fits(self, current_mb: float, file_mb: float) -> bool:
+        """
+        Whether a file of `file_mb` can be pushed now.
+
+        Files bigger than the whole cap are let through as soon as the folder
+        is below the cap, otherwise they would never be sent.
+        """
+        if current_mb >= self.max_size_mb:
+            return False
+        return current_mb + file_mb <= self.max_size_mb or file_mb >= self.target_mb
+
+    def wait_seconds(self, current_mb: float, file_mb: float) -> float:
+        """
+        How long to wait before the next file fits under the cap.
+
+        With a known drain rate we wait just long enough for the space to be
+        freed, so pushing resumes as soon as possible instead of sleeping the
+        full `sleep_minutes`. Without one we poll at the minimum interval to
+        learn it.
+        """
+        if self.fits(current_mb, file_mb):
+            return 0.0
+
+        drain = self.drain_rate_mb_s()
+        if drain <= 0:
+            return self.min_wait_seconds
+
+        needed_mb = current_mb + min(file_mb, self.target_mb) - self.target_mb
+        wait = needed_mb / drain
+        return min(max(wait, self.min_wait_seconds), self.max_wait_seconds)
+
+    def projected_seconds(self, remaining_mb: float, current_mb: float) -> Optional[float]:
+        """
+        Projected time to push `remaining_mb` more.
+
+        Pushing is limited by USB until the free headroom is used up; after
+        that every extra MB has to be drained by Google Photos first.
+        """
+        push = self.push_rate_mb_s()
+        if push <= 0:
+            return None
+
+        seconds = remaining_mb / push
+        headroom = max(self.max_size_mb - current_mb, 0.0)
+        overflow = remaining_mb - headroom
+        if overflow > 0:
+            drain = self.drain_rate_mb_s()
+            if drain <= 0:
+                return None
+            seconds = max(seconds, overflow / drain)
+        return seconds
+
+    def eta_line(self, remaining_mb: float, current_mb: float) -> str:
+        """Human readable rates and projected completion time."""
+        push = self.push_rate_mb_s()
+        drain = self.drain_rate_mb_s()
+        rates = f"push {push:.1f} MB/s, drain {drain:.2f} MB/s"
+
+        seconds = self.projected_seconds(remaining_mb, current_mb)
+        if seconds is None:
+            return f"⏱️  Projected completion: learning rates... ({rates})"
+
+        finish = time.strftime('%a %H:%M', time.localtime(time.time() + seconds))
+        return f"⏱️  Projected completion: {finish} (in {format_duration(seconds)}) - {rates}"
+
+
+def format_duration(seconds: float) -> str:
+    """Format seconds as e.g. '2h 13m' or '45s'."""
+    seconds = int(seconds)
+    if seconds < 60:
+        return f"{seconds}s"
+    minutes, _ = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours < 24:
+        return f"{hours}h {minutes:02d}m" if hours else f"{minutes}m"
+    days, hours = divmod(hours, 24)
+    return f"{days}d {hours}h"
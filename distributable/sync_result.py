@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Result and progress types of the PixelSync engine
+transfer_to_pixel reports progress as SyncEvents to an optional callback
+and returns a SyncResult with a FileResult for every file, so scripts,
+benchmarks and both entry points can drive the engine without parsing
+its console output. FileResults are built on demand from the run's
+FileTable, so a million-file run keeps no per-file objects around.
+"""
+
+from array import array
+from collections.abc import Sequence as SequenceABC
+from typing import Callable, Dict, NamedTuple, Optional
+from file_table import FileTable, STATE_NAMES
+
+
+class FileResult(NamedTuple):
+    """What happened to one file of the run."""
+    name: str
+    local_path: str               # Inside a zip export: archive path + member path
+    remote_path: Optional[str]    # Path on the Pixel, if it was pushed or already there
+    state: str                    # 'pushed', 'skipped', 'failed', 'invalid', 'duplicate' or 'pending'
+    size_bytes: int
+    seconds: float                # Push time (0 if not pushed)
+    message: str                  # Push error or integrity problem ('' if none)
+
+
+class SyncEvent(NamedTuple):
+    """
+    Progress of a run.
+
+    kind is one of:
+        'start'  - files scanned; total is known
+        'batch'  - a batch starts (message: 'batch N, M files')
+        'file'   - a file is done (file is set)
+        'wait'   - pushing waits for the Pixel (message says why)
+        'finish' - the run is over (message: '' or why it stopped)
+    """
+    kind: str
+    done: int                     # Files handled so far
+    total: int
+    file: Optional[FileResult] = None
+    message: str = ''
+
+
+ProgressCallback = Callable[[SyncEvent], None]
+
+
+class FileResults(SequenceABC):
+    """
+    Read-only sequence of FileResult by file index, built on demand.
+
+    Args:
+        table: Files of the run (names, sizes, states)
+        remote_path: Path on the Pixel of a file index, None if not there
+        seconds: Push seconds by file index
+        messages: Push error or integrity problem by file index (only files that have one)
+    """
+
+    def __init__(
+        self,
+        table: FileTable,
+        remote_path: Callable[[int], Optional[str]] = lambda index: None,
+        seconds: Optional[array] = None,
+        messages: Optional[Dict[int, str]] = None
+    ):
+        self.table = table
+        self.remote_path = remote_path
+        self.seconds = seconds
+        self.messages = messages if messages is not None else {}
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+    def __getitem__(self, index: int) -> FileResult:
+        if index < 0:
+            index += len(self.table)
+        if not 0 <= index < len(self.table):
+            raise IndexError(index)
+        table = self.table
+        return FileResult(table.names[index], table.path(index), self.remote_path(index),
+                          STATE_NAMES[table.states[index]], table.sizes[index],
+                          self.seconds[index] if self.seconds is not None else 0.0,
+                          self.messages.get(index, ''))
+
+    def count_state(self, state: str) -> int:
+        return self.table.counts[STATE_NAMES.index(state)]
+
+    def bytes_in_state(self, state: str) -> int:
+        return self.table.bytes_by_state[STATE_NAMES.index(state)]
+
+
+class SyncResult(NamedTuple):
+    ok: bool                      # Every file was pushed, already on the Pixel or a duplicate
+                                  # (none failed or was quarantined as incomplete)
+    files: FileResults
+    seconds: float
+    first_push_seconds: Optional[float]  # From the start of the run to the first push
+    message: str = ''             # Why the run stopped early ('' if it didn't)
+
+    def count(self, state: str) -> int:
+        return self.files.count_state(state)
+
+    @property
+    def bytes_pushed(self) -> int:
+        return self.files.bytes_in_state('pushed')
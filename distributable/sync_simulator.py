@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Offline simulator of the PixelSync transfer loop.
+
+Usage:
+    python3 sync_simulator.py [source_folder]
+
+Replays the file sizes of a real source folder (default: the configured
+source_folder) through a model of transfer_to_pixel - batches, storage
+checks, waits for Google Photos, pauses between batches - on a virtual
+clock, driving the real StorageScheduler. Every parameter set in
+PARAMETER_GRID is simulated and compared by projected wall time and idle
+time, in seconds instead of days of live runs.
+
+Push bandwidth, per-call overhead, status (du) cost and drain rate are
+pluggable models; edit MODELS below or call simulate() from Python.
+"""
+
+import itertools
+import sys
+from typing import Callable, Dict, List, NamedTuple, Set
+from storage_scheduler import StorageScheduler, format_duration
+from capacity_plan import BATCH_PAUSE_SECONDS, PER_FILE_SECONDS
+from pixel_sync_core import scan_source_folder
+
+
+class SimModels(NamedTuple):
+    """Cost models, all in seconds (or MB/s for the drain)."""
+    push_seconds: Callable[[int], float]       # size in bytes -> USB transfer time
+    call_overhead: float                       # per push: adb startup + engine's pause between files
+    status_seconds: Callable[[int], float]     # files in the Pixel folder -> du/status round trip
+    drain_mb_s: Callable[[float], float]       # simulated time -> MB/s Google Photos frees
+
+
+class SimResult(NamedTuple):
+    wall_seconds: float
+    push_seconds: float
+    storage_wait_seconds: float   # Idle: waiting for Google Photos to free space
+    pause_seconds: float          # Idle: pauses between batches
+    status_seconds: float
+    batches: int
+    storage_waits: int
+
+    @property
+    def idle_seconds(self) -> float:
+        return self.storage_wait_seconds + self.pause_seconds
+
+
+def constant_bandwidth(mb_s: float) -> Callable[[int], float]:
+    return lambda size_bytes: size_bytes / (1024 * 1024) / mb_s
+
+
+def linear_status_cost(base: float = 0.3, per_file: float = 0.0002) -> Callable[[int], float]:
+    """`du` + `find | wc` walk every file in the folder."""
+    return lambda files: base + per_file * files
+
+
+def constant_drain(mb_s: float) -> Callable[[float], float]:
+    return lambda now: mb_s
+
+
+def daytime_drain(day_mb_s: float, night_mb_s: float, day_start_hour: int = 8, day_end_hour: int = 23
+                  ) -> Callable[[float], float]:
+    """Different upload speed during the day (shared Wi-Fi) and at night; the run starts at midnight."""
+    def drain(now: float) -> float:
+        hour = (now / 3600) % 24
+        return day_mb_s if day_start_hour <= hour < day_end_hour else night_mb_s
+    return drain
+
+
+class _Device:
+    """Pixel folder on the virtual clock: grows with pushes, shrinks with the drain."""
+
+    def __init__(self, models: SimModels):
+        self.models = models
+        self.now = 0.0
+        self.size_mb = 0.0
+        self.files = 0
+        self.avg_file_mb = 1.0
+
+    def advance(self, seconds: float, step: float = 60.0) -> None:
+        end = self.now + seconds
+        while self.now < end:
+            dt = min(step, end - self.now)
+            drained = min(self.models.drain_mb_s(self.now) * dt, self.size_mb)
+            self.size_mb -= drained
+            self.files = max(self.files - int(round(drained / self.avg_file_mb)), 0)
+            self.now += dt
+
+    def status(self) -> float:
+        """Run one status round trip; returns its cost."""
+        cost = self.models.status_seconds(self.files)
+        self.advance(cost)
+        return cost
+
+
+def simulate(
+    sizes: List[int],
+    batch_size: int,
+    max_size_gb: float,
+    sleep_minutes: float,
+    models: SimModels,
+    push_workers: int = 1
+) -> SimResult:
+    """
+    Run the transfer loop for files of the given sizes.
+
+    Mirrors transfer_to_pixel: a status sample before every batch, the
+    scheduler's estimate to pace files, wait_for_storage when a file
+    doesn't fit, and a pause between batches. Parallel pushes share the
+    USB bandwidth, so they only hide per-call overhead.
+    """
+    device = _Device(models)
+    if sizes:
+        device.avg_file_mb = max(sum(sizes) / len(sizes) / (1024 * 1024), 0.001)
+    scheduler = StorageScheduler(max_size_gb * 1024, sleep_minutes)
+    push = wait = pause = status = 0.0
+    waits = 0
+    batches = 0
+
+    for start in range(0, len(sizes), batch_size):
+        batches += 1
+        status += device.status()
+        scheduler.record_size(device.size_mb, now=device.now)
+
+        for size in sizes[start:start + batch_size]:
+            file_mb = size / (1024 * 1024)
+
+            if not scheduler.fits(scheduler.estimated_size_mb(now=device.now), file_mb):
+                # wait_for_storage: du, then sleep/recheck until the file fits
+                status += device.status()
+                scheduler.record_size(device.size_mb, now=device.now)
+                while not scheduler.fits(device.size_mb, file_mb):
+                    seconds = scheduler.wait_seconds(device.size_mb, file_mb)
+                    device.advance(seconds)
+                    wait += seconds
+                    waits += 1
+                    status += device.status()
+                    scheduler.record_size(device.size_mb, now=device.now)
+
+            transfer = models.push_seconds(size)
+            seconds = transfer + models.call_overhead / push_workers
+            device.advance(seconds)
+            device.size_mb += file_mb
+            device.files += 1
+            scheduler.record_push(file_mb, transfer)
+            push += seconds
+
+        if start + batch_size < len(sizes):
+            # Media verification round trip + pause between batches
+            status += device.status()
+            device.advance(BATCH_PAUSE_SECONDS)
+            pause += BATCH_PAUSE_SECONDS
+
+    return SimResult(device.now, push, wait, pause, status, batches, waits)
+
+
+def folder_sizes(
+    folder: str,
+    keep_extensions: Set[str],
+    delete_extensions: Set[str] = frozenset(),
+    zip_exports: bool = True
+) -> List[int]:
+    """Sizes of the files a sync would push (zip export members included), from scan_source_folder."""
+    table = scan_source_folder(folder, keep_extensions, delete_extensions, zip_exports).table
+    return [table.sizes[k] for k in table.order]
+
+
+def compare(sizes: List[int], grid: Dict[str, list], models: SimModels) -> List[tuple]:
+    """Simulate every combination in grid; returns (params, SimResult) sorted by wall time."""
+    keys = list(grid)
+    results = []
+    for values in itertools.product(*(grid[k] for k in keys)):
+        params = dict(zip(keys, values))
+        results.append((params, simulate(sizes, models=models, **params)))
+    results.sort(key=lambda item: item[1].wall_seconds)
+    return results
+
+
+# Parameter sets to compare (every combination is simulated)
+PARAMETER_GRID = {
+    'batch_size': [25, 50, 100, 200],
+    'max_size_gb': [5.0, 10.0, 20.0],
+    'sleep_minutes': [5, 15, 30],
+    'push_workers': [1, 2],
+}
+
+# Cost models: measure these on your setup for realistic projections
+MODELS = SimModels(
+    push_seconds=constant_bandwidth(20.0),       # adb push over USB
+    call_overhead=PER_FILE_SECONDS,              # adb process start + 0.5s pause per file
+    status_seconds=linear_status_cost(),         # du + find over the Pixel folder
+    drain_mb_s=daytime_drain(1.5, 4.0),          # Google Photos upload
+)
+
+if __name__ == "__main__":
+    from config_manager import load_config, with_defaults
+
+    config = with_defaults(load_config() or {})
+    folder = sys.argv[1] if len(sys.argv) > 1 else config['source_folder']
+    sizes = folder_sizes(folder, set(config['keep_extensions']), set(config['delete_extensions']),
+                         config['zip_exports'])
+    if not sizes:
+        print(f"📭 No files to simulate in {folder}")
+        sys.exit(0)
+
+    total_gb = sum(sizes) / (1024 ** 3)
+    print(f"🧪 Simulating {len(sizes)} files ({total_gb:.1f} GB) from {folder}\n")
+    print(f"{'batch':>6} {'max GB':>7} {'sleep':>6} {'push':>5} | {'wall':>9} {'idle':>9} {'waits':>6}")
+    for params, result in compare(sizes, PARAMETER_GRID, MODELS):
+        print(f"{params['batch_size']:>6} {params['max_size_gb']:>7g} {params['sleep_minutes']:>5}m "
+              f"{params['push_workers']:>5} | {format_duration(result.wall_seconds):>9} "
+              f"{format_duration(result.idle_seconds):>9} {result.storage_waits:>6}")
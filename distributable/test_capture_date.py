@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Tests of the capture date reader on hand-built headers.
+
+Usage:
+    python3 -m unittest test_capture_date     (from distributable/)
+"""
+
+import calendar
+import io
+import os
+import shutil
+import struct
+import tempfile
+import time
+import unittest
+from capture_date import MISSING_DATE, DateCache, capture_dates, read_isobmff_date, read_jpeg_date
+
+
+def exif_jpeg(date: str, offset: str = '') -> bytes:
+    """JPEG header with an APP1 EXIF block holding DateTimeOriginal (and OffsetTimeOriginal)."""
+    entries = [(0x9003, date.encode() + b'\0')]
+    if offset:
+        entries.append((0x9011, offset.encode() + b'\0'))
+    exif_ifd = 26
+    data_at = exif_ifd + 2 + 12 * len(entries) + 4
+    ifd = struct.pack('<H', len(entries))
+    values = b''
+    for tag, value in entries:
+        ifd += struct.pack('<HHII', tag, 2, len(value), data_at + len(values))
+        values += value
+    tiff = (b'II*\0' + struct.pack('<I', 8)
+            + struct.pack('<HHHII', 1, 0x8769, 4, 1, exif_ifd) + struct.pack('<I', 0)
+            + ifd + struct.pack('<I', 0) + values)
+    app1 = b'Exif\0\0' + tiff
+    return b'\xff\xd8\xff\xe1' + struct.pack('>H', len(app1) + 2) + app1 + b'\xff\xda'
+
+
+class ExifDateTest(unittest.TestCase):
+
+    def test_offset_time_gives_utc(self):
+        date = read_jpeg_date(io.BytesIO(exif_jpeg('2024:06:01 12:00:00', '+02:00')))
+        self.assertEqual(date, calendar.timegm((2024, 6, 1, 10, 0, 0)))
+
+    def test_no_offset_is_local_time(self):
+        date = read_jpeg_date(io.BytesIO(exif_jpeg('2024:06:01 12:00:00')))
+        self.assertEqual(date, time.mktime((2024, 6, 1, 12, 0, 0, 0, 0, -1)))
+
+
+def box(box_type: bytes, payload: bytes) -> bytes:
+    return struct.pack('>I', 8 + len(payload)) + box_type + payload
+
+
+class HeicTest(unittest.TestCase):
+
+    def test_corrupt_item_count_is_bounded(self):
+        infe = box(b'infe', b'\x02\0\0\0' + struct.pack('>HH', 1, 0) + b'Exif')
+        iinf = box(b'iinf', b'\0\0\0\0' + struct.pack('>H', 1) + infe)
+        iloc = box(b'iloc', b'\x02\0\0\0' + bytes([0x44, 0x40]) + struct.pack('>I', 0xFFFFFFFF) + b'\0' * 16)
+        data = box(b'ftyp', b'heic\0\0\0\0') + box(b'meta', b'\0\0\0\0' + iinf + iloc)
+
+        start = time.monotonic()
+        self.assertIsNone(read_isobmff_date(io.BytesIO(data), len(data)))
+        self.assertLess(time.monotonic() - start, 1.0)
+
+
+class DateCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp(prefix='pixelsync_test_')
+        self.cache = DateCache(os.path.join(self.tmp, 'dates.json'))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_vanished_file_gets_sentinel(self):
+        photo = os.path.join(self.tmp, 'a.jpg')
+        with open(photo, 'wb') as f:
+            f.write(exif_jpeg('2024:06:01 12:00:00', '+00:00'))
+        gone = os.path.join(self.tmp, 'gone.jpg')
+
+        dates = capture_dates([photo, gone], self.cache)
+
+        self.assertEqual(list(dates), [calendar.timegm((2024, 6, 1, 12, 0, 0)), MISSING_DATE])
+        self.assertNotIn(gone, self.cache.entries)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+End-to-end tests of the transfer engine against a FakeDevice.
+
+Usage:
+    python3 -m unittest test_pixel_sync_core     (from distributable/)
+"""
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+import zipfile
+from bandwidth_limit import BandwidthLimiter
+from compression_policy import CompressionPolicy
+from fake_device import FakeDevice
+from pixel_sync_core import push_file, transfer_to_pixel
+
+CAMERA = '/sdcard/DCIM/Camera/'
+
+
+def jpeg(seed: int, size: int = 4096) -> bytes:
+    """Complete (SOI ... EOI) JPEG-looking bytes, different for every seed."""
+    body = bytes((seed * 31 + i) % 251 for i in range(size))
+    return b'\xff\xd8\xff\xe0' + body + b'\xff\xd9'
+
+
+class EngineTestCase(unittest.TestCase):
+    """Runs in a scratch folder: the engine keeps its caches in the working directory."""
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.tmp = tempfile.mkdtemp(prefix='pixelsync_test_')
+        os.chdir(self.tmp)
+        self.src = os.path.join(self.tmp, 'src')
+        os.makedirs(self.src)
+        self.fake = FakeDevice(os.path.join(self.tmp, 'pixel'))
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def write(self, name: str, data: bytes) -> str:
+        path = os.path.join(self.src, name)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+
+    def sync(self, **options):
+        options = dict({'verbose': False, 'health_throttle': False, 'prefetch_mb': 0}, **options)
+        return transfer_to_pixel(self.src, self.fake.path(CAMERA), transport=self.fake.transport(), **options)
+
+    def on_device(self):
+        return sorted(os.listdir(self.fake.path(CAMERA)))
+
+
+class DedupDateOrderTest(EngineTestCase):
+    """Date order reads only files still to push, not the ones dedup moved aside."""
+
+    def test_duplicate_with_date_order(self):
+        self.write('a.jpg', jpeg(1))
+        self.write('b.jpg', jpeg(2))
+        self.write('b (1).jpg', jpeg(2))
+
+        result = self.sync(order='date', dedup='quarantine')
+
+        self.assertTrue(result.ok, result.message)
+        self.assertEqual(self.on_device(), ['a.jpg', 'b.jpg'])
+        self.assertEqual(result.count('duplicate'), 1)
+        self.assertTrue(os.path.exists(os.path.join(self.src, '_duplicates', 'b (1).jpg')))
+
+    def test_duplicate_with_date_order_and_zip_export(self):
+        self.write('b.jpg', jpeg(2))
+        self.write('b (1).jpg', jpeg(2))
+        with zipfile.ZipFile(os.path.join(self.src, 'export.zip'), 'w') as archive:
+            archive.writestr('Photos/c.jpg', jpeg(3))
+
+        result = self.sync(order='date', dedup='quarantine')
+
+        self.assertTrue(result.ok, result.message)
+        self.assertEqual(self.on_device(), ['b.jpg', 'c.jpg'])
+        self.assertEqual(result.count('duplicate'), 1)
+        self.assertFalse(os.path.exists(os.path.join(self.src, 'export.zip')))
+
+
+class ResultTest(EngineTestCase):
+    """SyncResult.ok and the per-file results."""
+
+    def test_quarantined_file_is_not_ok(self):
+        self.write('a.jpg', jpeg(1))
+        self.write('cut.jpg', jpeg(2)[:-2])  # No EOI: truncated export
+
+        result = self.sync(integrity_check=True)
+
+        self.assertFalse(result.ok)
+        self.assertEqual(result.count('invalid'), 1)
+        self.assertEqual(result.count('pushed'), 1)
+        self.assertEqual(self.on_device(), ['a.jpg'])
+        by_name = {f.name: f for f in result.files}
+        self.assertEqual(by_name['a.jpg'].remote_path, self.fake.path(CAMERA) + 'a.jpg')
+        self.assertIsNone(by_name['cut.jpg'].remote_path)
+        self.assertTrue(by_name['cut.jpg'].message)
+
+
+class BandwidthLimitTest(EngineTestCase):
+    """The limit holds during one push, not only on average between files."""
+
+    def test_single_file_throughput(self):
+        size = 2 * 1024 * 1024
+        path = self.write('big.mp4', os.urandom(size))
+        remote = self.fake.path(CAMERA) + 'big.mp4'
+        limiter = BandwidthLimiter(1.0)
+
+        start = time.monotonic()
+        result, _, _ = push_file(self.fake.transport(), CompressionPolicy(), path, remote, 'none', limiter)
+        elapsed = time.monotonic() - start
+
+        self.assertTrue(result.ok, result.message)
+        self.assertLessEqual(size / (1024 * 1024) / elapsed, 1.1)
+        self.assertEqual(os.path.getsize(remote), size)
+        self.assertEqual(int(os.path.getmtime(remote)), int(os.path.getmtime(path)))
+        self.assertEqual(self.on_device(), ['big.mp4'])
+
+
+if __name__ == "__main__":
+    unittest.main()
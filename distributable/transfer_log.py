@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Transfer log for PixelSync
+Records every push, skip, failure, local delete and quarantine, plus files
+Google Photos has freed from the Pixel, in a local SQLite database, and
+answers questions across runs for `pixelsync --report`. The python_scripts
+tools record their pulls back to the computer and deletes on the Pixel in
+the same database.
+
+Events are buffered in memory and written in one transaction per batch, so
+logging costs the transfer loop a list append.
+"""
+
+import os
+import posixpath
+import sqlite3
+import time
+from typing import Iterable, List, Optional, Tuple
+
+LOG_FILE = 'pixelsync_log.db'
+FLUSH_EVENTS = 500  # Write early if a batch produces more events than this
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    started REAL NOT NULL,
+    finished REAL,
+    source TEXT,
+    pixel_path TEXT,
+    device_id TEXT,
+    ok INTEGER
+);
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    session_id INTEGER NOT NULL REFERENCES sessions(id),
+    time REAL NOT NULL,
+    action TEXT NOT NULL,      -- push, skip, fail, delete, quarantine, freed, pull, remote_delete
+    name TEXT NOT NULL,        -- File name on the computer
+    remote_path TEXT,          -- Path on the Pixel (push, skip, freed, pull, remote_delete)
+    ext TEXT,
+    bytes INTEGER,
+    seconds REAL,              -- Push / pull time
+    detail TEXT                -- Compression, error or reason
+);
+CREATE INDEX IF NOT EXISTS events_name ON events(name);
+CREATE INDEX IF NOT EXISTS events_remote ON events(remote_path, action);
+CREATE INDEX IF NOT EXISTS events_session ON events(session_id);
+CREATE INDEX IF NOT EXISTS events_time ON events(time);
+"""
+
+# Pushes with no later 'freed' event for the same device path
+UNFREED_QUERY = """
+SELECT p.remote_path, MAX(p.time), p.bytes FROM events p
+WHERE p.action = 'push' AND NOT EXISTS (
+    SELECT 1 FROM events f
+    WHERE f.remote_path = p.remote_path AND f.action = 'freed' AND f.time > p.time)
+GROUP BY p.remote_path
+ORDER BY MAX(p.time)
+"""
+
+
+class TransferLog:
+    """SQLite log of one or more sync runs, stored in LOG_FILE."""
+
+    def __init__(self, path: str = LOG_FILE):
+        self.path = path
+        self.session_id: Optional[int] = None
+        self.pending: List[tuple] = []
+        self.db: Optional[sqlite3.Connection] = None
+        try:
+            self.db = sqlite3.connect(path)
+            self.db.executescript(SCHEMA)
+        except sqlite3.Error as e:
+            print(f"⚠️  Transfer log unavailable: {e}")
+            self.db = None
+
+    def start_session(self, source: Optional[str], pixel_path: str, device_id: Optional[str]) -> None:
+        if self.db is None:
+            return
+        with self.db:
+            cursor = self.db.execute(
+                "INSERT INTO sessions (started, source, pixel_path, device_id) VALUES (?, ?, ?, ?)",
+                (time.time(), source, pixel_path, device_id))
+        self.session_id = cursor.lastrowid
+
+    def record(
+        self,
+        action: str,
+        name: str,
+        remote_path: Optional[str] = None,
+        size_bytes: Optional[int] = None,
+        seconds: Optional[float] = None,
+        detail: Optional[str] = None
+    ) -> None:
+        """Buffer one event; written by the next flush()."""
+        if self.session_id is None:
+            return
+        ext = os.path.splitext(name)[1].lower()
+        self.pending.append((self.session_id, time.time(), action, name, remote_path, ext,
+                             size_bytes, seconds, detail))
+        if len(self.pending) >= FLUSH_EVENTS:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write buffered events in one transaction."""
+        if self.db is None or not self.pending:
+            return
+        try:
+            with self.db:
+                self.db.executemany(
+                    "INSERT INTO events (session_id, time, action, name, remote_path, ext, bytes, seconds, detail)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", self.pending)
+        except sqlite3.Error as e:
+            print(f"\n⚠️  Error writing transfer log: {e}")
+        self.pending = []
+
+    def record_freed(self, pixel_path: str, present: Iterable[str]) -> int:
+        """
+        Log pushed files that are no longer in the Pixel folder (freed by
+        Google Photos since they were pushed).
+
+        Args:
+            pixel_path: Pixel folder that was listed
+            present: Names currently in that folder
+
+        Returns:
+            int: Number of files newly marked as freed
+        """
+        if self.db is None or self.session_id is None:
+            return 0
+        folder = pixel_path.rstrip('/')
+        present = set(present)
+        freed = 0
+        for remote_path, _, size_bytes in self.db.execute(UNFREED_QUERY).fetchall():
+            name = posixpath.basename(remote_path)
+            if posixpath.dirname(remote_path) == folder and name not in present:
+                self.record('freed', name, remote_path, size_bytes)
+                freed += 1
+        self.flush()
+        return freed
+
+    def finish_session(self, ok: bool) -> None:
+        self.flush()
+        if self.db is None or self.session_id is None:
+            return
+        with self.db:
+            self.db.execute("UPDATE sessions SET finished = ?, ok = ? WHERE id = ?",
+                            (time.time(), int(ok), self.session_id))
+        self.session_id = None
+
+    def close(self) -> None:
+        if self.db is not None:
+            self.flush()
+            self.db.close()
+            self.db = None
+
+    # ------------------------------------------------------------------
+    # Reports
+    # ------------------------------------------------------------------
+
+    def throughput_by_day(self, days: int = 14) -> List[Tuple[str, int, int, float]]:
+        """(day, files pushed, bytes, push seconds) for the most recent days."""
+        return self.db.execute(
+            "SELECT date(time, 'unixepoch', 'localtime') AS day, COUNT(*), SUM(bytes), SUM(seconds)"
+            " FROM events WHERE action = 'push' GROUP BY day ORDER BY day DESC LIMIT ?", (days,)).fetchall()
+
+    def rate_by_type(self) -> List[Tuple[str, int, float]]:
+        """(extension, files pushed, MB/s per push), slowest first."""
+        return self.db.execute(
+            "SELECT ext, COUNT(*), SUM(bytes) / 1048576.0 / SUM(seconds) AS rate FROM events"
+            " WHERE action = 'push' AND seconds > 0 GROUP BY ext ORDER BY rate").fetchall()
+
+    def unfreed(self) -> List[Tuple[str, float, int]]:
+        """(device path, last push time, bytes) of pushed files not yet seen freed, oldest first."""
+        return self.db.execute(UNFREED_QUERY).fetchall()
+
+    def pulled(self) -> Tuple[int, int, int]:
+        """(files pulled back to the computer, their bytes, files deleted on the Pixel by the scripts)."""
+        return self.db.execute(
+            "SELECT SUM(action = 'pull'), SUM(CASE WHEN action = 'pull' THEN bytes ELSE 0 END),"
+            " SUM(action = 'remote_delete') FROM events WHERE action IN ('pull', 'remote_delete')").fetchone()
+
+    def failures(self, limit: int = 10) -> List[Tuple[str, int, str]]:
+        """(file name, failed attempts, last error) of files that failed most often."""
+        return self.db.execute(
+            "SELECT name, COUNT(*), detail FROM events WHERE action = 'fail'"
+            " GROUP BY name ORDER BY COUNT(*) DESC, MAX(time) DESC LIMIT ?", (limit,)).fetchall()
+
+
+def print_report(log: TransferLog) -> None:
+    """Print the --report summary."""
+    if log.db is None:
+        return
+    sessions = log.db.execute("SELECT COUNT(*), MIN(started) FROM sessions").fetchone()
+    if not sessions[0]:
+        print("📭 No transfers recorded yet\n")
+        return
+    since = time.strftime('%Y-%m-%d', time.localtime(sessions[1]))
+    print(f"📒 {sessions[0]} runs recorded since {since}\n")
+
+    print("📅 Throughput per day:")
+    for day, files, size_bytes, seconds in log.throughput_by_day():
+        rate = size_bytes / (1024 * 1024) / seconds if seconds else 0.0
+        print(f"   {day}  {files:>6} files  {size_bytes / (1024 ** 3):>7.2f} GB  {rate:>6.1f} MB/s")
+
+    print("\n🐌 Slowest file types (MB/s per push):")
+    for ext, files, rate in log.rate_by_type():
+        print(f"   {ext or '(none)':<8} {rate:>6.1f} MB/s  ({files} files)")
+
+    unfreed = log.unfreed()
+    if unfreed:
+        gb = sum(row[2] or 0 for row in unfreed) / (1024 ** 3)
+        print(f"\n📌 {len(unfreed)} pushed files not yet freed from the Pixel ({gb:.2f} GB), oldest first:")
+        now = time.time()
+        for remote_path, pushed, _ in unfreed[:10]:
+            print(f"   {remote_path}  (pushed {(now - pushed) / 86400:.1f} days ago)")
+        print("   Files are seen as freed when a later run no longer finds them on the Pixel")
+
+    pulls, pulled_bytes, remote_deletes = log.pulled()
+    if pulls or remote_deletes:
+        print(f"\n⬇️  Pulled back from the Pixel: {pulls or 0} files ({(pulled_bytes or 0) / (1024 ** 3):.2f} GB), "
+              f"{remote_deletes or 0} files deleted on the Pixel")
+
+    failures = log.failures()
+    if failures:
+        print("\n⚠️  Files that failed most often:")
+        for name, attempts, error in failures:
+            print(f"   {name}: {attempts}x - {error}")
+    print()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+ZIP export support for PixelSync
+iCloud and Google Takeout exports arrive as large .zip files. Instead of
+extracting tens of GB to disk first, the photos and videos inside are
+treated as files of the source folder and streamed straight from the
+archive to the Pixel through `adb exec-in`. An archive is deleted once
+every one of its photos is on the Pixel.
+"""
+
+import os
+import time
+import zipfile
+from contextlib import contextmanager
+from typing import BinaryIO, Callable, Dict, Iterator, List, NamedTuple, Optional, Set
+from adb_transport import AdbTransport, PushResult
+from bandwidth_limit import BandwidthLimiter
+from remote_index import RemoteFile
+from resumable_push import push_stream
+
+ARCHIVE_EXTENSIONS = {'.zip'}
+
+
+class ZipMember(NamedTuple):
+    archive: str
+    info: zipfile.ZipInfo
+
+
+def member_mtime(info: zipfile.ZipInfo) -> int:
+    """Modification time stored in the archive (local time, 2-second resolution)."""
+    return int(time.mktime(info.date_time + (0, 0, -1)))
+
+
+def list_members(
+    archive_path: str,
+    keep_extensions: Set[str],
+    echo: Callable[..., None] = print
+) -> Optional[List[zipfile.ZipInfo]]:
+    """
+    Photos/videos in an archive, read from its central directory only.
+
+    Returns:
+        Members with a kept extension, or None if the archive can't be read
+    """
+    try:
+        with zipfile.ZipFile(archive_path) as archive:
+            infos = archive.infolist()
+    except (zipfile.BadZipFile, OSError) as e:
+        echo(f"⚠️  Can't read {os.path.basename(archive_path)}: {e}")
+        return None
+
+    members = []
+    for info in infos:
+        name = info.filename.rsplit('/', 1)[-1]
+        if info.is_dir() or name.startswith('.') or info.filename.startswith('__MACOSX/'):
+            continue
+        if os.path.splitext(name)[1].lower() in keep_extensions:
+            members.append(info)
+    return members
+
+
+class ZipExports:
+    """
+    Archive members added to the run's FileTable, by file index.
+
+    Tracks how many members of each archive are still to be sent, so the
+    archive is only deleted when all of them made it to the Pixel.
+    """
+
+    def __init__(self):
+        self.members: Dict[int, ZipMember] = {}
+        self._left: Dict[str, int] = {}
+        self._failed: Set[str] = set()
+
+    def __contains__(self, index: int) -> bool:
+        return index in self.members
+
+    def __len__(self) -> int:
+        return len(self.members)
+
+    @property
+    def archives(self) -> List[str]:
+        return list(self._left)
+
+    @staticmethod
+    def virtual_path(archive_path: str, info: zipfile.ZipInfo) -> str:
+        """Path of a member as if the archive were a folder, e.g. export.zip/Photos/IMG_0001.HEIC."""
+        return os.path.join(archive_path, *info.filename.split('/'))
+
+    def add(self, index: int, archive_path: str, info: zipfile.ZipInfo) -> None:
+        self.members[index] = ZipMember(archive_path, info)
+        self._left[archive_path] = self._left.get(archive_path, 0) + 1
+
+    def stat(self, index: int) -> RemoteFile:
+        """Size and mtime the member will have on the Pixel."""
+        info = self.members[index].info
+        return RemoteFile(info.file_size, member_mtime(info))
+
+    @contextmanager
+    def open(self, index: int) -> Iterator[BinaryIO]:
+        """Read one member (its own handle on the archive, safe across threads)."""
+        member = self.members[index]
+        with zipfile.ZipFile(member.archive) as archive:
+            with archive.open(member.info) as f:
+                yield f
+
+    def finish(self, index: int, ok: bool) -> Optional[str]:
+        """
+        Mark a member as done.
+
+        Returns:
+            The archive path when this was its last member and none failed
+            (the archive can be deleted), otherwise None
+        """
+        archive = self.members[index].archive
+        if not ok:
+            self._failed.add(archive)
+        self._left[archive] -= 1
+        if self._left[archive] == 0 and archive not in self._failed:
+            return archive
+        return None
+
+
+def push_member(
+    transport: AdbTransport,
+    zips: ZipExports,
+    index: int,
+    remote_path: str,
+    limiter: Optional[BandwidthLimiter] = None
+) -> PushResult:
+    """
+    Stream one archive member to the Pixel (see push_stream).
+
+    Returns:
+        PushResult, with the same transient/tripped semantics as AdbTransport.push
+    """
+    local = zips.stat(index)
+    return push_stream(transport, lambda: zips.open(index), local.size, local.mtime, remote_path,
+                       limiter, read_error='corrupt in archive')
@@ -8,8 +8,16 @@ Use this after you've verified files are backed up to Google Photos.
 
 import subprocess
 import os
+import sys
 from typing import Optional, List
 
+# Shares the distributable app's adb helpers and transfer log
+DISTRIBUTABLE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'distributable')
+sys.path.append(DISTRIBUTABLE_DIR)
+from adb_batch import SLOW_COMMAND_TIMEOUT
+from adb_session import AdbShellSession
+from transfer_log import LOG_FILE, TransferLog
+
 
 def get_file_list(pixel_path: str, adb_cmd: List[str]) -> List[str]:
     """Get list of files from Pixel directory."""
@@ -21,13 +29,18 @@ def get_file_list(pixel_path: str, adb_cmd: List[str]) -> List[str]:
     return []
 
 
-def delete_files_from_pixel(pixel_path: str, device_id: Optional[str] = None) -> bool:
+def delete_files_from_pixel(
+    pixel_path: str,
+    device_id: Optional[str] = None,
+    transfer_log: Optional[TransferLog] = None
+) -> bool:
     """
     Delete ALL files from Pixel phone Camera folder.
 
     Args:
         pixel_path: Path on the Pixel phone (e.g., '/sdcard/DCIM/Camera/')
         device_id: Optional device ID if multiple devices connected
+        transfer_log: Optional log to record every deleted file in
 
     Returns:
         bool: True if successful, False otherwise
@@ -68,9 +81,13 @@ def delete_files_from_pixel(pixel_path: str, device_id: Optional[str] = None) ->
         print(f"   ... and {total_files - 5} more files")
     print()
 
-    # Delete files one by one
+    if transfer_log is not None:
+        transfer_log.start_session(None, pixel_path, device_id)
+
+    # Delete files one by one through a single persistent shell
     deleted = 0
     failed = []
+    session = AdbShellSession(adb_cmd)
 
     for i, file_path in enumerate(files, 1):
         filename = os.path.basename(file_path)
@@ -82,15 +99,16 @@ def delete_files_from_pixel(pixel_path: str, device_id: Optional[str] = None) ->
         # Print with carriage return to overwrite
         print(f"\r{progress_msg:<120}", end='', flush=True)
 
-        # Delete file - quote path to handle special characters
-        rm_cmd = adb_cmd + ['shell', 'rm', f'"{file_path}"']
-        result = subprocess.run(rm_cmd, capture_output=True, text=True)
+        # Delete file - run_args quotes the path for special characters
+        result = session.run_args(['rm', file_path])
 
-        if result.returncode == 0:
+        if result.ok:
             deleted += 1
+            if transfer_log is not None:
+                transfer_log.record('remote_delete', filename, file_path)
         else:
             print(f"\n⚠️  Failed to delete {filename}")
-            print(f"    Error: {result.stderr}")
+            print(f"    Error: {result.output}")
             failed.append(filename)
 
     # Clear the line and print final summary
@@ -104,15 +122,18 @@ def delete_files_from_pixel(pixel_path: str, device_id: Optional[str] = None) ->
 
     # Clean up empty directories on phone
     print(f"🗑️  Cleaning up empty directories on phone...")
-    cleanup_cmd = adb_cmd + ['shell', f'find {pixel_path} -type d -empty -delete']
-    subprocess.run(cleanup_cmd, capture_output=True, text=True)
+    session.run_args(['find', pixel_path, '-type', 'd', '-empty', '-delete'], timeout=SLOW_COMMAND_TIMEOUT)
+    session.close()
 
+    if transfer_log is not None:
+        transfer_log.finish_session(not failed)
     return len(failed) == 0
 
 
 # Configuration
 PIXEL_PATH = '/sdcard/DCIM/Camera/'
 DEVICE_ID = 'HT6940202447'
+LOG_PATH = os.path.join(DISTRIBUTABLE_DIR, LOG_FILE)  # Shared with `pixelsync --report`
 
 if __name__ == "__main__":
     print("="*60)
@@ -145,10 +166,15 @@ if __name__ == "__main__":
 
     print("\n🗑️  Starting deletion process...\n")
 
-    success = delete_files_from_pixel(
-        pixel_path=PIXEL_PATH,
-        device_id=DEVICE_ID
-    )
+    transfer_log = TransferLog(LOG_PATH)
+    try:
+        success = delete_files_from_pixel(
+            pixel_path=PIXEL_PATH,
+            device_id=DEVICE_ID,
+            transfer_log=transfer_log
+        )
+    finally:
+        transfer_log.close()
 
     if success:
         print("\n✅ Deletion complete!")
@@ -7,23 +7,179 @@ Also handles syncing from Mac to Pixel for unlimited Google Photos backup!
 
 import subprocess
 import os
+import shlex
+import shutil
 import sys
+import tarfile
 import time
 from pathlib import Path
-from typing import Optional, List, Set
+from typing import Any, Optional, List, Set
+
+# Uploads run the distributable app's engine (and share its adb helpers and transfer log)
+DISTRIBUTABLE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'distributable')
+sys.path.append(DISTRIBUTABLE_DIR)
+import pixel_sync_core as engine
+from adb_batch import SLOW_COMMAND_TIMEOUT
+from adb_session import AdbShellSession
+from adb_transport import AdbTransport
+from transfer_log import LOG_FILE, TransferLog
+from pixel_sync_core import get_file_list
+from sync_result import ProgressCallback, SyncResult
+
+# Same database `pixelsync --report` reads when run from distributable/
+LOG_PATH = os.path.join(DISTRIBUTABLE_DIR, LOG_FILE)
+
+# Engine features these scripts never had; pass them to transfer_to_pixel to opt in.
+# Photos inside .zip exports are streamed; zips without photos follow delete_extensions
+SCRIPT_DEFAULTS = {
+    'zip_exports': True,
+    'integrity_check': False,
+    'health_throttle': False,
+    'dedup': 'off',
+}
+
+
+def unique_destination(mac_path: str, filename: str) -> str:
+    """
+    Destination path for filename in mac_path that doesn't overwrite anything.
+
+    'IMG_0001.HEIC' becomes 'IMG_0001 (1).HEIC', 'IMG_0001 (2).HEIC', ...
+    """
+    destination = os.path.join(mac_path, filename)
+    name, ext = os.path.splitext(filename)
+    counter = 1
+    while os.path.exists(destination):
+        destination = os.path.join(mac_path, f"{name} ({counter}){ext}")
+        counter += 1
+    return destination
+
+
+def delete_remote_files(file_paths: List[str], session: AdbShellSession, chunk_size: int = 200) -> bool:
+    """
+    Delete many files on the phone in one round trip.
+
+    Paths are sent as `rm -f -- ...` commands of `chunk_size` paths each (to
+    stay under the device's argument length limit), all in one script.
+    """
+    if not file_paths:
+        return True
+    commands = []
+    for i in range(0, len(file_paths), chunk_size):
+        chunk = file_paths[i:i + chunk_size]
+        commands.append('rm -f -- ' + ' '.join(shlex.quote(p) for p in chunk))
+    # Exit code of the script is non-zero if any chunk failed
+    script = 'status=0; ' + ' '.join(f'{c} || status=1;' for c in commands) + ' exit $status'
+    # rm -f of an already deleted file succeeds, so a dropped shell can safely retry
+    return session.run(script, timeout=SLOW_COMMAND_TIMEOUT, idempotent=True).ok
+
+
+def stream_files_from_pixel(
+    pixel_path: str,
+    mac_path: str,
+    adb_cmd: List[str],
+    transfer_log: Optional[TransferLog] = None
+) -> bool:
+    """
+    Move a whole folder from the Pixel in one `adb exec-out tar` stream.
+
+    Members are extracted on the fly into mac_path (flattened, renamed on
+    name collisions), each through a temporary '.part' file. Only members
+    that were written completely are then deleted from the phone, in one
+    bulk command. Pulls and deletes are recorded in `transfer_log`.
+
+    Returns:
+        bool: True if the stream finished and every extracted file was deleted
+    """
+    remote_dir = pixel_path.rstrip('/') or '/'
+    parent, base = os.path.split(remote_dir)
+    # exec-out mixes remote stderr into stdout: tar warnings would corrupt the stream
+    tar_cmd = f"tar -cf - -C {shlex.quote(parent or '/')} {shlex.quote(base)} 2>/dev/null"
+
+    print(f"📦 Streaming {remote_dir} as a tar archive...")
+    proc = subprocess.Popen(adb_cmd + ['exec-out', tar_cmd], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+    extracted = []  # Remote paths of fully extracted files
+    partial = None
+    total_bytes = 0
+    start = time.time()
+    stream_ok = True
 
+    try:
+        with tarfile.open(fileobj=proc.stdout, mode='r|') as tar:
+            for member in tar:
+                if not member.isfile():
+                    continue
+
+                filename = os.path.basename(member.name)
+                destination = unique_destination(mac_path, filename)
+                partial = destination + '.part'
+
+                source = tar.extractfile(member)
+                with open(partial, 'wb') as out:
+                    shutil.copyfileobj(source, out, 1024 * 1024)
+
+                if os.path.getsize(partial) != member.size:
+                    os.remove(partial)
+                    partial = None
+                    print(f"\n⚠️  {filename} arrived incomplete - left on phone")
+                    continue
+
+                os.replace(partial, destination)
+                partial = None
+                os.utime(destination, (member.mtime, member.mtime))
+                extracted.append(f"{parent}/{member.name}")
+                total_bytes += member.size
+                if transfer_log is not None:
+                    transfer_log.record('pull', filename, extracted[-1], member.size, detail=destination)
+
+                elapsed = max(time.time() - start, 1e-6)
+                progress_msg = (f"⬇️  [{len(extracted)}] {total_bytes / (1024 * 1024):.0f} MB "
+                                f"({total_bytes / (1024 * 1024) / elapsed:.1f} MB/s) Extracted: {filename}")
+                print(f"\r{progress_msg:<120}", end='', flush=True)
+    except (tarfile.TarError, OSError) as e:
+        # Truncated stream (e.g. cable unplugged): keep what completed
+        stream_ok = False
+        print(f"\n⚠️  Tar stream interrupted: {e}")
+    finally:
+        # Remove a half-written member left by an interrupted stream
+        if partial and os.path.exists(partial):
+            os.remove(partial)
+
+    proc.stdout.close()
+    stderr = proc.stderr.read().decode(errors='replace').strip()
+    returncode = proc.wait()
+    if returncode != 0:
+        stream_ok = False
+        print(f"\n⚠️  tar exited with status {returncode}{': ' + stderr if stderr else ''}")
+
+    print(f"\r{' ' * 120}\r", end='')
+    print(f"✅ Extracted {len(extracted)} files ({total_bytes / (1024 * 1024):.1f} MB)")
+
+    # One bulk delete of exactly the members that arrived complete
+    print(f"🗑️  Deleting {len(extracted)} transferred files from phone...")
+    session = AdbShellSession(adb_cmd)
+    deleted_ok = delete_remote_files(extracted, session)
+    if not deleted_ok:
+        print("⚠️  Some files could not be deleted from the phone")
+    elif transfer_log is not None:
+        for remote_path in extracted:
+            transfer_log.record('remote_delete', os.path.basename(remote_path), remote_path)
 
-def get_file_list(pixel_path: str, adb_cmd: List[str]) -> List[str]:
-    """Get list of files from Pixel directory."""
-    ls_cmd = adb_cmd + ['shell', 'find', pixel_path, '-type', 'f']
-    result = subprocess.run(ls_cmd, capture_output=True, text=True)
-    if result.returncode == 0:
-        files = [f.strip() for f in result.stdout.strip().split('\n') if f.strip()]
-        return files
-    return []
+    # Clean up empty directories on phone
+    print(f"🗑️  Cleaning up empty directories on phone...")
+    session.run_args(['find', pixel_path, '-type', 'd', '-empty', '-delete'], timeout=SLOW_COMMAND_TIMEOUT)
+    session.close()
 
+    return stream_ok and deleted_ok
 
-def transfer_files_from_pixel(pixel_path: str, mac_path: str, device_id: Optional[str] = None) -> bool:
+
+def transfer_files_from_pixel(
+    pixel_path: str,
+    mac_path: str,
+    device_id: Optional[str] = None,
+    stream_tar: bool = False,
+    transfer_log: Optional[TransferLog] = None
+) -> bool:
     """
     Cut (move) files from Pixel phone to Mac with verbose progress.
 
@@ -31,6 +187,9 @@ def transfer_files_from_pixel(pixel_path: str, mac_path: str, device_id: Optiona
         pixel_path: Path on the Pixel phone (e.g., '/sdcard/DCIM/Camera/')
         mac_path: Destination path on Mac (e.g., '/Users/javiquix/Pictures/')
         device_id: Optional device ID if multiple devices connected (e.g., 'HT6940202447')
+        stream_tar: If True, pull the whole folder as one `tar` stream instead
+            of one `adb pull` per file (much faster for thousands of files)
+        transfer_log: Optional log to record every pull and delete on the phone in
 
     Returns:
         bool: True if successful, False otherwise
@@ -61,20 +220,32 @@ def transfer_files_from_pixel(pixel_path: str, mac_path: str, device_id: Optiona
 
     print(f"📱 Connected to Pixel device")
 
+    if transfer_log is not None:
+        transfer_log.start_session(mac_path, pixel_path, device_id)
+
+    if stream_tar:
+        ok = stream_files_from_pixel(pixel_path, mac_path, adb_cmd, transfer_log)
+        if transfer_log is not None:
+            transfer_log.finish_session(ok)
+        return ok
+
     # Get list of files
     print(f"📋 Getting file list from {pixel_path}...")
     files = get_file_list(pixel_path, adb_cmd)
 
     if not files:
         print(f"⚠️  No files found in {pixel_path}")
+        if transfer_log is not None:
+            transfer_log.finish_session(True)
         return True
 
     total_files = len(files)
     print(f"📦 Found {total_files} files to transfer\n")
 
-    # Transfer files one by one
+    # Transfer files one by one (deletes go through one persistent shell)
     transferred = 0
     failed = []
+    session = AdbShellSession(adb_cmd)
 
     for i, file_path in enumerate(files, 1):
         filename = os.path.basename(file_path)
@@ -89,20 +260,26 @@ def transfer_files_from_pixel(pixel_path: str, mac_path: str, device_id: Optiona
         # Pull individual file directly to destination (flatten structure)
         destination_file = os.path.join(mac_path, filename)
         pull_cmd = adb_cmd + ['pull', file_path, destination_file]
+        pull_start = time.time()
         result = subprocess.run(pull_cmd, capture_output=True, text=True)
 
         if result.returncode == 0:
+            if transfer_log is not None:
+                transfer_log.record('pull', filename, file_path, os.path.getsize(destination_file),
+                                    time.time() - pull_start, destination_file)
+
             # Delete from phone after successful transfer
-            # Quote the file path to handle special characters like parentheses
-            rm_cmd = adb_cmd + ['shell', 'rm', f'"{file_path}"']
-            rm_result = subprocess.run(rm_cmd, capture_output=True, text=True)
+            # run_args quotes the path to handle special characters like parentheses
+            rm_result = session.run_args(['rm', file_path])
 
-            if rm_result.returncode == 0:
+            if rm_result.ok:
                 transferred += 1
+                if transfer_log is not None:
+                    transfer_log.record('remote_delete', filename, file_path)
             else:
                 # Pull succeeded but delete failed
                 print(f"\n⚠️  Pulled {filename} but failed to delete from phone")
-                print(f"    Error: {rm_result.stderr}")
+                print(f"    Error: {rm_result.output}")
                 failed.append(filename)
         else:
             failed.append(filename)
@@ -118,19 +295,26 @@ def transfer_files_from_pixel(pixel_path: str, mac_path: str, device_id: Optiona
 
     # Clean up empty directories on phone
     print(f"🗑️  Cleaning up empty directories on phone...")
-    cleanup_cmd = adb_cmd + ['shell', f'find {pixel_path} -type d -empty -delete']
-    subprocess.run(cleanup_cmd, capture_output=True, text=True)
+    session.run_args(['find', pixel_path, '-type', 'd', '-empty', '-delete'], timeout=SLOW_COMMAND_TIMEOUT)
+    session.close()
 
+    if transfer_log is not None:
+        transfer_log.finish_session(not failed)
     return len(failed) == 0
 
 
-def get_pixel_folder_size_mb(pixel_path: str, device_id: Optional[str] = None) -> float:
+def get_pixel_folder_size_mb(
+    pixel_path: str,
+    device_id: Optional[str] = None,
+    session: Optional[AdbShellSession] = None
+) -> float:
     """
     Get total size of files in a Pixel directory in MB.
 
     Args:
         pixel_path: Path on the Pixel phone
         device_id: Optional device ID if multiple devices connected
+        session: Optional persistent shell to run `du` through
 
     Returns:
         float: Size in megabytes
@@ -138,17 +322,7 @@ def get_pixel_folder_size_mb(pixel_path: str, device_id: Optional[str] = None) -
     adb_cmd = ['adb']
     if device_id:
         adb_cmd.extend(['-s', device_id])
-
-    # Use du to get size in KB, then convert to MB
-    du_cmd = adb_cmd + ['shell', f'du -sk {pixel_path}']
-
-    try:
-        result = subprocess.run(du_cmd, capture_output=True, text=True, check=True)
-        size_kb = int(result.stdout.split()[0])
-        size_mb = size_kb / 1024
-        return size_mb
-    except (subprocess.CalledProcessError, ValueError, IndexError):
-        return 0.0
+    return engine.get_pixel_folder_size_mb(pixel_path, AdbTransport(adb_cmd, session=session))
 
 
 def transfer_to_pixel(
@@ -160,12 +334,22 @@ def transfer_to_pixel(
     sleep_minutes: int = 30,
     keep_extensions: Optional[Set[str]] = None,
     delete_extensions: Optional[Set[str]] = None,
-    add_suffix: bool = False
-) -> None:
+    add_suffix: bool = False,
+    progress: Optional[ProgressCallback] = None,
+    **options: Any
+) -> SyncResult:
     """
     Transfer files from Mac to Pixel in batches, monitoring storage space.
     Optionally renames files with _pixel suffix before extension.
 
+    Runs the same engine as the distributable app (distributable/pixel_sync_core.py),
+    so both entry points share its pushes and storage pacing. Photos and
+    videos inside .zip exports are streamed straight from the archive, which
+    is deleted once all of them are on the Pixel (a zip without any follows
+    delete_extensions). The app's other extra steps stay off unless asked
+    for in **options: there is no integrity quarantine, health throttling
+    or dedup.
+
     Args:
         mac_folder: Source folder on Mac (e.g., '01_files_to_sink')
         pixel_path: Destination path on Pixel (e.g., '/sdcard/DCIM/Camera/')
@@ -176,194 +360,26 @@ def transfer_to_pixel(
         keep_extensions: Set of extensions to transfer (e.g., {'.heic', '.mov'})
         delete_extensions: Set of extensions to delete without transferring (e.g., {'.aae'})
         add_suffix: If True, adds '_pixel' suffix to filenames before extension (default: False)
-    """
-    mac_folder = os.path.expanduser(mac_folder)
-    keep_extensions = keep_extensions or {'.heic', '.mov', '.jpg', '.jpeg', '.png', '.mp4'}
-    delete_extensions = delete_extensions or {'.aae'}
-
-    # Normalize extensions to lowercase
-    keep_extensions = {ext.lower() for ext in keep_extensions}
-    delete_extensions = {ext.lower() for ext in delete_extensions}
-
-    # Build adb command
-    adb_cmd = ['adb']
-    if device_id:
-        adb_cmd.extend(['-s', device_id])
-
-    # Check device connection
-    check_cmd = adb_cmd + ['devices']
-    result = subprocess.run(check_cmd, capture_output=True, text=True)
-    if 'device' not in result.stdout:
-        print("❌ No device connected or device unauthorized")
-        return
-
-    print(f"📱 Connected to Pixel device")
-    print(f"📁 Source: {mac_folder}")
-    print(f"📁 Destination: {pixel_path}")
-    print(f"⚙️  Batch size: {batch_size} files")
-    print(f"⚙️  Max storage: {max_size_gb} GB")
-    print(f"⚙️  Sleep time: {sleep_minutes} minutes when full\n")
-
-    # Get all files to process
-    all_files = []
-    files_to_delete = []
-
-    for filename in os.listdir(mac_folder):
-        filepath = os.path.join(mac_folder, filename)
-        if not os.path.isfile(filepath):
-            continue
-
-        ext = os.path.splitext(filename)[1].lower()
-
-        if ext in delete_extensions:
-            files_to_delete.append(filepath)
-        elif ext in keep_extensions:
-            all_files.append(filepath)
-
-    # Delete unwanted files first
-    if files_to_delete:
-        print(f"🗑️  Deleting {len(files_to_delete)} unwanted files ({', '.join(delete_extensions)})...")
-        for filepath in files_to_delete:
-            try:
-                os.remove(filepath)
-                print(f"   Deleted: {os.path.basename(filepath)}")
-            except Exception as e:
-                print(f"   ⚠️  Failed to delete {os.path.basename(filepath)}: {e}")
-        print()
-
-    if not all_files:
-        print("⚠️  No files to transfer")
-        return
-
-    total_files = len(all_files)
-    print(f"📦 Found {total_files} files to transfer\n")
-
-    transferred = 0
-    failed = []
-
-    # Process files in batches
-    for i in range(0, len(all_files), batch_size):
-        batch = all_files[i:i + batch_size]
-
-        # Check Pixel storage before each batch
-        current_size_mb = get_pixel_folder_size_mb(pixel_path, device_id)
-        current_size_gb = current_size_mb / 1024
-
-        print(f"📊 Current Pixel storage: {current_size_gb:.2f} GB / {max_size_gb} GB")
-
-        # Wait if storage is too full
-        while current_size_gb >= max_size_gb:
-            print(f"⏸️  Storage full ({current_size_gb:.2f} GB >= {max_size_gb} GB)")
-            print(f"💤 Sleeping for {sleep_minutes} minutes...")
-            print(f"   💡 Good time to free up space!")
-            time.sleep(sleep_minutes * 60)
-
-            current_size_mb = get_pixel_folder_size_mb(pixel_path, device_id)
-            current_size_gb = current_size_mb / 1024
-            print(f"📊 Rechecked storage: {current_size_gb:.2f} GB / {max_size_gb} GB")
+        progress: Optional callback receiving a SyncEvent per scanned batch and file
+        **options: Other engine settings (e.g., push_workers=2, zip_exports=False, verbose=False)
 
-        # Transfer batch
-        print(f"\n🚀 Processing batch {(i // batch_size) + 1} ({len(batch)} files)...")
-
-        for j, mac_file in enumerate(batch, 1):
-            filename = os.path.basename(mac_file)
-
-            # Optionally add _pixel suffix before extension
-            if add_suffix:
-                name, ext = os.path.splitext(filename)
-                pixel_filename = f"{name}_pixel{ext}"
-            else:
-                pixel_filename = filename
-            pixel_file_path = f"{pixel_path.rstrip('/')}/{pixel_filename}"
-
-            # Progress
-            overall_progress = transferred + j
-            percentage = (overall_progress / total_files) * 100
-            progress_line = f"⬆️  [{overall_progress}/{total_files}] ({percentage:.1f}%) Uploading: {pixel_filename}"
-            # Clear line and print progress (pad with spaces to ensure previous text is overwritten)
-            print(f"\r{progress_line:<120}", end='', flush=True)
-
-            # Push to Pixel
-            push_cmd = adb_cmd + ['push', mac_file, pixel_file_path]
-            result = subprocess.run(push_cmd, capture_output=True, text=True)
-
-            if result.returncode == 0:
-                # Delete from Mac after successful transfer
-                try:
-                    os.remove(mac_file)
-                    transferred += 1
-                except Exception as e:
-                    print(f"\n⚠️  Failed to delete {filename} from Mac: {e}")
-
-                # Small delay between files to prevent overwhelming the device
-                time.sleep(0.5)
-            else:
-                failed.append(filename)
-                print(f"\n⚠️  Failed to upload {filename}")
-
-        print()  # New line after batch
-
-        # Trigger media scanner to help Google Photos detect new files
-        print(f"📢 Notifying media scanner of new files...")
-        # Touch files to update timestamps (helps media scanner)
-        if add_suffix:
-            touch_cmd = adb_cmd + ['shell', 'find /sdcard/DCIM/Camera -name "*_pixel*" -exec touch {} \\;']
-        else:
-            # Touch all files in the Camera directory
-            touch_cmd = adb_cmd + ['shell', 'find /sdcard/DCIM/Camera -type f -exec touch {} \\;']
-        subprocess.run(touch_cmd, capture_output=True, text=True)
-
-        # Broadcast media scanner intent to force re-scan
-        scan_cmd = adb_cmd + ['shell', 'am', 'broadcast', '-a', 'android.intent.action.MEDIA_SCANNER_SCAN_FILE', '-d', 'file:///sdcard/DCIM/Camera']
-        subprocess.run(scan_cmd, capture_output=True, text=True)
-
-        # Pause between batches to let Pixel breathe and sync to Google Photos
-        if i + batch_size < len(all_files):  # Don't pause after last batch
-            pause_seconds = 10
-            print(f"⏸️  Pausing {pause_seconds} seconds between batches to let Pixel sync...")
-            print(f"   💡 Good time to check Google Photos sync status!")
-            time.sleep(pause_seconds)
-
-    # Final summary
-    print(f"\n{'='*60}")
-    print(f"✅ Successfully transferred: {transferred}/{total_files} files")
-
-    if failed:
-        print(f"⚠️  Failed to transfer {len(failed)} files:")
-        for f in failed:
-            print(f"   - {f}")
-
-    final_size_mb = get_pixel_folder_size_mb(pixel_path, device_id)
-    final_size_gb = final_size_mb / 1024
-    print(f"📊 Final Pixel storage: {final_size_gb:.2f} GB")
-    print(f"{'='*60}\n")
-
-    # Final media scanner trigger
-    print("📢 Final media scanner notification...")
-    if add_suffix:
-        touch_cmd = adb_cmd + ['shell', 'find /sdcard/DCIM/Camera -name "*_pixel*" -exec touch {} \\;']
-    else:
-        touch_cmd = adb_cmd + ['shell', 'find /sdcard/DCIM/Camera -type f -exec touch {} \\;']
-    subprocess.run(touch_cmd, capture_output=True, text=True)
-
-    # Broadcast media scanner intent to force full re-scan
-    scan_cmd = adb_cmd + ['shell', 'am', 'broadcast', '-a', 'android.intent.action.MEDIA_SCANNER_SCAN_FILE', '-d', 'file:///sdcard/DCIM/Camera']
-    subprocess.run(scan_cmd, capture_output=True, text=True)
-
-    # Also try triggering a full media re-scan
-    rescan_cmd = adb_cmd + ['shell', 'am', 'broadcast', '-a', 'android.intent.action.MEDIA_MOUNTED', '-d', 'file:///sdcard']
-    subprocess.run(rescan_cmd, capture_output=True, text=True)
-
-    print("\n📱 Next steps to ensure Google Photos detects all files:")
-    print("   1. On Pixel: Settings → Apps → Google Photos → Force Stop")
-    print("   2. Open Google Photos app again")
-    print("   3. Wait 1-2 minutes for it to scan")
-    print("   4. Check backup status (should show all files)")
-    print("   5. When backup complete, use 'Free up space'")
-
-    if final_size_gb >= max_size_gb * 0.8:  # Warn if 80% full
-        print(f"\n⚠️  Storage is {(final_size_gb/max_size_gb)*100:.0f}% full!")
-        print("💡 Tip: Run 'Free up space' in Google Photos app to free storage!")
+    Returns:
+        SyncResult: ok, and what happened to every file
+    """
+    settings = dict(SCRIPT_DEFAULTS, **options)
+    return engine.transfer_to_pixel(
+        mac_folder=mac_folder,
+        pixel_path=pixel_path,
+        device_id=device_id,
+        batch_size=batch_size,
+        max_size_gb=max_size_gb,
+        sleep_minutes=sleep_minutes,
+        keep_extensions=keep_extensions or {'.heic', '.mov', '.jpg', '.jpeg', '.png', '.mp4'},
+        delete_extensions=delete_extensions or {'.aae'},
+        name_suffix='_pixel' if add_suffix else '',
+        progress=progress,
+        **settings
+    )
 
 
 def list_pixel_directory(pixel_path: str, device_id: Optional[str] = None) -> None:
@@ -5,7 +5,7 @@ Use this when Google Photos doesn't detect files properly.
 """
 
 import os
-from pixel_transfer import transfer_files_from_pixel
+from pixel_transfer import LOG_PATH, TransferLog, transfer_files_from_pixel
 
 # Get absolute paths based on script location
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -15,6 +15,7 @@ REPO_ROOT = os.path.dirname(SCRIPT_DIR)
 PIXEL_PATH = '/sdcard/DCIM/Camera/'
 MAC_RECOVERY_FOLDER = os.path.join(REPO_ROOT, '02_files_to_doublecheck')  # Shared folder at repo root
 DEVICE_ID = 'HT6940202447'
+STREAM_TAR = True  # Pull everything as one tar stream (False = one adb pull per file)
 
 if __name__ == "__main__":
     print("="*60)
@@ -34,11 +35,17 @@ if __name__ == "__main__":
 
     print("\n🔄 Starting recovery process...\n")
 
-    success = transfer_files_from_pixel(
-        pixel_path=PIXEL_PATH,
-        mac_path=MAC_RECOVERY_FOLDER,
-        device_id=DEVICE_ID
-    )
+    transfer_log = TransferLog(LOG_PATH)
+    try:
+        success = transfer_files_from_pixel(
+            pixel_path=PIXEL_PATH,
+            mac_path=MAC_RECOVERY_FOLDER,
+            device_id=DEVICE_ID,
+            stream_tar=STREAM_TAR,
+            transfer_log=transfer_log
+        )
+    finally:
+        transfer_log.close()
 
     if success:
         print("\n✅ Recovery complete!")
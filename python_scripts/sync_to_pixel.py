@@ -7,14 +7,14 @@ Usage:
 
 This will automatically:
 1. Delete unwanted files (.aae)
-2. Transfer photos/videos to Pixel in batches
+2. Transfer photos/videos to Pixel in batches (also those inside .zip exports, without extracting them)
 3. Rename files with _pixel suffix
 4. Monitor Pixel storage and pause when full
 5. Resume automatically after you free up space
 """
 
 import os
-from pixel_transfer import transfer_to_pixel
+from pixel_transfer import LOG_PATH, TransferLog, transfer_to_pixel
 
 # Get absolute paths based on script location
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -44,7 +44,7 @@ KEEP_EXTENSIONS = {
 DELETE_EXTENSIONS = {
     '.aae', '.AAE',         # Apple edit metadata
     '.xmp', '.XMP',         # Adobe metadata sidecar files
-    '.zip', '.ZIP',         # Archive files
+    '.zip', '.ZIP',         # Archives without photos/videos (those inside are streamed, then the zip is deleted)
     '.nomedia',             # Android system file
     '.DS_Store',            # macOS system file
     '.dng', '.DNG',         # RAW files (optional - Google Photos supports but takes space)
@@ -57,19 +57,29 @@ if __name__ == "__main__":
     print("="*60)
     print()
 
-    transfer_to_pixel(
-        mac_folder=MAC_FOLDER,
-        pixel_path=PIXEL_PATH,
-        device_id=DEVICE_ID,
-        batch_size=BATCH_SIZE,
-        max_size_gb=MAX_SIZE_GB,
-        sleep_minutes=SLEEP_MINUTES,
-        keep_extensions=KEEP_EXTENSIONS,
-        delete_extensions=DELETE_EXTENSIONS,
-        add_suffix=False  # Set to True if you want to add _pixel suffix to filenames
-    )
+    transfer_log = TransferLog(LOG_PATH)
+    try:
+        result = transfer_to_pixel(
+            mac_folder=MAC_FOLDER,
+            pixel_path=PIXEL_PATH,
+            device_id=DEVICE_ID,
+            batch_size=BATCH_SIZE,
+            max_size_gb=MAX_SIZE_GB,
+            sleep_minutes=SLEEP_MINUTES,
+            keep_extensions=KEEP_EXTENSIONS,
+            delete_extensions=DELETE_EXTENSIONS,
+            add_suffix=False,  # Set to True if you want to add _pixel suffix to filenames
+            transfer_log=transfer_log
+        )
+    finally:
+        transfer_log.close()
 
-    print("\n🎉 Sync complete!")
+    if result.ok:
+        print("\n🎉 Sync complete!")
+    else:
+        print(f"\n⚠️  Sync finished with problems: {result.count('failed')} files failed, "
+              f"{result.count('invalid')} incomplete"
+              f"{' (' + result.message + ')' if result.message else ''}")
     print("\n📝 Next steps:")
     print("   1. Open Google Photos app on Pixel")
     print("   2. Check that photos are syncing/synced")